@@ -0,0 +1,251 @@
+"""Analisis lexico y sintactico de muchos archivos en paralelo, sin interfaz.
+
+Uso: python analisis_lote.py [--jobs N] [--cache RUTA | --mmap] archivos|carpetas|globs ...
+
+Escribe una linea JSON por archivo (NDJSON) en el orden de entrada y al
+final un resumen de rendimiento en stderr. Termina con codigo 1 si algun
+archivo tiene errores. Con --cache los resultados se guardan en una base
+sqlite y los archivos con el mismo contenido no se vuelven a analizar.
+Con --mmap cada archivo se mapea en memoria en lugar de leerse, y los
+errores llevan tambien su columna.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from analizador_lexico import (BACKENDS, FuenteMapeada, TokensMapeados, analizar_lexico,
+                               tokenizar_mapeado, tokens_sintacticos)
+from analizador_sintactico import MOTORES, AnalizadorSintactico
+from cache_analisis import CacheAnalisis
+
+# Cache de cada proceso trabajador, abierta al primer uso: (ruta, CacheAnalisis)
+_cache_proceso = None
+
+
+def expandir_rutas(entradas, extension=None):
+    """Archivos de una lista de archivos, carpetas (recursivas) y globs.
+
+    Retorna las rutas sin repetir, en el orden de las entradas; dentro de
+    una carpeta o un glob, en orden alfabetico. Con extension solo se toman
+    de las carpetas los archivos que terminan en ella.
+    """
+    rutas = []
+    vistas = set()
+
+    def agregar(ruta):
+        if ruta not in vistas:
+            vistas.add(ruta)
+            rutas.append(ruta)
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            encontradas = []
+            for carpeta, _, archivos in os.walk(entrada):
+                encontradas.extend(os.path.join(carpeta, archivo) for archivo in archivos
+                                   if extension is None or archivo.endswith(extension))
+            for ruta in sorted(encontradas):
+                agregar(ruta)
+        elif os.path.exists(entrada):
+            agregar(entrada)
+        else:
+            coincidencias = sorted(glob.glob(entrada, recursive=True))
+            if not coincidencias:
+                # Se reporta como archivo con error en vez de perderlo en silencio
+                agregar(entrada)
+            for ruta in coincidencias:
+                if os.path.isfile(ruta):
+                    agregar(ruta)
+    return rutas
+
+
+def _cache_de(ruta_cache):
+    """CacheAnalisis del proceso para esa base (None sin ruta)"""
+    global _cache_proceso
+    if ruta_cache is None:
+        return None
+    if _cache_proceso is None or _cache_proceso[0] != ruta_cache:
+        _cache_proceso = (ruta_cache, CacheAnalisis(ruta=ruta_cache))
+    return _cache_proceso[1]
+
+
+def analizar_archivo(ruta, backend="python", motor="iterativo", cache=None):
+    """Lexico y sintactico (con recuperacion) de un archivo.
+
+    Retorna un dict serializable a JSON con los conteos, los errores con su
+    linea y los tiempos de cada etapa en ms. Si el archivo no se puede leer
+    retorna {"archivo", "error"}. Con una CacheAnalisis el resultado se toma
+    de ella si ya tiene el mismo contenido ("cache": "memoria" o "disco", y
+    el tiempo de la consulta en lugar de los de lexico y sintactico).
+    """
+    inicio = time.perf_counter()
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            codigo = archivo.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {"archivo": ruta, "error": str(e)}
+    leido = time.perf_counter()
+
+    clave = guardado = None
+    if cache is not None:
+        clave = cache.clave(codigo, backend, motor)
+        guardado = cache.obtener(clave)
+    if guardado is not None:
+        tokens_lexicos, arbol, errores = guardado.tokens, guardado.arbol, guardado.errores
+        tiempos = {"cache": (time.perf_counter() - leido) * 1000}
+    else:
+        tokens_lexicos = analizar_lexico(codigo, backend)
+        lexico = time.perf_counter()
+        arbol, errores = AnalizadorSintactico(tokens_sintacticos(tokens_lexicos), motor,
+                                              arbol="compacto", recuperacion=True).analizar()
+        sintactico = time.perf_counter()
+        tiempos = {"lexico": (lexico - leido) * 1000, "sintactico": (sintactico - lexico) * 1000}
+        if cache is not None:
+            cache.guardar(clave, tokens_lexicos, arbol, errores)
+
+    resultado = {
+        "archivo": ruta,
+        "bytes": len(codigo),
+        "tokens": sum(1 for token in tokens_lexicos if token.tipo != "ERROR"),
+        "nodos": len(arbol.arbol) if arbol is not None else 0,
+        "errores_lexicos": [{"linea": token.linea, "mensaje": token.valor}
+                            for token in tokens_lexicos if token.tipo == "ERROR"],
+        "errores": [{"linea": error.linea, "mensaje": str(error)} for error in errores],
+        "tiempos_ms": {"lectura": (leido - inicio) * 1000, **tiempos},
+    }
+    if guardado is not None:
+        resultado["cache"] = guardado.origen
+    return resultado
+
+
+def analizar_mapeado(ruta, motor="iterativo"):
+    """Como analizar_archivo, pero mapeando el archivo en memoria (FuenteMapeada).
+
+    El texto no se copia ni se decodifica: los tokens son tramos del buffer
+    mapeado y solo se leen los lexemas de las hojas del arbol y de los
+    errores. Cada error lleva linea y columna, tambien los del final del
+    archivo; "bytes" es el tamano en bytes y no en caracteres. Usa siempre
+    el lexico de Python y no la cache.
+    """
+    inicio = time.perf_counter()
+    try:
+        fuente = FuenteMapeada(ruta)
+    except (OSError, ValueError) as e:
+        return {"archivo": ruta, "error": str(e)}
+    with fuente:
+        leido = time.perf_counter()
+        tokens_lexicos = tokenizar_mapeado(fuente)
+        lexico = time.perf_counter()
+        tokens = TokensMapeados([token for token in tokens_lexicos if token.tipo != "ERROR"],
+                                fuente)
+        arbol, errores = AnalizadorSintactico(tokens, motor, arbol="compacto",
+                                              recuperacion=True).analizar()
+        sintactico = time.perf_counter()
+        return {
+            "archivo": ruta,
+            "bytes": len(fuente),
+            "tokens": len(tokens),
+            "nodos": len(arbol.arbol) if arbol is not None else 0,
+            "errores_lexicos": [{"linea": token.linea, "columna": token.columna,
+                                 "mensaje": token.valor}
+                                for token in tokens_lexicos if token.tipo == "ERROR"],
+            "errores": [{"linea": error.linea, "columna": error.columna, "mensaje": str(error)}
+                        for error in errores],
+            "tiempos_ms": {"mapeo": (leido - inicio) * 1000, "lexico": (lexico - leido) * 1000,
+                           "sintactico": (sintactico - lexico) * 1000},
+        }
+
+
+def _analizar_bloque(rutas, backend, motor, ruta_cache=None, mapeado=False):
+    if mapeado:
+        return [analizar_mapeado(ruta, motor) for ruta in rutas]
+    cache = _cache_de(ruta_cache)
+    return [analizar_archivo(ruta, backend, motor, cache) for ruta in rutas]
+
+
+def _bloques(rutas, tamano):
+    for i in range(0, len(rutas), tamano):
+        yield rutas[i:i + tamano]
+
+
+def analizar_lote(rutas, jobs=None, backend="python", motor="iterativo", tamano_bloque=None,
+                  ruta_cache=None, mapeado=False):
+    """Genera el resultado de analizar_archivo de cada ruta, en el orden de rutas.
+
+    Con jobs > 1 los archivos se reparten en bloques entre procesos
+    trabajadores (ProcessPoolExecutor); los bloques evitan pagar un viaje
+    entre procesos por cada archivo pequeno. Los resultados se producen a
+    medida que llegan los bloques, sin esperar al lote completo. Con
+    ruta_cache cada proceso abre la misma base sqlite de CacheAnalisis. Con
+    mapeado cada archivo se analiza con analizar_mapeado (sin backend ni cache).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(rutas) <= 1:
+        if mapeado:
+            yield from (analizar_mapeado(ruta, motor) for ruta in rutas)
+            return
+        cache = _cache_de(ruta_cache)
+        for ruta in rutas:
+            yield analizar_archivo(ruta, backend, motor, cache)
+        return
+
+    if tamano_bloque is None:
+        # Unos 8 bloques por trabajador: reparto parejo con poco costo de envio
+        tamano_bloque = max(1, min(64, len(rutas) // (jobs * 8)))
+    with ProcessPoolExecutor(jobs) as ejecutor:
+        trabajo = partial(_analizar_bloque, backend=backend, motor=motor, ruta_cache=ruta_cache,
+                          mapeado=mapeado)
+        for resultados in ejecutor.map(trabajo, _bloques(rutas, tamano_bloque)):
+            yield from resultados
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Analiza archivos de expresiones y escribe un resultado NDJSON por archivo")
+    parser.add_argument("entradas", nargs="+", help="archivos, carpetas o globs")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="procesos trabajadores (por defecto, uno por nucleo)")
+    parser.add_argument("--backend", choices=BACKENDS, default="python")
+    parser.add_argument("--motor", choices=MOTORES, default="iterativo")
+    parser.add_argument("--extension", help="en carpetas, solo archivos con esta extension")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--cache", metavar="RUTA",
+                      help="base sqlite de resultados, compartida entre ejecuciones")
+    modo.add_argument("--mmap", action="store_true",
+                      help="mapear los archivos en memoria (lexico de Python, errores con columna)")
+    argumentos = parser.parse_args(argumentos)
+
+    rutas = expandir_rutas(argumentos.entradas, argumentos.extension)
+    jobs = argumentos.jobs or os.cpu_count() or 1
+
+    inicio = time.perf_counter()
+    archivos = con_errores = tokens = nodos = bytes_leidos = aciertos = 0
+    salida = sys.stdout
+    for resultado in analizar_lote(rutas, jobs, argumentos.backend, argumentos.motor,
+                                   ruta_cache=argumentos.cache, mapeado=argumentos.mmap):
+        salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        archivos += 1
+        if "error" in resultado or resultado["errores"] or resultado["errores_lexicos"]:
+            con_errores += 1
+        tokens += resultado.get("tokens", 0)
+        nodos += resultado.get("nodos", 0)
+        bytes_leidos += resultado.get("bytes", 0)
+        aciertos += "cache" in resultado
+    salida.flush()
+    transcurrido = time.perf_counter() - inicio
+
+    velocidad = 1 / transcurrido if transcurrido else 0.0
+    print(f"{archivos} archivos ({con_errores} con errores), {tokens} tokens, {nodos} nodos "
+          f"en {transcurrido:.2f} s con {jobs} proceso(s): "
+          f"{archivos * velocidad:.0f} archivos/s, {tokens * velocidad / 1e6:.2f} Mtokens/s, "
+          f"{bytes_leidos * velocidad / 1e6:.1f} MB/s"
+          + (f", {aciertos} de la cache" if argumentos.cache else ""), file=sys.stderr)
+    return 1 if con_errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
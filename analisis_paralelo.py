@@ -0,0 +1,235 @@
+"""Analisis sintactico de un programa grande repartido en trozos entre procesos"""
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from analizador_lexico import tokenizar, tokens_sintacticos
+from analizador_sintactico import (ARBOLES, MOTORES, AnalizadorSintactico, ArbolCompacto,
+                                   ErrorSintactico)
+from perfilado import tramo
+
+# Por debajo de este tamano (en caracteres) el arranque de los procesos y el
+# envio de los trozos cuestan mas de lo que se gana: se analiza en serie
+UMBRAL_PARALELO = 1 << 19
+
+# Trozos por proceso: mas de uno reparte mejor la carga si un trozo es lento
+TROZOS_POR_PROCESO = 4
+
+# Candidatos a corte: un salto de linea (con los blancos que lo rodean) entre
+# un caracter que cierra un operando y uno que empieza otro. Sin comentarios
+# ni cadenas en el lenguaje, estos caracteres siempre son parte de esos tokens.
+_CANDIDATO_CORTE = re.compile(r"(?<=[A-Za-z0-9_)])[ \t]*\n[ \t\n]*(?=[A-Za-z0-9_(])")
+_PARENTESIS = re.compile(r"[()]")
+
+
+def puntos_de_corte(codigo, trozos):
+    """Hasta trozos-1 desplazamientos donde el codigo se puede cortar sin cambiar el analisis.
+
+    Cada corte cae al comienzo de una linea que empieza con un operando,
+    despues de una linea que termina en uno, fuera de parentesis: el mismo
+    limite de sentencia que usan dividir_sentencias y AnalizadorIncremental.
+    Los cortes se buscan a partir de posiciones repartidas por igual en el
+    texto; basta recorrer los parentesis, no lexicar.
+    """
+    cortes = []
+    profundidad = 0
+    recorrido = 0  # profundidad calculada hasta aqui
+    for i in range(1, trozos):
+        objetivo = max(len(codigo) * i // trozos, recorrido)
+        for candidato in _CANDIDATO_CORTE.finditer(codigo, objetivo):
+            corte = candidato.end()
+            for parentesis in _PARENTESIS.findall(codigo, recorrido, corte):
+                if parentesis == "(":
+                    profundidad += 1
+                elif profundidad:
+                    profundidad -= 1
+            recorrido = corte
+            if profundidad == 0:
+                if not cortes or corte > cortes[-1]:
+                    cortes.append(corte)
+                break
+        else:
+            break  # no quedan cortes limpios (p. ej. un parentesis sin cerrar)
+    return cortes
+
+
+def _analizar_trozo(texto, motor):
+    """Trabajador: lexico y sintactico (con recuperacion, sin limite) de un trozo.
+
+    Retorna las columnas del ArbolCompacto, sin copiar objetos nodo, mas
+    los errores y el primer token con posiciones relativas al trozo.
+    """
+    tokens = tokens_sintacticos(tokenizar(texto))
+    analizador = AnalizadorSintactico(tokens, motor, arbol="compacto", recuperacion=True,
+                                      max_errores=None)
+    try:
+        analizador.programa()
+    except Exception as e:
+        return {"excepcion": str(e)}
+    return _empaquetar(analizador, tokens, 0)
+
+
+def _empaquetar(analizador, tokens, primer_error):
+    """Resultado serializable de un analisis cuyo Programa es el nodo 0 del arbol compacto"""
+    arbol = analizador.constructor
+    return {
+        "tokens": len(tokens),
+        "columnas": (arbol.tipos, arbol.valores, arbol.primer_hijo, arbol.siguiente_hermano,
+                     arbol._ultimo_hijo),
+        "cadenas": arbol.cadenas,
+        "errores": [(str(error), error.posicion, error.linea, error.inicio)
+                    for error in analizador.errores[primer_error:]],
+        "primer_token": (tokens[0].linea, tokens[0].inicio) if tokens else None,
+    }
+
+
+class _Union:
+    """Une los arboles de los trozos, en orden, en un solo ArbolCompacto"""
+
+    def __init__(self):
+        self.arbol = ArbolCompacto()
+        self.raiz = self.arbol.nodo("Programa")
+        self.errores = []
+        self.tokens = 0  # tokens de los trozos ya unidos
+
+    def agregar(self, resultado, linea_base, inicio_base, siguiente_token):
+        """Agrega los hijos del Programa del trozo y sus errores en coordenadas globales.
+
+        siguiente_token es (linea, inicio) del primer token posterior al
+        trozo, o None; es donde el analisis completo ubica los errores que
+        el trozo detecto en su final.
+        """
+        arbol = self.arbol
+        tipos, valores, primer_hijo, siguiente_hermano, ultimo_hijo = resultado["columnas"]
+        # Indice de cada cadena del trozo en la tabla global; mapa[-1] = -1
+        # traduce tambien los valores ausentes
+        mapa = arbol.internar_varias(resultado["cadenas"])
+        mapa.append(-1)
+        # El nodo 0 del trozo es su Programa: se descarta y el resto se
+        # desplaza. Con la misma idea, desplazados[-1] = -1 (sin enlace).
+        base = len(arbol.tipos) - 1
+        desplazados = list(range(base, base + len(tipos)))
+        desplazados.append(-1)
+        arbol.tipos.extend(array("i", [mapa[t] for t in tipos[1:]]))
+        arbol.valores.extend(array("i", [mapa[v] for v in valores[1:]]))
+        for columna, propia in ((arbol.primer_hijo, primer_hijo),
+                                (arbol.siguiente_hermano, siguiente_hermano),
+                                (arbol._ultimo_hijo, ultimo_hijo)):
+            columna.extend(array("i", [desplazados[i] for i in propia[1:]]))
+
+        if primer_hijo[0] >= 0:
+            # Las sentencias del trozo ya estan encadenadas entre si
+            arbol.agregar_hijo(self.raiz, desplazados[primer_hijo[0]])
+            arbol._ultimo_hijo[self.raiz] = desplazados[ultimo_hijo[0]]
+
+        for mensaje, posicion, linea, inicio in resultado["errores"]:
+            error = ErrorSintactico(mensaje, self.tokens + posicion)
+            if linea is not None:
+                error.linea = linea + linea_base - 1
+                error.inicio = inicio + inicio_base
+            elif siguiente_token is not None:
+                error.linea, error.inicio = siguiente_token
+            self.errores.append(error)
+        self.tokens += resultado["tokens"]
+
+    def resultado(self, arbol):
+        vista = self.arbol.resultado(self.raiz)
+        return (vista if arbol == "compacto" else vista.a_nodo()), self.errores
+
+
+def _analizar_en_serie(codigo, motor, arbol, recuperacion, max_errores, perfilador):
+    with tramo(perfilador, "lexico"):
+        tokens = tokens_sintacticos(tokenizar(codigo))
+    return AnalizadorSintactico(tokens, motor, arbol, recuperacion, max_errores,
+                                perfilador).analizar()
+
+
+def analizar_paralelo(codigo, procesos=None, motor="iterativo", arbol="compacto",
+                      recuperacion=True, max_errores=100, umbral=UMBRAL_PARALELO,
+                      ejecutor=None, perfilador=None):
+    """Lexico y sintactico de un programa, repartido en trozos entre procesos.
+
+    Retorna (arbol, errores) iguales a los de AnalizadorSintactico(tokens,
+    motor, arbol, recuperacion, max_errores).analizar() sobre los tokens
+    sintacticos de todo el codigo, con las posiciones y lineas globales.
+
+    El codigo se corta en limites limpios de sentencia (puntos_de_corte) y
+    cada trozo se lexica y analiza en un proceso trabajador, que devuelve
+    su arbol compacto como columnas; aqui solo se unen. Si el codigo mide
+    menos que umbral, hay un solo proceso o no se encuentra ningun corte,
+    se analiza en serie. ejecutor permite reutilizar un ProcessPoolExecutor
+    entre llamadas.
+
+    Los trozos se analizan siempre con recuperacion y sin limite. Con
+    recuperacion, desde el trozo que alcanza max_errores se continua en
+    serie sobre ese trozo y el siguiente, con los errores previos ya
+    contados. Sin recuperacion el analisis no se resincroniza tras un
+    error, asi que desde el primer trozo con errores se sigue en serie
+    hasta el final.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor sintactico desconocido: '{motor}'")
+    if arbol not in ARBOLES:
+        raise ValueError(f"Representacion de arbol desconocida: '{arbol}'")
+    procesos = procesos or os.cpu_count() or 1
+
+    cortes = []
+    if procesos > 1 and len(codigo) >= umbral:
+        with tramo(perfilador, "division"):
+            cortes = puntos_de_corte(codigo, procesos * TROZOS_POR_PROCESO)
+    if not cortes:
+        return _analizar_en_serie(codigo, motor, arbol, recuperacion, max_errores, perfilador)
+
+    limites = [0, *cortes, len(codigo)]
+    trozos = [codigo[limites[i]:limites[i + 1]] for i in range(len(limites) - 1)]
+    lineas_base = [1]
+    for i in range(len(trozos) - 1):
+        lineas_base.append(lineas_base[-1] + codigo.count("\n", limites[i], limites[i + 1]))
+
+    with tramo(perfilador, "trozos"):
+        trabajo = partial(_analizar_trozo, motor=motor)
+        if ejecutor is None:
+            with ProcessPoolExecutor(procesos) as propio:
+                resultados = list(propio.map(trabajo, trozos))
+        else:
+            resultados = list(ejecutor.map(trabajo, trozos))
+
+    if any("excepcion" in resultado for resultado in resultados):
+        # Un trozo fallo (p. ej. recursion con el motor recursivo): el
+        # analisis en serie reporta el error como siempre
+        return _analizar_en_serie(codigo, motor, arbol, recuperacion, max_errores, perfilador)
+
+    with tramo(perfilador, "union"):
+        union = _Union()
+        for i, resultado in enumerate(resultados):
+            siguiente = resultados[i + 1]["primer_token"] if i + 1 < len(resultados) else None
+            if siguiente is not None:
+                siguiente = (siguiente[0] + lineas_base[i + 1] - 1, siguiente[1] + limites[i + 1])
+            detiene = resultado["errores"] and (
+                not recuperacion
+                or max_errores is not None
+                and len(union.errores) + len(resultado["errores"]) >= max_errores)
+            if detiene:
+                # Con recuperacion el analisis en serie se detiene dentro de
+                # este trozo y del siguiente solo mira el comienzo; sin ella
+                # sigue desde donde fallo, sin resincronizarse, hasta el final
+                fin = limites[i + 2] if recuperacion and i + 2 < len(limites) else len(codigo)
+                resultado = _continuar_en_serie(union, codigo[limites[i]:fin], motor,
+                                                recuperacion, max_errores)
+                union.agregar(resultado, lineas_base[i], limites[i], None)
+                break
+            union.agregar(resultado, lineas_base[i], limites[i], siguiente)
+        return union.resultado(arbol)
+
+
+def _continuar_en_serie(union, texto, motor, recuperacion, max_errores):
+    """Analiza en serie el texto que sigue a lo ya unido, con los errores previos contados"""
+    tokens = tokens_sintacticos(tokenizar(texto))
+    analizador = AnalizadorSintactico(tokens, motor, arbol="compacto",
+                                      recuperacion=recuperacion, max_errores=max_errores)
+    # Los errores previos cuentan para max_errores
+    analizador.errores = list(union.errores)
+    analizador.analizar()
+    return _empaquetar(analizador, tokens, len(union.errores))
@@ -0,0 +1,338 @@
+from analizador_lexico import tokenizar, tokens_sintacticos
+from analizador_sintactico import (MOTORES, AnalizadorSintactico, ErrorSintactico, NodoArbol,
+                                   _FIN_DE_OPERANDO, _INICIO_DE_OPERANDO, _PARENTESIS_DER,
+                                   _PARENTESIS_IZQ, sin_recolector)
+
+# Tramos analizados que se recuerdan como maximo (se descartan los mas viejos)
+LIMITE_CACHE = 100000
+
+# Caracteres comparados de una vez al buscar el prefijo y sufijo comunes
+_BLOQUE_COMPARACION = 1 << 16
+
+
+def resumir_lineas(lineas):
+    """Lo que la division en tramos necesita saber de cada linea.
+
+    Por linea da (primera clase, ultima clase, balance de parentesis, minimo
+    del balance parcial) de sus tokens sintacticos, o None si no tiene
+    ninguno. Todas las lineas se lexican de una vez; retorna (resumenes,
+    tokens sintacticos).
+    """
+    resumenes = [None] * len(lineas)
+    tokens = tokens_sintacticos(tokenizar("\n".join(lineas)))
+    actual = -1
+    primera = ultima = None
+    balance = minimo = 0
+    for token in tokens:
+        i = token.linea - 1
+        if i != actual:
+            if actual >= 0:
+                resumenes[actual] = (primera, ultima, balance, minimo)
+            actual = i
+            primera = token.clase
+            balance = minimo = 0
+        ultima = token.clase
+        if ultima == _PARENTESIS_IZQ:
+            balance += 1
+        elif ultima == _PARENTESIS_DER:
+            balance -= 1
+            if balance < minimo:
+                minimo = balance
+    if actual >= 0:
+        resumenes[actual] = (primera, ultima, balance, minimo)
+    return resumenes, tokens
+
+
+def _prefijo_comun(a, b):
+    """Largo del prefijo comun de dos cadenas, comparando por bloques"""
+    n = min(len(a), len(b))
+    i = 0
+    while i < n:
+        j = min(i + _BLOQUE_COMPARACION, n)
+        if a[i:j] != b[i:j]:
+            # La diferencia esta en [i, j): biseccion
+            while j - i > 1:
+                medio = (i + j) // 2
+                if a[i:medio] == b[i:medio]:
+                    i = medio
+                else:
+                    j = medio
+            return i
+        i = j
+    return n
+
+
+def _sufijo_comun(a, b, limite):
+    """Largo del sufijo comun de dos cadenas, sin pasar de 'limite' caracteres"""
+    n = 0
+    fin_a, fin_b = len(a), len(b)
+    while n < limite:
+        m = min(n + _BLOQUE_COMPARACION, limite)
+        if a[fin_a - m:fin_a - n] != b[fin_b - m:fin_b - n]:
+            while m - n > 1:
+                medio = (n + m) // 2
+                if a[fin_a - medio:fin_a - n] == b[fin_b - medio:fin_b - n]:
+                    n = medio
+                else:
+                    m = medio
+            return n
+        n = m
+    return limite
+
+
+class AnalizadorIncremental:
+    """Re-analisis incremental de un documento que se edita por lineas.
+
+    El codigo se divide en tramos de lineas completas que terminan en un
+    limite limpio de sentencia: fuera de parentesis, una linea que empieza
+    con un operando despues de otra que termina en uno (la misma regla que
+    dividir_sentencias). Cada tramo se analiza por separado con
+    recuperacion de errores y su resultado (sentencias y errores) se guarda
+    en una cache indexada por el texto del tramo. Al editar solo se vuelven
+    a analizar los tramos que tocan las lineas cambiadas y el Programa se
+    actualiza reemplazando esos hijos.
+
+    El resultado equivale a AnalizadorSintactico(tokens, motor,
+    recuperacion=True) sin limite de errores. Los tramos con el mismo texto
+    comparten sus subarboles.
+    """
+
+    def __init__(self, codigo="", motor="iterativo"):
+        if motor not in MOTORES:
+            raise ValueError(f"Motor sintactico desconocido: '{motor}'")
+        self.motor = motor
+        self.arbol = NodoArbol("Programa")
+        self.lineas = []
+        self._cache = {}
+        self._codigo = ""
+        # Columnas por linea; los datos de un tramo se guardan en su primera linea
+        self._resumen = []      # resumir_lineas() de cada linea
+        self._inicio = []       # True si la linea empieza un tramo
+        self._sentencias = []   # hijos del Programa que aporta el tramo
+        self._tokens = []       # tokens sintacticos del tramo
+        self._errores = []      # [(linea relativa, mensaje, posicion relativa)] o None
+        self._tramos_con_error = 0
+        self.tramos_analizados = 0  # tramos analizados en la ultima actualizacion
+        self.reemplazar_lineas(0, 0, codigo.split("\n"))
+        self._codigo = codigo
+
+    @property
+    def codigo(self):
+        if self._codigo is None:
+            self._codigo = "\n".join(self.lineas)
+        return self._codigo
+
+    def analizar(self):
+        """Retorna (arbol, errores) como AnalizadorSintactico.analizar"""
+        return self.arbol, self.errores
+
+    @property
+    def total_tokens(self):
+        """Tokens sintacticos de todo el documento"""
+        return sum(self._tokens)
+
+    def primeros_tokens(self, limite):
+        """Los primeros 'limite' tokens (incluidos los ERROR), lexicando solo lo necesario"""
+        tokens = []
+        fin = 0
+        while len(tokens) < limite and fin < len(self.lineas):
+            inicio, fin = fin, min(len(self.lineas), max(2 * fin, 64))
+            tokens.extend(tokenizar("\n".join(self.lineas[inicio:fin]) + "\n"))
+        return tokens[:limite]
+
+    @property
+    def errores(self):
+        if not self.arbol.hijos:
+            return [ErrorSintactico("Error: Programa vacio", 0)]
+        if not self._tramos_con_error:
+            return []
+
+        errores = []
+        base = 0      # tokens antes de la linea 'previa'
+        previa = 0
+        for i, errores_tramo in enumerate(self._errores):
+            if errores_tramo is None:
+                continue
+            base += sum(self._tokens[previa:i])
+            previa = i
+            for linea, mensaje, posicion in errores_tramo:
+                error = ErrorSintactico(mensaje, base + posicion)
+                if linea is None:
+                    # Al final del tramo: el analisis completo veria el primer
+                    # token del tramo siguiente, si lo hay
+                    error.linea = self._linea_siguiente_tramo(i)
+                else:
+                    error.linea = i + linea + 1
+                errores.append(error)
+        return errores
+
+    def _linea_siguiente_tramo(self, linea):
+        """Numero de linea (desde 1) donde empieza el tramo posterior a 'linea', o None"""
+        for j in range(linea + 1, len(self._inicio)):
+            if self._inicio[j]:
+                return j + 1
+        return None
+
+    def actualizar(self, codigo):
+        """Re-analiza a partir del texto completo nuevo (busca las lineas que cambiaron)"""
+        anterior = self.codigo
+        if codigo == anterior:
+            self.tramos_analizados = 0
+            return
+        prefijo = _prefijo_comun(anterior, codigo)
+        sufijo = _sufijo_comun(anterior, codigo, min(len(anterior), len(codigo)) - prefijo)
+
+        desde = anterior.count("\n", 0, prefijo)
+        hasta = desde + anterior.count("\n", prefijo, len(anterior) - sufijo) + 1
+        inicio = codigo.rfind("\n", 0, prefijo) + 1
+        fin = codigo.find("\n", len(codigo) - sufijo)
+        if fin < 0:
+            fin = len(codigo)
+
+        self.reemplazar_lineas(desde, hasta, codigo[inicio:fin].split("\n"))
+        self._codigo = codigo
+
+    def reemplazar_lineas(self, desde, hasta, nuevas):
+        """Reemplaza las lineas [desde, hasta) por 'nuevas' y re-analiza lo afectado"""
+        self._codigo = None
+        with sin_recolector():
+            self._reemplazar(desde, hasta, nuevas)
+
+    def _reemplazar(self, desde, hasta, nuevas):
+        # Region a re-analizar, en coordenadas viejas: desde el tramo anterior
+        # al que contiene 'desde' hasta el inicio de tramo que sigue a 'hasta'
+        inicio = self._inicio_de_tramo(desde)
+        if inicio > 0:
+            inicio = self._inicio_de_tramo(inicio - 1)
+        fin = hasta
+        while fin < len(self.lineas) and not self._inicio[fin]:
+            fin += 1
+        viejos = sum(self._sentencias[inicio:fin])
+
+        cantidad = len(nuevas)
+        self._tramos_con_error -= sum(1 for errores in self._errores[desde:hasta]
+                                      if errores is not None)
+        self.lineas[desde:hasta] = nuevas
+        resumenes, tokens_nuevos = resumir_lineas(nuevas)
+        self._resumen[desde:hasta] = resumenes
+        self._inicio[desde:hasta] = [False] * cantidad
+        self._sentencias[desde:hasta] = [0] * cantidad
+        self._tokens[desde:hasta] = [0] * cantidad
+        self._errores[desde:hasta] = [None] * cantidad
+        fin += cantidad - (hasta - desde)
+
+        # Si la region ya no termina en un limite limpio, absorber el tramo siguiente
+        total = len(self.lineas)
+        inicios = [inicio]
+        estado = self._dividir(inicios, inicio, fin, (0, None))
+        while fin < total and not self._limpio(estado, self._resumen[fin]):
+            viejos += self._sentencias[fin]
+            siguiente = fin + 1
+            while siguiente < total and not self._inicio[siguiente]:
+                siguiente += 1
+            estado = self._dividir(inicios, fin, siguiente, estado)
+            fin = siguiente
+
+        # Analizar los tramos nuevos de la region (o tomarlos de la cache). Si
+        # falta alguno, la region se lexica una sola vez y cada tramo toma su
+        # parte; las lineas de esos tokens son relativas al inicio de la region.
+        tokens_region = tokens_nuevos if (inicio, fin) == (desde, desde + cantidad) else None
+        siguiente_token = 0
+        hijos = []
+        inicios.append(fin)
+        for i in range(len(inicios) - 1):
+            a, b = inicios[i], inicios[i + 1]
+            if a >= b:
+                continue
+            texto = "\n".join(self.lineas[a:b])
+            resultado = self._cache.get(texto)
+            if resultado is None:
+                if tokens_region is None:
+                    tokens_region = tokens_sintacticos(
+                        tokenizar("\n".join(self.lineas[inicio:fin])))
+                primero = siguiente_token
+                while primero < len(tokens_region) and tokens_region[primero].linea <= a - inicio:
+                    primero += 1
+                siguiente_token = primero
+                while (siguiente_token < len(tokens_region)
+                       and tokens_region[siguiente_token].linea <= b - inicio):
+                    siguiente_token += 1
+                resultado = self._analizar_tramo(texto, tokens_region[primero:siguiente_token],
+                                                 a - inicio)
+            sentencias, errores, tokens = resultado
+            hijos.extend(sentencias)
+            if self._errores[a] is not None:
+                self._tramos_con_error -= 1
+            if errores:
+                self._tramos_con_error += 1
+            self._sentencias[a] = len(sentencias)
+            self._tokens[a] = tokens
+            self._errores[a] = errores or None
+            self._inicio[a] = True
+            for j in range(a + 1, b):
+                if self._errores[j] is not None:
+                    self._tramos_con_error -= 1
+                self._inicio[j] = False
+                self._sentencias[j] = self._tokens[j] = 0
+                self._errores[j] = None
+        self.tramos_analizados = len(inicios) - 1
+
+        desplazamiento = sum(self._sentencias[:inicio])
+        self.arbol.hijos[desplazamiento:desplazamiento + viejos] = hijos
+
+    def _inicio_de_tramo(self, linea):
+        """Primera linea del tramo que contiene 'linea'"""
+        linea = min(linea, len(self.lineas) - 1)
+        while linea > 0 and not self._inicio[linea]:
+            linea -= 1
+        return max(linea, 0)
+
+    def _dividir(self, inicios, inicio, fin, estado):
+        """Divide las lineas [inicio, fin) en tramos, continuando desde 'estado'.
+
+        Agrega a 'inicios' las lineas donde empieza un tramo nuevo y retorna
+        el estado (profundidad, ultima clase) al final; (0, None) es el
+        estado al comienzo de un tramo.
+        """
+        profundidad, ultima = estado
+        resumenes = self._resumen
+        for i in range(inicio, fin):
+            resumen = resumenes[i]
+            if resumen is None:
+                continue
+            primera, final, balance, minimo = resumen
+            if (profundidad == 0 and ultima in _FIN_DE_OPERANDO
+                    and primera in _INICIO_DE_OPERANDO):
+                inicios.append(i)
+            # Un ')' sin pareja no baja la profundidad de cero
+            profundidad = max(profundidad + balance, balance - minimo)
+            ultima = final
+        return profundidad, ultima
+
+    @staticmethod
+    def _limpio(estado, resumen):
+        """True si un tramo puede empezar en la linea con este resumen"""
+        profundidad, ultima = estado
+        return (resumen is not None and profundidad == 0 and ultima in _FIN_DE_OPERANDO
+                and resumen[0] in _INICIO_DE_OPERANDO)
+
+    def _analizar_tramo(self, texto, tokens, primera_linea):
+        """Analiza un tramo y guarda en la cache (sentencias, errores, cantidad de tokens).
+
+        Las lineas de los tokens cuentan desde 1 en la linea 'primera_linea'
+        del tramo; los errores se guardan con la linea relativa al tramo.
+        """
+        sentencias = []
+        errores = []
+        if tokens:
+            analizador = AnalizadorSintactico(tokens, self.motor, recuperacion=True,
+                                              max_errores=None)
+            sentencias = analizador.programa().hijos
+            errores = [(None if error.linea is None else error.linea - 1 - primera_linea,
+                        str(error), error.posicion) for error in analizador.errores]
+
+        resultado = (sentencias, errores, len(tokens))
+        if len(self._cache) >= LIMITE_CACHE:
+            del self._cache[next(iter(self._cache))]
+        self._cache[texto] = resultado
+        return resultado
@@ -0,0 +1,480 @@
+import mmap
+import os
+import re
+import subprocess
+import threading
+from array import array
+from bisect import bisect_right
+
+from analizador_sintactico import (CLASE_POR_TIPO, TipoToken, Token, decodificar_tokens,
+                                   parsear_tokens, sin_recolector)
+from perfilado import tramo
+
+EJECUTABLE_FLEX = "./analizador.exe"
+
+BACKENDS = ("python", "flex", "servidor")
+
+# Expresion maestra equivalente a las reglas de analizador.l.
+# El orden de las alternativas reproduce la regla de la coincidencia mas larga
+# de Flex: DECIMAL va antes que NUMERO y los blancos se descartan. Los blancos
+# que contienen saltos de linea van aparte para llevar la cuenta de lineas.
+_PATRON_MAESTRO = re.compile(r"""
+    (?P<DECIMAL>[0-9]+\.[0-9]+)
+  | (?P<NUMERO>[0-9]+)
+  | (?P<IDENTIFICADOR>[a-zA-Z_][a-zA-Z0-9_]*)
+  | (?P<ASIGNACION>=)
+  | (?P<SUMA>\+)
+  | (?P<RESTA>-)
+  | (?P<MULTIPLICACION>\*)
+  | (?P<DIVISION>/)
+  | (?P<PARENTESIS_IZQ>\()
+  | (?P<PARENTESIS_DER>\))
+  | (?P<BLANCO>[ \t]+)
+  | (?P<SALTO>\n[ \t\n]*)
+  | (?P<ERROR>.)
+""", re.VERBOSE)
+
+
+def tokenizar(codigo):
+    """Analisis lexico en Python, equivalente a analizador.l"""
+    tokens = []
+    agregar = tokens.append
+    clases = CLASE_POR_TIPO
+    linea = 1
+
+    with sin_recolector():
+        for coincidencia in _PATRON_MAESTRO.finditer(codigo):
+            tipo = coincidencia.lastgroup
+            if tipo == "BLANCO":
+                continue
+            if tipo == "SALTO":
+                linea += coincidencia.group().count("\n")
+                continue
+            if tipo == "ERROR":
+                agregar(Token("ERROR", f"Caracter no reconocido '{coincidencia.group()}'",
+                              coincidencia.start(), clases[tipo], linea))
+            else:
+                agregar(Token(tipo, coincidencia.group(), coincidencia.start(), clases[tipo],
+                              linea))
+
+    return tokens
+
+
+_BLANCOS = " \t\n"
+
+
+def tokenizar_flujo(fuente, tamano_bloque=1 << 16):
+    """Analisis lexico perezoso de un archivo de texto abierto (o cualquier read()).
+
+    Lee la fuente por bloques y produce los tokens uno a uno, sin cargar el
+    archivo completo. Cada bloque se corta en su ultimo blanco, asi ningun
+    token queda partido entre dos bloques.
+    """
+    clases = CLASE_POR_TIPO
+    pendiente = ""
+    base = 0  # desplazamiento de 'pendiente' en la fuente
+    linea = 1
+
+    while True:
+        bloque = fuente.read(tamano_bloque)
+        texto = pendiente + bloque
+        if bloque:
+            corte = max(texto.rfind(c) for c in _BLANCOS) + 1
+            if corte <= 0:
+                pendiente = texto
+                continue
+        else:
+            corte = len(texto)
+
+        for coincidencia in _PATRON_MAESTRO.finditer(texto, 0, corte):
+            tipo = coincidencia.lastgroup
+            if tipo == "BLANCO":
+                continue
+            if tipo == "SALTO":
+                linea += coincidencia.group().count("\n")
+                continue
+            if tipo == "ERROR":
+                yield Token("ERROR", f"Caracter no reconocido '{coincidencia.group()}'",
+                            base + coincidencia.start(), clases[tipo], linea)
+            else:
+                yield Token(tipo, coincidencia.group(), base + coincidencia.start(), clases[tipo],
+                            linea)
+
+        if not bloque:
+            return
+        pendiente = texto[corte:]
+        base += corte
+
+
+# El mismo patron sobre bytes, para buffers mapeados. Un caracter UTF-8 de
+# varios bytes no reconocido es un solo token ERROR, como en el texto.
+_PATRON_BYTES = re.compile(
+    _PATRON_MAESTRO.pattern.replace("(?P<ERROR>.)", r"(?P<ERROR>[\xc2-\xf4][\x80-\xbf]*|.)")
+    .encode("ascii"), re.VERBOSE)
+# Clase de token de cada grupo del patron (lastindex); None para los blancos
+_CLASE_POR_GRUPO = [None] * (_PATRON_BYTES.groups + 1)
+for _nombre, _grupo in _PATRON_BYTES.groupindex.items():
+    _CLASE_POR_GRUPO[_grupo] = CLASE_POR_TIPO.get(_nombre)
+# Lexema fijo de las clases que no necesitan leer el buffer
+_LEXEMAS_FIJOS = {int(TipoToken.ASIGNACION): "=", int(TipoToken.SUMA): "+",
+                  int(TipoToken.RESTA): "-", int(TipoToken.MULTIPLICACION): "*",
+                  int(TipoToken.DIVISION): "/", int(TipoToken.PARENTESIS_IZQ): "(",
+                  int(TipoToken.PARENTESIS_DER): ")", int(TipoToken.FIN): ""}
+_NOMBRES_CLASE = {int(tipo): tipo.name for tipo in TipoToken}
+_CLASE_ERROR = int(TipoToken.ERROR)
+
+# Bytes que se indexan por vez al buscar saltos de linea
+_BLOQUE_LINEAS = 1 << 20
+
+
+class FuenteMapeada:
+    """Archivo de codigo mapeado en memoria (solo lectura), con indice de lineas perezoso.
+
+    'datos' es el mmap: el lexico lo recorre sin copiarlo. Los
+    desplazamientos de los saltos de linea se indexan por bloques a medida
+    que se consultan posiciones, asi un error cerca del comienzo no obliga
+    a recorrer el archivo entero. Se usa como contexto ('with') o con
+    cerrar(); los tokens dejan de poder leer su lexema al cerrarse.
+    """
+
+    def __init__(self, ruta):
+        with open(ruta, "rb") as archivo:
+            # mmap no admite archivos vacios
+            self.datos = (mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+                          if os.fstat(archivo.fileno()).st_size else b"")
+        self.ruta = ruta
+        self._saltos = array("q")  # desplazamiento de cada '\n' indexado
+        self._indexado = 0         # bytes ya recorridos buscando saltos
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        if isinstance(self.datos, mmap.mmap):
+            self.datos.close()
+
+    def texto(self, inicio, fin):
+        return self.datos[inicio:fin].decode("utf-8", "replace")
+
+    def _indexar_hasta(self, desplazamiento):
+        datos = self.datos
+        while self._indexado <= desplazamiento and self._indexado < len(datos):
+            fin = min(self._indexado + _BLOQUE_LINEAS, len(datos))
+            agregar = self._saltos.append
+            salto = datos.find(b"\n", self._indexado, fin)
+            while salto >= 0:
+                agregar(salto)
+                salto = datos.find(b"\n", salto + 1, fin)
+            self._indexado = fin
+
+    def linea(self, desplazamiento):
+        """Linea (desde 1) del byte en ese desplazamiento"""
+        self._indexar_hasta(desplazamiento)
+        return bisect_right(self._saltos, desplazamiento - 1) + 1
+
+    def columna(self, desplazamiento):
+        """Columna (desde 1, en caracteres) del byte en ese desplazamiento"""
+        linea = self.linea(desplazamiento)
+        inicio_linea = self._saltos[linea - 2] + 1 if linea > 1 else 0
+        return len(self.texto(inicio_linea, desplazamiento)) + 1
+
+
+class TokenMapeado:
+    """Token como tramo (clase, inicio, longitud) de una FuenteMapeada.
+
+    Tiene la interfaz de Token, pero valor, tipo, linea y columna se
+    calculan al pedirlos: el lexema se decodifica del buffer solo cuando
+    una hoja del arbol o un mensaje de error lo necesita, y la linea sale
+    del indice de la fuente. inicio es un desplazamiento en bytes.
+    """
+    __slots__ = ("clase", "inicio", "longitud", "fuente")
+
+    def __init__(self, clase, inicio, longitud, fuente):
+        self.clase = clase
+        self.inicio = inicio
+        self.longitud = longitud
+        self.fuente = fuente
+
+    @property
+    def tipo(self):
+        return _NOMBRES_CLASE[self.clase]
+
+    @property
+    def lexema(self):
+        fijo = _LEXEMAS_FIJOS.get(self.clase)
+        if fijo is not None:
+            return fijo
+        return self.fuente.texto(self.inicio, self.inicio + self.longitud)
+
+    @property
+    def valor(self):
+        if self.clase == _CLASE_ERROR:
+            return f"Caracter no reconocido '{self.lexema}'"
+        return self.lexema
+
+    @property
+    def linea(self):
+        return self.fuente.linea(self.inicio)
+
+    @property
+    def columna(self):
+        return self.fuente.columna(self.inicio)
+
+    def __repr__(self):
+        return f"Token({self.tipo}, '{self.valor}')"
+
+
+class TokensMapeados(list):
+    """Lista de TokenMapeado de una fuente; 'fin' marca el final del archivo.
+
+    AnalizadorSintactico ubica en 'fin' los errores que ocurren al llegar al
+    final, asi todos sus errores tienen linea y columna.
+    """
+
+    def __init__(self, tokens, fuente):
+        super().__init__(tokens)
+        self.fuente = fuente
+        self.fin = TokenMapeado(int(TipoToken.FIN), len(fuente), 0, fuente)
+
+
+def tokenizar_mapeado(fuente, incluir_errores=True):
+    """Analisis lexico de una FuenteMapeada, equivalente a tokenizar() sin copiar el texto.
+
+    El patron recorre el buffer mapeado directamente y cada token es un
+    TokenMapeado. Retorna TokensMapeados (con los ERROR salvo que
+    incluir_errores sea False, como tokens_sintacticos()).
+    """
+    clase_por_grupo = _CLASE_POR_GRUPO
+    tokens = []
+    agregar = tokens.append
+    with sin_recolector():
+        for coincidencia in _PATRON_BYTES.finditer(fuente.datos):
+            clase = clase_por_grupo[coincidencia.lastindex]
+            if clase is None or (clase == _CLASE_ERROR and not incluir_errores):
+                continue
+            inicio, fin = coincidencia.span()
+            agregar(TokenMapeado(clase, inicio, fin - inicio, fuente))
+    return TokensMapeados(tokens, fuente)
+
+
+def tokenizar_flex(codigo, ejecutable=EJECUTABLE_FLEX, timeout=5, binario=False,
+                   perfilador=None):
+    """Analisis lexico ejecutando el analizador generado por Flex.
+
+    Con binario=True se usa el formato compacto (--binario), que ademas
+    conserva la posicion de cada token en la fuente.
+    """
+    with tramo(perfilador, "flex_subproceso"):
+        resultado = subprocess.run(
+            [ejecutable, "--binario"] if binario else [ejecutable],
+            input=codigo.encode("utf-8"),
+            capture_output=True,
+            timeout=timeout
+        )
+    with tramo(perfilador, "parsear_tokens"):
+        if binario:
+            return decodificar_tokens(resultado.stdout, incluir_errores=True)
+
+        salida = resultado.stdout.decode("utf-8", errors="replace")
+        return parsear_tokens(salida, incluir_errores=True)
+
+
+class ClienteLexer:
+    """Mantiene vivo un analizador.exe en modo --servidor y le envia documentos.
+
+    Protocolo: por cada documento se escribe "<longitud>\\n" seguido de los
+    bytes del codigo; el servidor responde con las lineas TIPO:valor y cierra
+    la respuesta con la linea ---TOTAL:n.
+    """
+
+    def __init__(self, ejecutable=EJECUTABLE_FLEX):
+        self.ejecutable = ejecutable
+        self.proceso = None
+        self._candado = threading.Lock()
+
+    def iniciar(self):
+        """Arranca el proceso del servidor si no esta corriendo"""
+        if self.proceso is None or self.proceso.poll() is not None:
+            self.proceso = subprocess.Popen(
+                [self.ejecutable, "--servidor"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE
+            )
+
+    def tokenizar(self, codigo, perfilador=None):
+        """Envia un documento al servidor y retorna sus tokens"""
+        datos = codigo.encode("utf-8")
+
+        with self._candado, tramo(perfilador, "servidor"):
+            self.iniciar()
+            entrada = self.proceso.stdin
+            salida = self.proceso.stdout
+
+            entrada.write(b"%d\n" % len(datos))
+            entrada.write(datos)
+            entrada.flush()
+
+            lineas = []
+            while True:
+                linea = salida.readline()
+                if not linea:
+                    self.proceso = None
+                    raise RuntimeError("El servidor lexico termino inesperadamente")
+                if linea.startswith(b"---TOTAL"):
+                    break
+                lineas.append(linea)
+
+        with tramo(perfilador, "parsear_tokens"):
+            salida_texto = b"".join(lineas).decode("utf-8", errors="replace")
+            return parsear_tokens(salida_texto, incluir_errores=True)
+
+    def cerrar(self):
+        """Cierra la entrada del servidor y espera a que termine"""
+        with self._candado:
+            if self.proceso is not None:
+                self.proceso.stdin.close()
+                self.proceso.wait()
+                self.proceso.stdout.close()
+                self.proceso = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+_cliente_compartido = None
+
+
+def obtener_cliente():
+    """Retorna el ClienteLexer compartido del proceso (se crea al primer uso)"""
+    global _cliente_compartido
+    if _cliente_compartido is None:
+        _cliente_compartido = ClienteLexer()
+    return _cliente_compartido
+
+
+def analizar_lexico(codigo, backend="python", perfilador=None):
+    """Retorna la lista de tokens (incluidos los ERROR) usando el backend elegido.
+
+    Con un perfilador, la etapa se mide como el tramo "lexico" y se cuentan
+    los tokens producidos.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend lexico desconocido: '{backend}'")
+
+    with tramo(perfilador, "lexico"):
+        if backend == "python":
+            tokens = tokenizar(codigo)
+        elif backend == "flex":
+            tokens = tokenizar_flex(codigo, perfilador=perfilador)
+        else:
+            tokens = obtener_cliente().tokenizar(codigo, perfilador)
+
+    if perfilador is not None:
+        perfilador.contar("tokens_lexicos", len(tokens))
+    return tokens
+
+
+def formatear_tokens(tokens, limite=None, total=None):
+    """Genera el mismo texto que imprime analizador.exe.
+
+    Con limite solo se listan los primeros tokens (el total sigue contandolos
+    todos). total permite dar el total ya conocido cuando 'tokens' es solo
+    el comienzo de la lista.
+    """
+    visibles = tokens if limite is None else tokens[:limite]
+    lineas = [f"{token.tipo}:{token.valor}\n" for token in visibles]
+    if total is None:
+        total = sum(1 for token in tokens if token.tipo != "ERROR")
+        if len(visibles) < len(tokens):
+            lineas.append(f"... ({len(tokens) - len(visibles)} tokens mas)\n")
+    elif len(visibles) == limite:
+        lineas.append("...\n")
+    lineas.append(f"\n---TOTAL:{total}\n")
+    return "".join(lineas)
+
+
+def tokens_sintacticos(tokens):
+    """Descarta los tokens ERROR, igual que parsear_tokens"""
+    return [token for token in tokens if token.tipo != "ERROR"]
+
+
+def comparar_tokens(propios, ajenos, con_posicion=False):
+    """Compara dos flujos de tokens.
+
+    Retorna una lista de diferencias (indice, token propio, token ajeno);
+    vacia si los dos flujos coinciden.
+    """
+    if con_posicion:
+        propios = [(t.tipo, t.valor, t.inicio) for t in propios]
+        ajenos = [(t.tipo, t.valor, t.inicio) for t in ajenos]
+    else:
+        propios = [(t.tipo, t.valor) for t in propios]
+        ajenos = [(t.tipo, t.valor) for t in ajenos]
+
+    diferencias = []
+    for i in range(max(len(propios), len(ajenos))):
+        a = propios[i] if i < len(propios) else None
+        b = ajenos[i] if i < len(ajenos) else None
+        if a != b:
+            diferencias.append((i, a, b))
+    return diferencias
+
+
+def comparar_backends(codigo, ejecutable=EJECUTABLE_FLEX):
+    """Compara el backend Python contra el ejecutable de Flex"""
+    return comparar_tokens(tokenizar(codigo), tokenizar_flex(codigo, ejecutable))
+
+
+# Casos de paridad entre backends (solo ASCII: Flex trabaja por bytes y
+# reporta un ERROR por cada byte de un caracter multibyte)
+CASOS_PARIDAD = [
+    "x = 3 + 5\ny = x * 2",
+    "resultado = (a + b) * (c - 4.75) / 2",
+    "3.14 + 2. + .5 + 10",
+    "_var1 = var_2*3.0/(x-1)",
+    "a $ b # c ; 7",
+    "x=1\ty=2\r\nz=3",
+    "123abc 4.5.6 ((()))",
+    "",
+]
+
+
+def verificar_paridad(ejecutable=EJECUTABLE_FLEX, casos=CASOS_PARIDAD):
+    """Ejecuta los casos de paridad contra Flex (texto y binario) y el modo servidor.
+
+    Retorna {(backend, caso): diferencias} con los casos que fallan.
+    """
+    fallos = {}
+    with ClienteLexer(ejecutable) as cliente:
+        for caso in casos:
+            propios = tokenizar(caso)
+            binarios = tokenizar_flex(caso, ejecutable, binario=True)
+            for backend, ajenos, con_posicion in (
+                    ("flex", tokenizar_flex(caso, ejecutable), False),
+                    ("binario", binarios, True),
+                    ("servidor", cliente.tokenizar(caso), False)):
+                diferencias = comparar_tokens(propios, ajenos, con_posicion)
+                if diferencias:
+                    fallos[(backend, caso)] = diferencias
+    return fallos
+
+
+if __name__ == "__main__":
+    import sys
+
+    fallos = verificar_paridad(*sys.argv[1:2])
+    for (backend, caso), diferencias in fallos.items():
+        print(f"DIFERENCIA ({backend}) en {caso!r}:")
+        for i, propio, ajeno in diferencias:
+            print(f"  [{i}] python={propio} {backend}={ajeno}")
+    print("Paridad OK" if not fallos else f"{len(fallos)} caso(s) con diferencias")
+    sys.exit(1 if fallos else 0)
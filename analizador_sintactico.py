@@ -1,271 +1,1109 @@
-class Token:
-    """Representa un token del analisis lexico"""
-    def __init__(self, tipo, valor):
-        self.tipo = tipo
-        self.valor = valor
-    
-    def __repr__(self):
-        return f"Token({self.tipo}, '{self.valor}')"
-
-
-class NodoArbol:
-    """Nodo del arbol sintactico"""
-    def __init__(self, tipo, valor=None, hijos=None):
-        self.tipo = tipo
-        self.valor = valor
-        self.hijos = hijos if hijos else []
-    
-    def agregar_hijo(self, hijo):
-        self.hijos.append(hijo)
-    
-    def __repr__(self):
-        if self.valor:
-            return f"{self.tipo}({self.valor})"
-        return f"{self.tipo}"
-
-
-class AnalizadorSintactico:
-    """Analizador sintactico descendente recursivo"""
-    
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
-        self.errores = []
-    
-    def token_actual(self):
-        """Retorna el token actual sin avanzar"""
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
-    
-    def avanzar(self):
-        """Avanza al siguiente token"""
-        self.pos += 1
-    
-    def esperar(self, tipo_esperado):
-        """Verifica que el token actual sea del tipo esperado y avanza"""
-        token = self.token_actual()
-        if token is None:
-            self.errores.append(f"Error: Se esperaba '{tipo_esperado}' pero se llego al final")
-            return False
-        
-        if token.tipo != tipo_esperado:
-            self.errores.append(f"Error: Se esperaba '{tipo_esperado}' pero se encontro '{token.tipo}' ('{token.valor}')")
-            return False
-        
-        self.avanzar()
-        return True
-    
-    def analizar(self):
-        """Punto de entrada del analisis sintactico"""
-        try:
-            arbol = self.programa()
-            
-            # Verificar que se consumieron todos los tokens
-            if self.token_actual() is not None:
-                self.errores.append(f"Error: Tokens extra despues del final del programa")
-            
-            return arbol, self.errores
-        except Exception as e:
-            self.errores.append(f"Error de analisis: {str(e)}")
-            return None, self.errores
-    
-    # ==================== REGLAS GRAMATICALES ====================
-    
-    def programa(self):
-        """Programa → Sentencia+"""
-        nodo = NodoArbol("Programa")
-        
-        # Debe haber al menos una sentencia
-        if self.token_actual() is None:
-            self.errores.append("Error: Programa vacio")
-            return nodo
-        
-        # Analizar todas las sentencias
-        while self.token_actual() is not None:
-            sentencia = self.sentencia()
-            if sentencia:
-                nodo.agregar_hijo(sentencia)
-            else:
-                # Si hubo error, intentar recuperarse
-                break
-        
-        return nodo
-    
-    def sentencia(self):
-        """Sentencia → Asignacion | Expresion"""
-        token = self.token_actual()
-        
-        if token is None:
-            return None
-        
-        # Si es un identificador, podría ser asignación o expresión
-        if token.tipo == "IDENTIFICADOR":
-            # Mirar el siguiente token (lookahead)
-            if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].tipo == "ASIGNACION":
-                return self.asignacion()
-            else:
-                return self.expresion()
-        else:
-            # Si no es identificador, solo puede ser expresión
-            return self.expresion()
-    
-    def asignacion(self):
-        """Asignacion → IDENTIFICADOR '=' Expresion"""
-        nodo = NodoArbol("Asignacion")
-        
-        # Obtener el identificador
-        token = self.token_actual()
-        if token.tipo != "IDENTIFICADOR":
-            self.errores.append(f"Error: Se esperaba un identificador en asignación")
-            return None
-        
-        nodo_id = NodoArbol("Identificador", token.valor)
-        nodo.agregar_hijo(nodo_id)
-        self.avanzar()
-        
-        # Esperar '='
-        if not self.esperar("ASIGNACION"):
-            return None
-        
-        # Analizar la expresión
-        expr = self.expresion()
-        if expr:
-            nodo.agregar_hijo(expr)
-        
-        return nodo
-    
-    def expresion(self):
-        """Expresion → Termino (('+' | '-') Termino)*"""
-        nodo = self.termino()
-        
-        if nodo is None:
-            return None
-        
-        # Mientras haya + o -
-        while self.token_actual() and self.token_actual().tipo in ["SUMA", "RESTA"]:
-            operador = self.token_actual()
-            self.avanzar()
-            
-            termino_derecho = self.termino()
-            if termino_derecho is None:
-                self.errores.append(f"Error: Se esperaba un termino despues de '{operador.valor}'")
-                return None
-            
-            # Crear nodo operador
-            nodo_op = NodoArbol("Operacion", operador.valor)
-            nodo_op.agregar_hijo(nodo)
-            nodo_op.agregar_hijo(termino_derecho)
-            nodo = nodo_op
-        
-        return nodo
-    
-    def termino(self):
-        """Termino → Factor (('*' | '/') Factor)*"""
-        nodo = self.factor()
-        
-        if nodo is None:
-            return None
-        
-        # Mientras haya * o /
-        while self.token_actual() and self.token_actual().tipo in ["MULTIPLICACION", "DIVISION"]:
-            operador = self.token_actual()
-            self.avanzar()
-            
-            factor_derecho = self.factor()
-            if factor_derecho is None:
-                self.errores.append(f"Error: Se esperaba un factor despues de '{operador.valor}'")
-                return None
-            
-            # Crear nodo operador
-            nodo_op = NodoArbol("Operacion", operador.valor)
-            nodo_op.agregar_hijo(nodo)
-            nodo_op.agregar_hijo(factor_derecho)
-            nodo = nodo_op
-        
-        return nodo
-    
-    def factor(self):
-        """Factor → NUMERO | DECIMAL | IDENTIFICADOR | '(' Expresion ')'"""
-        token = self.token_actual()
-        
-        if token is None:
-            self.errores.append("Error: Se esperaba un factor pero se llego al final")
-            return None
-        
-        # Caso 1: Número
-        if token.tipo == "NUMERO":
-            nodo = NodoArbol("Numero", token.valor)
-            self.avanzar()
-            return nodo
-        
-        # Caso 2: Decimal
-        elif token.tipo == "DECIMAL":
-            nodo = NodoArbol("Decimal", token.valor)
-            self.avanzar()
-            return nodo
-        
-        # Caso 3: Identificador (variable)
-        elif token.tipo == "IDENTIFICADOR":
-            nodo = NodoArbol("Identificador", token.valor)
-            self.avanzar()
-            return nodo
-        
-        # Caso 4: Expresión entre paréntesis
-        elif token.tipo == "PARENTESIS_IZQ":
-            self.avanzar()  # Consumir '('
-            
-            nodo = self.expresion()
-            
-            if not self.esperar("PARENTESIS_DER"):
-                self.errores.append("Error: Falta parentesis de cierre ')'")
-                return None
-            
-            return nodo
-        
-        # Error: token inesperado
-        else:
-            self.errores.append(f"Error: Token inesperado '{token.tipo}' ('{token.valor}')")
-            return None
-
-
-def parsear_tokens(salida_lexico):
-    """Convierte la salida del analizador lexico en lista de tokens"""
-    tokens = []
-    lineas = salida_lexico.strip().split('\n')
-    
-    for linea in lineas:
-        linea = linea.strip()
-        if not linea or linea.startswith('---'):
-            continue
-        
-        if ':' in linea:
-            partes = linea.split(':', 1)
-            tipo = partes[0]
-            valor = partes[1] if len(partes) > 1 else ''
-            
-            if tipo != "ERROR":
-                tokens.append(Token(tipo, valor))
-    
-    return tokens
-
-
-def imprimir_arbol(nodo, nivel=0, prefijo=""):
-    """Imprime el arbol sintactico de forma visual"""
-    if nodo is None:
-        return ""
-    
-    resultado = ""
-    indent = "  " * nivel
-    
-    if nodo.valor:
-        resultado += f"{indent}{prefijo}{nodo.tipo}: {nodo.valor}\n"
-    else:
-        resultado += f"{indent}{prefijo}{nodo.tipo}\n"
-    
-    for i, hijo in enumerate(nodo.hijos):
-        es_ultimo = (i == len(nodo.hijos) - 1)
-        prefijo_hijo = "└─ " if es_ultimo else "├─ "
-        resultado += imprimir_arbol(hijo, nivel + 1, prefijo_hijo)
-    
-    return resultado
\ No newline at end of file
+import gc
+import io
+import json
+import sys
+from array import array
+from contextlib import contextmanager
+from enum import IntEnum
+
+
+class TipoToken(IntEnum):
+    """Clases de token como enteros pequenos.
+
+    Los valores coinciden con los codigos del formato binario de
+    analizador.l (FIN solo se usa como marca de cierre en ese formato).
+    """
+    FIN = 0
+    NUMERO = 1
+    DECIMAL = 2
+    IDENTIFICADOR = 3
+    ASIGNACION = 4
+    SUMA = 5
+    RESTA = 6
+    MULTIPLICACION = 7
+    DIVISION = 8
+    PARENTESIS_IZQ = 9
+    PARENTESIS_DER = 10
+    ERROR = 11
+
+
+@contextmanager
+def sin_recolector():
+    """Pausa el recolector de ciclos mientras se crean muchos objetos.
+
+    Tokens y nodos no forman ciclos; sin la pausa el recolector recorre una
+    y otra vez todos los objetos vivos a medida que la lista o el arbol crece.
+    """
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+
+# Clase de un token a partir de su nombre; -1 para nombres desconocidos
+CLASE_POR_TIPO = {tipo.name: int(tipo) for tipo in TipoToken}
+
+
+class Token:
+    """Representa un token del analisis lexico"""
+    __slots__ = ("tipo", "valor", "inicio", "clase", "linea")
+    
+    def __init__(self, tipo, valor, inicio=None, clase=None, linea=None):
+        self.tipo = tipo
+        self.valor = valor
+        self.inicio = inicio  # desplazamiento en la fuente, si se conoce
+        self.clase = CLASE_POR_TIPO.get(tipo, -1) if clase is None else clase
+        self.linea = linea  # linea en la fuente (desde 1), si se conoce
+    
+    def __repr__(self):
+        return f"Token({self.tipo}, '{self.valor}')"
+
+
+class ErrorSintactico(str):
+    """Mensaje de error sintactico que recuerda donde ocurrio.
+
+    Es una cadena (las listas de errores siguen siendo listas de mensajes)
+    con posicion = indice del token donde se detecto el error, mas el
+    desplazamiento y la linea de ese token si el lexico los conoce, y la
+    columna (desde 1) con tokens de una fuente mapeada.
+    """
+    
+    def __new__(cls, mensaje, posicion=None, token=None):
+        error = super().__new__(cls, mensaje)
+        error.posicion = posicion
+        error.inicio = token.inicio if token is not None else None
+        error.linea = token.linea if token is not None else None
+        error.columna = getattr(token, "columna", None)
+        return error
+
+
+class NodoArbol:
+    """Nodo del arbol sintactico"""
+    def __init__(self, tipo, valor=None, hijos=None):
+        self.tipo = tipo
+        self.valor = valor
+        self.hijos = hijos if hijos else []
+    
+    def agregar_hijo(self, hijo):
+        self.hijos.append(hijo)
+    
+    def __repr__(self):
+        if self.valor:
+            return f"{self.tipo}({self.valor})"
+        return f"{self.tipo}"
+
+
+class ConstructorNodos:
+    """Crea los nodos del arbol como objetos NodoArbol"""
+    
+    def nodo(self, tipo, valor=None):
+        return NodoArbol(tipo, valor)
+    
+    def operacion(self, valor, izquierdo, derecho):
+        return NodoArbol("Operacion", valor, [izquierdo, derecho])
+    
+    def agregar_hijo(self, padre, hijo):
+        padre.hijos.append(hijo)
+    
+    def resultado(self, raiz):
+        return raiz
+
+
+class ArbolCompacto:
+    """Arbol sintactico guardado en columnas paralelas (struct-of-arrays).
+
+    Cada nodo es un indice entero. Las columnas array('i') guardan el tipo y
+    el valor (indices en la tabla de cadenas internadas, -1 si no hay valor),
+    el primer hijo y el siguiente hermano (-1 si no hay). Implementa la misma
+    interfaz que ConstructorNodos, asi el analizador puede construirlo
+    directamente sin crear un objeto por nodo.
+    """
+    
+    def __init__(self):
+        self.tipos = array('i')
+        self.valores = array('i')
+        self.primer_hijo = array('i')
+        self.siguiente_hermano = array('i')
+        self._ultimo_hijo = array('i')
+        self.cadenas = []
+        self._indice_cadena = {}
+        self.raiz = -1
+    
+    def __len__(self):
+        return len(self.tipos)
+    
+    def internar(self, texto):
+        """Retorna el indice de la cadena en la tabla, agregandola si es nueva"""
+        indice = self._indice_cadena.get(texto)
+        if indice is None:
+            indice = self._indice_cadena[texto] = len(self.cadenas)
+            self.cadenas.append(texto)
+        return indice
+    
+    def internar_varias(self, textos):
+        """Lista de indices de varias cadenas, como internar() sobre cada una"""
+        indices = self._indice_cadena
+        cadenas = self.cadenas
+        resultado = []
+        for texto in textos:
+            indice = indices.get(texto)
+            if indice is None:
+                indice = indices[texto] = len(cadenas)
+                cadenas.append(texto)
+            resultado.append(indice)
+        return resultado
+    
+    def nodo(self, tipo, valor=None):
+        indice = len(self.tipos)
+        self.tipos.append(self.internar(tipo))
+        self.valores.append(-1 if valor is None else self.internar(valor))
+        self.primer_hijo.append(-1)
+        self.siguiente_hermano.append(-1)
+        self._ultimo_hijo.append(-1)
+        return indice
+    
+    def operacion(self, valor, izquierdo, derecho):
+        indice = self.nodo("Operacion", valor)
+        self.primer_hijo[indice] = izquierdo
+        self.siguiente_hermano[izquierdo] = derecho
+        self._ultimo_hijo[indice] = derecho
+        return indice
+    
+    def agregar_hijo(self, padre, hijo):
+        ultimo = self._ultimo_hijo[padre]
+        if ultimo < 0:
+            self.primer_hijo[padre] = hijo
+        else:
+            self.siguiente_hermano[ultimo] = hijo
+        self._ultimo_hijo[padre] = hijo
+    
+    def resultado(self, raiz):
+        self.raiz = raiz
+        return VistaNodo(self, raiz)
+    
+    def vista(self, indice=None):
+        """Retorna una VistaNodo del nodo indicado (por defecto la raiz)"""
+        return VistaNodo(self, self.raiz if indice is None else indice)
+    
+    def hijos(self, indice):
+        """Itera los indices de los hijos de un nodo"""
+        hijo = self.primer_hijo[indice]
+        siguiente = self.siguiente_hermano
+        while hijo >= 0:
+            yield hijo
+            hijo = siguiente[hijo]
+    
+    def a_nodo(self, indice=None):
+        """Materializa el subarbol como objetos NodoArbol (sin recursion)"""
+        if indice is None:
+            indice = self.raiz
+        cadenas = self.cadenas
+        
+        def crear(i):
+            valor = self.valores[i]
+            return NodoArbol(cadenas[self.tipos[i]], None if valor < 0 else cadenas[valor])
+        
+        raiz = crear(indice)
+        pendientes = [(indice, raiz)]
+        while pendientes:
+            i, nodo = pendientes.pop()
+            for hijo in self.hijos(i):
+                nodo_hijo = crear(hijo)
+                nodo.hijos.append(nodo_hijo)
+                pendientes.append((hijo, nodo_hijo))
+        return raiz
+
+
+class VistaNodo:
+    """Vista liviana de un nodo de un ArbolCompacto con la interfaz de NodoArbol"""
+    __slots__ = ("arbol", "indice")
+    
+    def __init__(self, arbol, indice):
+        self.arbol = arbol
+        self.indice = indice
+    
+    @property
+    def tipo(self):
+        return self.arbol.cadenas[self.arbol.tipos[self.indice]]
+    
+    @property
+    def valor(self):
+        valor = self.arbol.valores[self.indice]
+        return None if valor < 0 else self.arbol.cadenas[valor]
+    
+    @property
+    def hijos(self):
+        return [VistaNodo(self.arbol, hijo) for hijo in self.arbol.hijos(self.indice)]
+    
+    def a_nodo(self):
+        """Materializa este subarbol como objetos NodoArbol"""
+        return self.arbol.a_nodo(self.indice)
+    
+    def __eq__(self, otro):
+        return (isinstance(otro, VistaNodo) and self.arbol is otro.arbol
+                and self.indice == otro.indice)
+    
+    def __hash__(self):
+        return hash((id(self.arbol), self.indice))
+    
+    def __repr__(self):
+        valor = self.valor
+        if valor:
+            return f"{self.tipo}({valor})"
+        return f"{self.tipo}"
+
+
+# Tabla de precedencia de operadores binarios (todos asociativos por la izquierda)
+PRECEDENCIA = {
+    "SUMA": 1,
+    "RESTA": 1,
+    "MULTIPLICACION": 2,
+    "DIVISION": 2,
+}
+_PRECEDENCIA_CLASE = {CLASE_POR_TIPO[tipo]: nivel for tipo, nivel in PRECEDENCIA.items()}
+
+# Nombre de la regla que se esperaba a la derecha de cada nivel (para los errores)
+_OPERANDO_DE_NIVEL = {1: "termino", 2: "factor"}
+# (nivel, indice en el marco) de mayor a menor precedencia
+_NIVELES = tuple((nivel, 2 * (nivel - 1)) for nivel in sorted(_OPERANDO_DE_NIVEL, reverse=True))
+
+# Tablas de despacho del camino caliente, indexadas por clase de token
+_HOJAS = {
+    int(TipoToken.NUMERO): "Numero",
+    int(TipoToken.DECIMAL): "Decimal",
+    int(TipoToken.IDENTIFICADOR): "Identificador",
+}
+_ADITIVOS = frozenset({int(TipoToken.SUMA), int(TipoToken.RESTA)})
+_MULTIPLICATIVOS = frozenset({int(TipoToken.MULTIPLICACION), int(TipoToken.DIVISION)})
+_IDENTIFICADOR = int(TipoToken.IDENTIFICADOR)
+_ASIGNACION = int(TipoToken.ASIGNACION)
+_PARENTESIS_IZQ = int(TipoToken.PARENTESIS_IZQ)
+_PARENTESIS_DER = int(TipoToken.PARENTESIS_DER)
+_ERROR = int(TipoToken.ERROR)
+
+# Clases que pueden cerrar una sentencia y clases que solo pueden abrir una nueva
+_FIN_DE_OPERANDO = frozenset({int(TipoToken.NUMERO), int(TipoToken.DECIMAL),
+                              int(TipoToken.IDENTIFICADOR), _PARENTESIS_DER})
+_INICIO_DE_OPERANDO = frozenset({int(TipoToken.NUMERO), int(TipoToken.DECIMAL),
+                                 int(TipoToken.IDENTIFICADOR), _PARENTESIS_IZQ})
+
+MOTORES = ("recursivo", "iterativo")
+
+ARBOLES = ("objetos", "compacto")
+
+
+class AnalizadorSintactico:
+    """Analizador sintactico descendente recursivo.
+
+    Con recuperacion=True (modo panico) una sentencia con errores no detiene
+    el analisis: se agrega al Programa como nodo Error (con la sentencia
+    parcial como hijo, si la hay) y el analisis se resincroniza en la
+    siguiente sentencia. Se detiene al acumular max_errores errores (None: sin
+    limite).
+
+    Con un perfilador activo (ver perfilado.Perfilador) analizar() se mide
+    como el tramo "sintactico" y se registran contadores de tokens, nodos,
+    profundidad de parentesis, anticipaciones, sincronizaciones y errores.
+    Sin perfilador el camino caliente no cambia.
+    """
+    
+    def __init__(self, tokens, motor="recursivo", arbol="objetos",
+                 recuperacion=False, max_errores=100, perfilador=None):
+        self.tokens = tokens
+        self.pos = 0
+        self.errores = []
+        self.recuperacion = recuperacion
+        self.max_errores = max_errores
+        self.sincronizaciones = 0
+        
+        if motor not in MOTORES:
+            raise ValueError(f"Motor sintactico desconocido: '{motor}'")
+        self.motor = motor
+        if motor == "iterativo":
+            self.expresion = self.expresion_iterativa
+        
+        if arbol not in ARBOLES:
+            raise ValueError(f"Representacion de arbol desconocida: '{arbol}'")
+        self.constructor = ArbolCompacto() if arbol == "compacto" else ConstructorNodos()
+        self._nodo = self.constructor.nodo
+        self._operacion = self.constructor.operacion
+        self._agregar_hijo = self.constructor.agregar_hijo
+        
+        self.perfilador = perfilador if perfilador is not None and perfilador.activo else None
+        if self.perfilador is not None:
+            self._instrumentar()
+    
+    def token_actual(self):
+        """Retorna el token actual sin avanzar"""
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None
+    
+    def avanzar(self):
+        """Avanza al siguiente token"""
+        self.pos += 1
+    
+    def _error(self, mensaje, pos=None):
+        """Registra un error en la posicion indicada (por defecto la actual)"""
+        if pos is None:
+            pos = self.pos
+        # Al final, las listas de una fuente mapeada dan la posicion de su fin
+        token = self.tokens[pos] if pos < len(self.tokens) else getattr(self.tokens, "fin", None)
+        self.errores.append(ErrorSintactico(mensaje, pos, token))
+    
+    def esperar(self, tipo_esperado):
+        """Verifica que el token actual sea del tipo esperado y avanza"""
+        token = self.token_actual()
+        if token is None:
+            self._error(f"Error: Se esperaba '{tipo_esperado}' pero se llego al final")
+            return False
+        
+        if token.tipo != tipo_esperado:
+            self._error(f"Error: Se esperaba '{tipo_esperado}' pero se encontro '{token.tipo}' ('{token.valor}')")
+            return False
+        
+        self.avanzar()
+        return True
+    
+    def analizar(self):
+        """Punto de entrada del analisis sintactico"""
+        if self.perfilador is None:
+            return self._analizar()
+        with self.perfilador.tramo("sintactico"):
+            resultado = self._analizar()
+        self._registrar_contadores()
+        return resultado
+    
+    def _analizar(self):
+        try:
+            with sin_recolector():
+                arbol = self.constructor.resultado(self.programa())
+            
+            # Verificar que se consumieron todos los tokens
+            if self.token_actual() is not None:
+                self._error(f"Error: Tokens extra despues del final del programa")
+            
+            return arbol, self.errores
+        except Exception as e:
+            self._error(f"Error de analisis: {str(e)}")
+            return None, self.errores
+    
+    # ==================== REGLAS GRAMATICALES ====================
+    
+    def programa(self):
+        """Programa → Sentencia+"""
+        nodo = self._nodo("Programa")
+        
+        # Debe haber al menos una sentencia
+        if self.token_actual() is None:
+            self._error("Error: Programa vacio")
+            return nodo
+        
+        # Analizar todas las sentencias
+        while self.token_actual() is not None:
+            inicio = self.pos
+            errores_previos = len(self.errores)
+            sentencia = self.sentencia()
+            if self.recuperacion and len(self.errores) > errores_previos:
+                if not self.recuperar(nodo, inicio, errores_previos, sentencia):
+                    break
+            elif sentencia is not None:
+                self._agregar_hijo(nodo, sentencia)
+            else:
+                # Si hubo error, intentar recuperarse
+                break
+        
+        return nodo
+    
+    # ==================== RECUPERACION DE ERRORES ====================
+    
+    def recuperar(self, programa, inicio, primer_error, parcial):
+        """Modo panico: agrega un nodo Error por la sentencia fallida y se resincroniza.
+
+        Retorna False si se alcanzo max_errores y el analisis debe detenerse.
+        """
+        nodo_error = self._nodo("Error", self.errores[primer_error].removeprefix("Error: "))
+        if parcial is not None:
+            self._agregar_hijo(nodo_error, parcial)
+        self._agregar_hijo(programa, nodo_error)
+        self.sincronizaciones += 1
+        
+        if self.max_errores is not None and len(self.errores) >= self.max_errores:
+            self._error(f"Error: Se alcanzo el limite de {self.max_errores} errores, "
+                        f"se detiene el analisis")
+            self.pos = len(self.tokens)  # el resto no se analiza ni se reporta como extra
+            return False
+        
+        self.sincronizar(inicio)
+        return True
+    
+    def sincronizar(self, inicio):
+        """Salta tokens hasta el comienzo probable de la siguiente sentencia.
+
+        Puntos de sincronizacion: un par IDENTIFICADOR '=' (la asignacion solo
+        existe a nivel de sentencia, asi que vale a cualquier profundidad) o,
+        fuera de parentesis, un operando que empieza en una linea posterior a
+        la del token anterior. Siempre avanza al menos un token desde inicio.
+        """
+        tokens = self.tokens
+        total = len(tokens)
+        pos = self.pos if self.pos > inicio else inicio + 1
+        
+        # Parentesis que quedaron abiertos dentro de la sentencia fallida
+        profundidad = 0
+        for token in tokens[inicio:pos]:
+            if token.clase == _PARENTESIS_IZQ:
+                profundidad += 1
+            elif token.clase == _PARENTESIS_DER and profundidad:
+                profundidad -= 1
+        
+        while pos < total:
+            token = tokens[pos]
+            clase = token.clase
+            if (clase == _IDENTIFICADOR and pos + 1 < total
+                    and tokens[pos + 1].clase == _ASIGNACION):
+                break
+            if profundidad == 0 and clase in _INICIO_DE_OPERANDO:
+                linea = token.linea
+                anterior = tokens[pos - 1].linea
+                if linea is not None and anterior is not None and linea > anterior:
+                    break
+            if clase == _PARENTESIS_IZQ:
+                profundidad += 1
+            elif clase == _PARENTESIS_DER and profundidad:
+                profundidad -= 1
+            pos += 1
+        
+        self.pos = pos
+    
+    def sentencia(self):
+        """Sentencia → Asignacion | Expresion"""
+        token = self.token_actual()
+        
+        if token is None:
+            return None
+        
+        # Si es un identificador, podría ser asignación o expresión
+        if token.clase == _IDENTIFICADOR:
+            # Mirar el siguiente token (lookahead)
+            if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].clase == _ASIGNACION:
+                return self.asignacion()
+            else:
+                return self.expresion()
+        else:
+            # Si no es identificador, solo puede ser expresión
+            return self.expresion()
+    
+    def asignacion(self):
+        """Asignacion → IDENTIFICADOR '=' Expresion"""
+        nodo = self._nodo("Asignacion")
+        
+        # Obtener el identificador
+        token = self.token_actual()
+        if token.clase != _IDENTIFICADOR:
+            self._error(f"Error: Se esperaba un identificador en asignación")
+            return None
+        
+        nodo_id = self._nodo("Identificador", token.valor)
+        self._agregar_hijo(nodo, nodo_id)
+        self.avanzar()
+        
+        # Esperar '='
+        if not self.esperar("ASIGNACION"):
+            return None
+        
+        # Analizar la expresión
+        expr = self.expresion()
+        if expr is not None:
+            self._agregar_hijo(nodo, expr)
+        
+        return nodo
+    
+    def expresion(self):
+        """Expresion → Termino (('+' | '-') Termino)*"""
+        nodo = self.termino()
+        
+        if nodo is None:
+            return None
+        
+        # Mientras haya + o -
+        tokens = self.tokens
+        while self.pos < len(tokens):
+            operador = tokens[self.pos]
+            if operador.clase not in _ADITIVOS:
+                break
+            self.pos += 1
+            
+            termino_derecho = self.termino()
+            if termino_derecho is None:
+                self._error(f"Error: Se esperaba un termino despues de '{operador.valor}'")
+                return None
+            
+            # Crear nodo operador
+            nodo = self._operacion(operador.valor, nodo, termino_derecho)
+        
+        return nodo
+    
+    def termino(self):
+        """Termino → Factor (('*' | '/') Factor)*"""
+        nodo = self.factor()
+        
+        if nodo is None:
+            return None
+        
+        # Mientras haya * o /
+        tokens = self.tokens
+        while self.pos < len(tokens):
+            operador = tokens[self.pos]
+            if operador.clase not in _MULTIPLICATIVOS:
+                break
+            self.pos += 1
+            
+            factor_derecho = self.factor()
+            if factor_derecho is None:
+                self._error(f"Error: Se esperaba un factor despues de '{operador.valor}'")
+                return None
+            
+            # Crear nodo operador
+            nodo = self._operacion(operador.valor, nodo, factor_derecho)
+        
+        return nodo
+    
+    def factor(self):
+        """Factor → NUMERO | DECIMAL | IDENTIFICADOR | '(' Expresion ')'"""
+        pos = self.pos
+        if pos >= len(self.tokens):
+            self._error("Error: Se esperaba un factor pero se llego al final")
+            return None
+        token = self.tokens[pos]
+        
+        # Casos 1 a 3: Numero, Decimal o Identificador (hoja)
+        clase = token.clase
+        if clase in _HOJAS:
+            self.pos = pos + 1
+            return self._nodo(_HOJAS[clase], token.valor)
+        
+        # Caso 4: Expresión entre paréntesis
+        elif clase == _PARENTESIS_IZQ:
+            self.avanzar()  # Consumir '('
+            
+            nodo = self.expresion()
+            
+            if not self.esperar("PARENTESIS_DER"):
+                self._error("Error: Falta parentesis de cierre ')'")
+                return None
+            
+            return nodo
+        
+        # Error: token inesperado
+        else:
+            self._error(f"Error: Token inesperado '{token.tipo}' ('{token.valor}')")
+            return None
+
+    
+    # ==================== PERFILADO ====================
+    
+    def _instrumentar(self):
+        """Envuelve la creacion de nodos y sentencia() para contarlas.
+
+        Solo se llama con un perfilador activo; los metodos de la gramatica
+        y el motor iterativo usan los atributos de instancia envueltos.
+        """
+        self.nodos_creados = 0
+        self.anticipaciones = 0
+        nodo, operacion, sentencia = self._nodo, self._operacion, self.sentencia
+        
+        def nodo_contado(tipo, valor=None):
+            self.nodos_creados += 1
+            return nodo(tipo, valor)
+        
+        def operacion_contada(valor, izquierdo, derecho):
+            self.nodos_creados += 1
+            return operacion(valor, izquierdo, derecho)
+        
+        def sentencia_contada():
+            # Un IDENTIFICADOR al inicio obliga a mirar el token siguiente
+            token = self.token_actual()
+            if token is not None and token.clase == _IDENTIFICADOR:
+                self.anticipaciones += 1
+            return sentencia()
+        
+        self._nodo = nodo_contado
+        self._operacion = operacion_contada
+        self.sentencia = sentencia_contada
+    
+    def _registrar_contadores(self):
+        perfilador = self.perfilador
+        perfilador.contar("tokens_consumidos", min(self.pos, len(self.tokens)))
+        perfilador.contar("nodos_creados", self.nodos_creados)
+        perfilador.maximo("profundidad_maxima", profundidad_parentesis(self.tokens[:self.pos]))
+        perfilador.contar("anticipaciones", self.anticipaciones)
+        perfilador.contar("sincronizaciones", self.sincronizaciones)
+        perfilador.contar("errores", len(self.errores))
+    
+    # ==================== MOTOR ITERATIVO ====================
+    
+    def expresion_iterativa(self):
+        """Expresion con precedencia de operadores y pila explicita.
+
+        Construye los mismos nodos y reporta los mismos errores que
+        expresion/termino/factor, pero cada nivel de parentesis ocupa un
+        marco en una lista en lugar de un nivel de la pila de Python.
+        Un marco guarda, por nivel de precedencia, el operando acumulado y el
+        operador pendiente: [acumulado_1, operador_1, acumulado_2, operador_2].
+        """
+        tokens = self.tokens
+        total = len(tokens)
+        precedencia = _PRECEDENCIA_CLASE
+        hojas = _HOJAS
+        crear_nodo = self._nodo
+        crear_operacion = self._operacion
+        niveles = _NIVELES
+        tamano_marco = 2 * len(niveles)
+        pila = []
+        marco = [None] * tamano_marco
+        pos = self.pos
+        
+        while True:
+            # ---- Leer un factor ----
+            if pos >= total:
+                self._error("Error: Se esperaba un factor pero se llego al final", pos)
+                valor = None
+            else:
+                token = tokens[pos]
+                clase = token.clase
+                if clase in hojas:
+                    valor = crear_nodo(hojas[clase], token.valor)
+                    pos += 1
+                elif clase == _PARENTESIS_IZQ:
+                    pos += 1
+                    pila.append(marco)
+                    marco = [None] * tamano_marco
+                    continue
+                else:
+                    self._error(f"Error: Token inesperado '{token.tipo}' ('{token.valor}')", pos)
+                    valor = None
+            
+            # ---- Reducir el factor hacia arriba ----
+            while True:
+                if valor is None:
+                    # Propagar el fallo como lo harian termino y expresion
+                    for nivel, i in niveles:
+                        operador = marco[i + 1]
+                        if operador is not None:
+                            self._error(f"Error: Se esperaba un {_OPERANDO_DE_NIVEL[nivel]} "
+                                        f"despues de '{operador.valor}'", pos)
+                    self.pos = pos
+                    if not pila:
+                        return None
+                    if not self.esperar("PARENTESIS_DER"):
+                        self._error("Error: Falta parentesis de cierre ')'")
+                    pos = self.pos
+                    marco = pila.pop()
+                    continue
+                
+                # Aplicar operadores pendientes de mayor a menor precedencia
+                siguiente = tokens[pos] if pos < total else None
+                nivel_siguiente = precedencia.get(siguiente.clase, 0) if siguiente else 0
+                
+                for nivel, i in niveles:
+                    operador = marco[i + 1]
+                    if operador is not None:
+                        valor = crear_operacion(operador.valor, marco[i], valor)
+                    if nivel_siguiente == nivel:
+                        marco[i] = valor
+                        marco[i + 1] = siguiente
+                        break
+                    marco[i] = marco[i + 1] = None
+                
+                if nivel_siguiente:
+                    pos += 1
+                    break
+                
+                # Expresion completa en este nivel de parentesis
+                self.pos = pos
+                if not pila:
+                    return valor
+                if not self.esperar("PARENTESIS_DER"):
+                    self._error("Error: Falta parentesis de cierre ')'")
+                    valor = None
+                pos = self.pos
+                marco = pila.pop()
+
+
+def profundidad_parentesis(tokens):
+    """Mayor anidamiento de parentesis en una secuencia de tokens"""
+    profundidad = maxima = 0
+    for token in tokens:
+        clase = token.clase
+        if clase == _PARENTESIS_IZQ:
+            profundidad += 1
+            if profundidad > maxima:
+                maxima = profundidad
+        elif clase == _PARENTESIS_DER and profundidad:
+            profundidad -= 1
+    return maxima
+
+
+def dividir_sentencias(tokens):
+    """Agrupa un flujo de tokens en sentencias, leyendolo de forma perezosa.
+
+    Una sentencia termina cuando, fuera de parentesis, a un operando le sigue
+    un token que solo puede empezar otra sentencia; es justo el punto donde
+    programa() vuelve a llamar a sentencia(). Basta un token de anticipacion.
+    Los tokens ERROR se descartan, igual que en parsear_tokens.
+    """
+    grupo = []
+    profundidad = 0
+    anterior = None
+    
+    for token in tokens:
+        clase = token.clase
+        if clase == _ERROR:
+            continue
+        if (profundidad == 0 and anterior in _FIN_DE_OPERANDO
+                and clase in _INICIO_DE_OPERANDO):
+            yield grupo
+            grupo = []
+        
+        if clase == _PARENTESIS_IZQ:
+            profundidad += 1
+        elif clase == _PARENTESIS_DER:
+            profundidad -= 1
+        grupo.append(token)
+        anterior = clase
+    
+    if grupo:
+        yield grupo
+
+
+class AnalizadorFlujo:
+    """Analisis sintactico sentencia por sentencia sobre un flujo de tokens.
+
+    Itera las sentencias (Asignacion o expresion) a medida que se completan,
+    sin materializar la lista de tokens ni el Programa completo, por lo que la
+    memoria no depende del tamano de la entrada. Los errores se acumulan en
+    self.errores con los mismos mensajes que AnalizadorSintactico.analizar.
+    """
+    
+    def __init__(self, tokens, motor="recursivo"):
+        self.tokens = tokens
+        self.motor = motor
+        self.errores = []
+        self.sentencias = 0
+    
+    def __iter__(self):
+        grupos = dividir_sentencias(self.tokens)
+        vacio = True
+        
+        for grupo in grupos:
+            vacio = False
+            analizador = AnalizadorSintactico(grupo, self.motor)
+            detenido = False
+            try:
+                while analizador.token_actual() is not None:
+                    sentencia = analizador.sentencia()
+                    if sentencia is None:
+                        # programa() se detiene en la primera sentencia sin nodo
+                        detenido = True
+                        break
+                    self.sentencias += 1
+                    yield sentencia
+            except Exception as e:
+                analizador._error(f"Error de analisis: {str(e)}")
+                self.errores.extend(analizador.errores)
+                return
+            
+            self.errores.extend(analizador.errores)
+            if detenido:
+                if (analizador.token_actual() is not None
+                        or next(grupos, None) is not None):
+                    self.errores.append("Error: Tokens extra despues del final del programa")
+                return
+        
+        if vacio:
+            self.errores.append("Error: Programa vacio")
+
+
+def parsear_tokens(salida_lexico, incluir_errores=False):
+    """Convierte la salida del analizador lexico en lista de tokens"""
+    tokens = []
+    lineas = salida_lexico.strip().split('\n')
+    
+    with sin_recolector():
+        for linea in lineas:
+            linea = linea.strip()
+            if not linea or linea.startswith('---'):
+                continue
+            
+            if ':' in linea:
+                partes = linea.split(':', 1)
+                tipo = partes[0]
+                valor = partes[1] if len(partes) > 1 else ''
+                
+                if tipo != "ERROR" or incluir_errores:
+                    tokens.append(Token(tipo, valor))
+    
+    return tokens
+
+
+def imprimir_arbol(nodo, nivel=0, prefijo=""):
+    """Imprime el arbol sintactico de forma visual"""
+    if nodo is None:
+        return ""
+    
+    resultado = io.StringIO()
+    escribir_arbol(nodo, resultado, nivel=nivel, prefijo=prefijo)
+    return resultado.getvalue()
+
+
+FORMATOS_ARBOL = ("texto", "json", "sexpr")
+
+
+class _Salida:
+    """Acumula fragmentos y los entrega al destino en bloques grandes"""
+    
+    def __init__(self, destino):
+        self.escribir_destino = destino if callable(destino) else destino.write
+        self.fragmentos = []
+    
+    def vaciar(self):
+        if self.fragmentos:
+            self.escribir_destino("".join(self.fragmentos))
+            self.fragmentos.clear()
+
+
+# Cantidad de nodos entre entregas al destino
+_NODOS_POR_BLOQUE = 4096
+
+
+def escribir_arbol(nodo, destino, formato="texto", limite_profundidad=None,
+                   limite_nodos=None, nivel=0, prefijo=""):
+    """Escribe el arbol en un destino de texto, en tiempo lineal y sin recursion.
+
+    destino puede ser cualquier objeto con write() (io.StringIO, un archivo
+    abierto) o una funcion que recibe cada bloque de texto (p. ej. un widget).
+    limite_profundidad y limite_nodos permiten generar vistas previas
+    truncadas; la parte omitida se indica con "...".
+    Retorna la cantidad de nodos escritos.
+    """
+    if formato not in FORMATOS_ARBOL:
+        raise ValueError(f"Formato de arbol desconocido: '{formato}'")
+    if nodo is None:
+        return 0
+    
+    salida = _Salida(destino)
+    escritor = {"texto": _escribir_texto, "json": _escribir_json, "sexpr": _escribir_sexpr}[formato]
+    with sin_recolector():
+        escritos = escritor(nodo, salida,
+                            sys.maxsize if limite_profundidad is None else limite_profundidad,
+                            sys.maxsize if limite_nodos is None else limite_nodos,
+                            nivel, prefijo)
+    salida.vaciar()
+    return escritos
+
+
+def _escribir_texto(raiz, salida, limite_profundidad, limite_nodos, nivel, prefijo):
+    agregar = salida.fragmentos.append
+    escritos = 0
+    pendientes = [(raiz, nivel, prefijo)]
+    sacar = pendientes.pop
+    apilar = pendientes.append
+    
+    while pendientes:
+        nodo, nivel_nodo, prefijo_nodo = sacar()
+        indent = "  " * nivel_nodo
+        
+        if escritos >= limite_nodos:
+            agregar(f"{indent}{prefijo_nodo}... (arbol truncado)\n")
+            break
+        
+        valor = nodo.valor
+        if valor:
+            agregar(f"{indent}{prefijo_nodo}{nodo.tipo}: {valor}\n")
+        else:
+            agregar(f"{indent}{prefijo_nodo}{nodo.tipo}\n")
+        escritos += 1
+        if not escritos % _NODOS_POR_BLOQUE:
+            salida.vaciar()
+        
+        hijos = nodo.hijos
+        if not hijos:
+            continue
+        siguiente = nivel_nodo + 1
+        if siguiente - nivel >= limite_profundidad:
+            agregar(f"{indent}  └─ ...\n")
+            continue
+        
+        ultimo = len(hijos) - 1
+        apilar((hijos[ultimo], siguiente, "└─ "))
+        for i in range(ultimo - 1, -1, -1):
+            apilar((hijos[i], siguiente, "├─ "))
+    
+    return escritos
+
+
+# Marca en la pila de los escritores estructurados: cerrar el nodo abierto
+_CERRAR = object()
+
+
+def _escribir_json(raiz, salida, limite_profundidad, limite_nodos, nivel, prefijo):
+    escribir = salida.fragmentos.append
+    escritos = 0
+    # Cada entrada es (nodo, profundidad, es_primer_hijo) o la marca _CERRAR
+    pendientes = [(raiz, 0, True)]
+    
+    while pendientes:
+        entrada = pendientes.pop()
+        if entrada is _CERRAR:
+            escribir("]}")
+            continue
+        
+        nodo, profundidad, primero = entrada
+        separador = "" if primero else ", "
+        if escritos >= limite_nodos:
+            escribir(f'{separador}{{"truncado": true}}')
+            # Descartar los hermanos y descendientes pendientes de este nivel
+            while pendientes and pendientes[-1] is not _CERRAR:
+                pendientes.pop()
+            continue
+        
+        escribir(f'{separador}{{"tipo": {json.dumps(nodo.tipo)}, '
+                 f'"valor": {json.dumps(nodo.valor)}')
+        escritos += 1
+        if not escritos % _NODOS_POR_BLOQUE:
+            salida.vaciar()
+        
+        hijos = nodo.hijos
+        if hijos and profundidad + 1 >= limite_profundidad:
+            escribir(', "hijos": [], "truncado": true}')
+            continue
+        
+        escribir(', "hijos": [')
+        pendientes.append(_CERRAR)
+        for i in range(len(hijos) - 1, -1, -1):
+            pendientes.append((hijos[i], profundidad + 1, i == 0))
+    
+    escribir("\n")
+    return escritos
+
+
+def _atomo(valor):
+    """Valor de una hoja en S-expresion; se entrecomilla si no es un atomo simple"""
+    if valor and not any(c in valor for c in ' ()"\\\n\t'):
+        return valor
+    return json.dumps(valor)
+
+
+def _escribir_sexpr(raiz, salida, limite_profundidad, limite_nodos, nivel, prefijo):
+    escribir = salida.fragmentos.append
+    escritos = 0
+    pendientes = [(raiz, 0, True)]
+    
+    while pendientes:
+        entrada = pendientes.pop()
+        if entrada is _CERRAR:
+            escribir(")")
+            continue
+        
+        nodo, profundidad, primero = entrada
+        separador = "" if primero else " "
+        if escritos >= limite_nodos:
+            escribir(f"{separador}...")
+            # Descartar los hermanos y descendientes pendientes de este nivel
+            while pendientes and pendientes[-1] is not _CERRAR:
+                pendientes.pop()
+            continue
+        
+        escribir(f"{separador}({nodo.tipo}")
+        if nodo.valor is not None:
+            escribir(f" {_atomo(nodo.valor)}")
+        escritos += 1
+        if not escritos % _NODOS_POR_BLOQUE:
+            salida.vaciar()
+        
+        hijos = nodo.hijos
+        if hijos and profundidad + 1 >= limite_profundidad:
+            escribir(" ...)")
+            continue
+        
+        pendientes.append(_CERRAR)
+        for i in range(len(hijos) - 1, -1, -1):
+            pendientes.append((hijos[i], profundidad + 1, False))
+    
+    escribir("\n")
+    return escritos
+
+
+# Codigos de tipo del formato binario de analizador.exe --binario
+# (el indice es el codigo; 0 marca el registro FIN con el total de tokens)
+TIPOS_BINARIOS = tuple(tipo.name for tipo in TipoToken)
+
+_CODIGO_ERROR = int(TipoToken.ERROR)
+
+# Lexemas fijos de los operadores: no hace falta decodificarlos del buffer
+_LEXEMAS_FIJOS = (None, None, None, None, "=", "+", "-", "*", "/", "(", ")", None)
+
+
+def decodificar_tokens(datos, incluir_errores=False):
+    """Convierte la salida binaria del analizador lexico en lista de tokens.
+
+    Cada registro es: tipo (1 byte), longitud (varint), lexema, posicion
+    (varint). Un bytearray o memoryview se recorre sin copiarlo; solo se
+    crean cadenas para los lexemas variables (numeros, identificadores).
+    """
+    vista = datos if isinstance(datos, bytes) else memoryview(datos)
+    fin = len(vista)
+    tipos = TIPOS_BINARIOS
+    fijos = _LEXEMAS_FIJOS
+    tokens = []
+    agregar = tokens.append
+    pos = 0
+
+    with sin_recolector():
+        while pos < fin:
+            codigo = vista[pos]
+            if codigo == 0:
+                break
+
+            # Longitud (varint, casi siempre de un solo byte)
+            longitud = vista[pos + 1]
+            pos += 2
+            if longitud & 0x80:
+                longitud &= 0x7F
+                desplazamiento = 7
+                while True:
+                    byte = vista[pos]
+                    pos += 1
+                    longitud |= (byte & 0x7F) << desplazamiento
+                    desplazamiento += 7
+                    if not byte & 0x80:
+                        break
+
+            lexema = fijos[codigo] or str(vista[pos:pos + longitud], "utf-8", "replace")
+            pos += longitud
+
+            # Posicion en la fuente (varint)
+            inicio = vista[pos]
+            pos += 1
+            if inicio & 0x80:
+                inicio &= 0x7F
+                desplazamiento = 7
+                while True:
+                    byte = vista[pos]
+                    pos += 1
+                    inicio |= (byte & 0x7F) << desplazamiento
+                    desplazamiento += 7
+                    if not byte & 0x80:
+                        break
+
+            if codigo == _CODIGO_ERROR:
+                if incluir_errores:
+                    agregar(Token("ERROR", f"Caracter no reconocido '{lexema}'", inicio, codigo))
+            else:
+                agregar(Token(tipos[codigo], lexema, inicio, codigo))
+
+    return tokens
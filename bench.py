@@ -0,0 +1,1133 @@
+"""Mediciones de rendimiento del analizador lexico y sintactico"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from analisis_paralelo import analizar_paralelo
+from analizador_incremental import AnalizadorIncremental
+from analizador_lexico import (EJECUTABLE_FLEX, FuenteMapeada, formatear_tokens, tokenizar,
+                               tokenizar_mapeado, tokens_sintacticos)
+from analizador_sintactico import (ARBOLES, MOTORES, AnalizadorSintactico, decodificar_tokens,
+                                   escribir_arbol, imprimir_arbol, parsear_tokens)
+from cache_analisis import CacheAnalisis
+from compilacion import DIRECTORIO_CACHE, compilar
+from evaluador import compilar_programa, evaluar_columnas, interpretar
+from optimizador import optimizar
+from perfilado import percentil
+
+
+def generar_asignaciones(cantidad, semilla=0):
+    """Genera un programa de asignaciones aritmeticas aleatorias"""
+    azar = random.Random(semilla)
+    operadores = "+-*/"
+    lineas = []
+    for i in range(cantidad):
+        operandos = [
+            str(azar.randint(0, 999)) if azar.random() < 0.4
+            else f"{azar.randint(0, 99)}.{azar.randint(0, 99)}" if azar.random() < 0.2
+            else f"v{azar.randint(0, 500)}"
+            for _ in range(azar.randint(1, 6))
+        ]
+        expresion = operandos[0]
+        for operando in operandos[1:]:
+            expresion += f" {azar.choice(operadores)} {operando}"
+        lineas.append(f"x{i} = {expresion}")
+    return "\n".join(lineas)
+
+
+def _cadena(azar, operandos, operadores):
+    """Expresion plana con los operandos dados y operadores al azar"""
+    partes = [operandos[0]]
+    for operando in operandos[1:]:
+        partes.append(azar.choice(operadores))
+        partes.append(operando)
+    return " ".join(partes)
+
+
+def generar_cadena_plana(tokens, semilla=0, longitud=1000):
+    """Asignaciones con cadenas muy largas de '+' y '*' ('longitud' operandos cada una).
+
+    El arbol de una cadena es tan profundo como largo, y su dibujo en texto
+    crece con el cuadrado de la profundidad; por eso se reparte en varias.
+    """
+    azar = random.Random(semilla)
+    lineas = []
+    restantes = max(1, tokens // 2)
+    while restantes > 0:
+        cantidad = min(longitud, restantes)
+        operandos = [f"v{azar.randint(0, 99)}" if azar.random() < 0.5
+                     else str(azar.randint(0, 999)) for _ in range(cantidad)]
+        lineas.append(f"x{len(lineas)} = {_cadena(azar, operandos, '+*')}")
+        restantes -= cantidad
+    return "\n".join(lineas)
+
+
+def generar_anidado(tokens, semilla=0, profundidad=60):
+    """Asignaciones con parentesis anidados hasta 'profundidad' niveles.
+
+    La profundidad queda por debajo del limite de recursion del motor
+    recursivo; el motor iterativo se mide aparte en 'motores'.
+    """
+    azar = random.Random(semilla)
+    lineas = []
+    total = 0
+    while total < tokens:
+        niveles = azar.randint(profundidad // 2, profundidad)
+        expresion = f"v{azar.randint(0, 99)}"
+        for _ in range(niveles):
+            expresion = f"({expresion} {azar.choice('+-*/')} {azar.randint(1, 9)})"
+        lineas.append(f"x{len(lineas)} = {expresion}")
+        total += 4 * niveles + 3
+    return "\n".join(lineas)
+
+
+def generar_vocabulario(tokens, semilla=0):
+    """Asignaciones donde casi cada identificador es distinto"""
+    azar = random.Random(semilla)
+    lineas = []
+    for i in range(max(1, tokens // 8)):
+        operandos = [f"id_{azar.getrandbits(40):x}" for _ in range(3)]
+        lineas.append(f"r_{i:x}_{azar.getrandbits(24):x} = {_cadena(azar, operandos, '+-*/')}")
+    return "\n".join(lineas)
+
+
+def generar_errores_lexicos(tokens, semilla=0, proporcion=0.1):
+    """Asignaciones con caracteres no reconocidos intercalados entre los tokens"""
+    azar = random.Random(semilla)
+    partes = []
+    for parte in generar_asignaciones(max(1, tokens // 8), semilla).split(" "):
+        partes.append(parte)
+        if azar.random() < proporcion:
+            partes.append(azar.choice("$#@?!;"))
+    return " ".join(partes)
+
+
+# Cargas de trabajo sinteticas: nombre -> generador(tokens aproximados, semilla)
+CARGAS = {
+    "asignaciones": lambda tokens, semilla=0: generar_asignaciones(max(1, tokens // 8), semilla),
+    "cadena_plana": generar_cadena_plana,
+    "anidado": generar_anidado,
+    "vocabulario": generar_vocabulario,
+    "errores_lexicos": generar_errores_lexicos,
+}
+
+FASES = ("flex", "parsear_tokens", "analizar", "imprimir_arbol")
+
+
+def medir(funcion, repeticiones=3):
+    """Ejecuta la funcion varias veces; retorna (mejor tiempo en s, ultimo resultado)"""
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        transcurrido = time.perf_counter() - inicio
+        if mejor is None or transcurrido < mejor:
+            mejor = transcurrido
+    return mejor, resultado
+
+
+def _resumir(tiempos, unidades):
+    """Minimo, percentiles y rendimiento (unidades por segundo sobre la mediana)"""
+    mediana = percentil(tiempos, 50)
+    return {
+        "min_s": min(tiempos),
+        "p50_s": mediana,
+        "p90_s": percentil(tiempos, 90),
+        "p99_s": percentil(tiempos, 99),
+        "tokens_por_s": unidades / mediana if mediana else None,
+    }
+
+
+def _pico_memoria(funcion):
+    """Ejecuta la funcion una vez bajo tracemalloc; retorna el pico en bytes"""
+    tracemalloc.start()
+    try:
+        funcion()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_fases(carga="asignaciones", tokens=100000, repeticiones=10,
+                    ejecutable=EJECUTABLE_FLEX, semilla=0):
+    """Mide por separado cada fase del pipeline sobre una carga sintetica.
+
+    Fases: escaneo con analizador.exe, parsear_tokens sobre su salida,
+    AnalizadorSintactico.analizar e imprimir_arbol. Si el ejecutable no
+    existe, la salida del lexico se genera en Python y la fase flex se omite.
+    """
+    codigo = CARGAS[carga](tokens, semilla)
+    entrada = codigo.encode("utf-8")
+
+    def escanear():
+        return subprocess.run([ejecutable], input=entrada, capture_output=True).stdout
+
+    try:
+        salida = escanear().decode("utf-8", errors="replace")
+        funciones = {"flex": escanear}
+    except OSError:
+        salida = formatear_tokens(tokenizar(codigo))
+        funciones = {}
+
+    lista = parsear_tokens(salida)
+    arbol, _ = AnalizadorSintactico(lista).analizar()
+    funciones["parsear_tokens"] = lambda: parsear_tokens(salida)
+    funciones["analizar"] = lambda: AnalizadorSintactico(lista).analizar()
+    funciones["imprimir_arbol"] = lambda: imprimir_arbol(arbol)
+
+    tiempos = {fase: [] for fase in funciones}
+    for _ in range(repeticiones):
+        for fase, funcion in funciones.items():
+            inicio = time.perf_counter()
+            funcion()
+            tiempos[fase].append(time.perf_counter() - inicio)
+
+    fases = {}
+    for fase, funcion in funciones.items():
+        fases[fase] = _resumir(tiempos[fase], len(lista))
+        # El pico de flex corresponde a la salida capturada en Python
+        fases[fase]["pico_bytes"] = _pico_memoria(funcion)
+
+    return {
+        "carga": carga,
+        "semilla": semilla,
+        "fuente_bytes": len(entrada),
+        "tokens": len(lista),
+        "repeticiones": repeticiones,
+        "fases": fases,
+    }
+
+
+def benchmark_suite(cargas=tuple(CARGAS), tokens=100000, repeticiones=10,
+                    ejecutable=EJECUTABLE_FLEX, semilla=0):
+    """Ejecuta benchmark_fases sobre varias cargas; el resultado se puede guardar en JSON"""
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cargas": {carga: benchmark_fases(carga, tokens, repeticiones, ejecutable, semilla)
+                   for carga in cargas},
+    }
+
+
+def _mostrar_suite(resultados):
+    for carga, datos in resultados["cargas"].items():
+        print(f"{carga}: {datos['fuente_bytes'] / 1e6:.2f} MB, {datos['tokens']} tokens")
+        for fase in FASES:
+            if fase not in datos["fases"]:
+                print(f"  {fase:15} (omitida)")
+                continue
+            medida = datos["fases"][fase]
+            print(f"  {fase:15} p50 {medida['p50_s'] * 1000:9.2f} ms  "
+                  f"p90 {medida['p90_s'] * 1000:9.2f} ms  "
+                  f"p99 {medida['p99_s'] * 1000:9.2f} ms  "
+                  f"{medida['tokens_por_s'] / 1e6:7.2f} Mtokens/s  "
+                  f"pico {medida['pico_bytes'] / 1e6:8.1f} MB")
+
+
+def comparar_resultados(base, nuevo, umbral=0.10, metrica="p50_s"):
+    """Compara dos resultados de benchmark_suite.
+
+    Retorna una lista de (carga, fase, valor base, valor nuevo, cambio
+    relativo) con las fases que empeoraron mas que el umbral.
+    """
+    regresiones = []
+    for carga, datos in nuevo["cargas"].items():
+        anterior = base["cargas"].get(carga)
+        if anterior is None:
+            continue
+        for fase, medida in datos["fases"].items():
+            referencia = anterior["fases"].get(fase)
+            if not referencia or not referencia.get(metrica):
+                continue
+            cambio = medida[metrica] / referencia[metrica] - 1
+            if cambio > umbral:
+                regresiones.append((carga, fase, referencia[metrica], medida[metrica], cambio))
+    return regresiones
+
+
+def benchmark_formato_binario(megabytes=4, ejecutable=EJECUTABLE_FLEX, repeticiones=3):
+    """Compara la salida de texto de Flex contra el formato binario"""
+    codigo = generar_asignaciones(1)
+    sentencias = 1
+    while len(codigo) < megabytes * 1024 * 1024:
+        sentencias *= 2
+        codigo = generar_asignaciones(sentencias)
+    entrada = codigo.encode("utf-8")
+
+    def escanear(argumentos):
+        return subprocess.run(argumentos, input=entrada, capture_output=True).stdout
+
+    t_texto, salida_texto = medir(lambda: escanear([ejecutable]), repeticiones)
+    t_binario, salida_binaria = medir(lambda: escanear([ejecutable, "--binario"]), repeticiones)
+
+    texto = salida_texto.decode("utf-8", errors="replace")
+    t_parseo, tokens_texto = medir(lambda: parsear_tokens(texto), repeticiones)
+    t_decodificar, tokens_binarios = medir(lambda: decodificar_tokens(salida_binaria), repeticiones)
+
+    assert [(t.tipo, t.valor) for t in tokens_texto] == \
+           [(t.tipo, t.valor) for t in tokens_binarios]
+
+    return {
+        "fuente_bytes": len(entrada),
+        "tokens": len(tokens_texto),
+        "texto": {
+            "salida_bytes": len(salida_texto),
+            "escaneo_s": t_texto,
+            "decodificacion_s": t_parseo,
+            "total_s": t_texto + t_parseo,
+        },
+        "binario": {
+            "salida_bytes": len(salida_binaria),
+            "escaneo_s": t_binario,
+            "decodificacion_s": t_decodificar,
+            "total_s": t_binario + t_decodificar,
+        },
+    }
+
+
+# Combinaciones (opciones de flex, opciones de gcc) medidas por 'compilacion'
+CONFIGURACIONES_COMPILACION = {
+    "normal": ((), ()),
+    "gcc -O2": ((), ("-O2",)),
+    "-Cf -O2": (("-Cf",), ("-O2",)),
+    "-CF -O2": (("-CF",), ("-O2",)),
+    "-CF -O3": (("-CF",), ("-O3",)),
+}
+
+
+def benchmark_compilacion(megabytes=8, repeticiones=5, configuraciones=CONFIGURACIONES_COMPILACION,
+                          cache=DIRECTORIO_CACHE):
+    """Escaneo de Flex (texto y binario) con cada combinacion de tablas y optimizacion.
+
+    Cada ejecutable se compila con compilacion.compilar, asi que las
+    combinaciones ya medidas salen de la cache.
+    """
+    codigo = generar_asignaciones(1)
+    sentencias = 1
+    while len(codigo) < megabytes * 1024 * 1024:
+        sentencias *= 2
+        codigo = generar_asignaciones(sentencias)
+    entrada = codigo.encode("utf-8")
+
+    resultados = {"fuente_bytes": len(entrada), "configuraciones": {}}
+    referencia = None
+    for nombre, opciones in configuraciones.items():
+        destino = os.path.join(cache, "bench-" + nombre.replace(" ", "_") + ".exe")
+        inicio = time.perf_counter()
+        _, origen = compilar(destino=destino, perfil=opciones, cache=cache)
+        t_compilacion = time.perf_counter() - inicio
+
+        def escanear(argumentos):
+            return subprocess.run(argumentos, input=entrada, capture_output=True).stdout
+
+        t_texto, _ = medir(lambda: escanear([destino]), repeticiones)
+        t_binario, salida = medir(lambda: escanear([destino, "--binario"]), repeticiones)
+        if referencia is None:
+            referencia = salida
+        assert salida == referencia, f"{nombre} produce otros tokens"
+
+        resultados["configuraciones"][nombre] = {
+            "flex": list(opciones[0]),
+            "gcc": list(opciones[1]),
+            "compilacion_s": t_compilacion if origen == "compilado" else None,
+            "ejecutable_bytes": os.path.getsize(destino),
+            "texto_s": t_texto,
+            "binario_s": t_binario,
+        }
+    return resultados
+
+
+def _mostrar_compilacion(resultados):
+    print(f"Fuente: {resultados['fuente_bytes'] / 1e6:.1f} MB")
+    configuraciones = resultados["configuraciones"]
+    base = next(iter(configuraciones.values()))
+    for nombre, datos in configuraciones.items():
+        compilacion = ("   (cache)" if datos["compilacion_s"] is None
+                       else f"{datos['compilacion_s']:8.2f} s")
+        print(f"  {nombre:10} compilacion {compilacion}  "
+              f"ejecutable {datos['ejecutable_bytes'] / 1e3:6.0f} KB  "
+              f"texto {datos['texto_s'] * 1000:7.1f} ms  "
+              f"binario {datos['binario_s'] * 1000:7.1f} ms  "
+              f"({base['binario_s'] / datos['binario_s']:.2f}x)")
+
+
+def _mostrar_formato_binario(resultado):
+    print(f"Fuente: {resultado['fuente_bytes'] / 1e6:.1f} MB, {resultado['tokens']} tokens")
+    for formato in ("texto", "binario"):
+        datos = resultado[formato]
+        velocidad = resultado["tokens"] / datos["total_s"] / 1e6
+        print(f"  {formato:8} salida {datos['salida_bytes'] / 1e6:6.1f} MB  "
+              f"escaneo {datos['escaneo_s'] * 1000:8.1f} ms  "
+              f"decodificacion {datos['decodificacion_s'] * 1000:8.1f} ms  "
+              f"({velocidad:.2f} Mtokens/s)")
+
+
+def benchmark_motores(operandos=200000, profundidad=50000, repeticiones=3):
+    """Compara los motores sintacticos en una expresion plana y una muy anidada"""
+    plana = tokens_sintacticos(tokenizar("x = " + " + ".join(["a * 2"] * operandos)))
+    anidada = tokens_sintacticos(tokenizar("x = " + "(" * profundidad + "1" + ")" * profundidad))
+
+    resultados = {}
+    for motor in MOTORES:
+        t_plana, _ = medir(lambda: AnalizadorSintactico(plana, motor).analizar(), repeticiones)
+        _, (_, errores) = medir(lambda: AnalizadorSintactico(anidada, motor).analizar(), 1)
+        resultados[motor] = {
+            "plana_s": t_plana,
+            "tokens_por_s": len(plana) / t_plana,
+            "anidada_ok": not errores,
+        }
+    return resultados
+
+
+def _mostrar_motores(resultados):
+    for motor, datos in resultados.items():
+        print(f"  {motor:10} expresion plana {datos['plana_s'] * 1000:8.1f} ms  "
+              f"({datos['tokens_por_s'] / 1e6:.2f} Mtokens/s)  "
+              f"anidamiento profundo: {'OK' if datos['anidada_ok'] else 'FALLA'}")
+
+
+def benchmark_tokens(cantidad=1000000, repeticiones=3):
+    """Tokens por segundo del lexico y de cada motor sintactico con ~1M tokens"""
+    sentencias = max(1, cantidad // 8)
+    codigo = generar_asignaciones(sentencias)
+    t_lexico, tokens = medir(lambda: tokenizar(codigo), repeticiones)
+    tokens = tokens_sintacticos(tokens)
+
+    resultados = {"tokens": len(tokens), "lexico_tokens_por_s": len(tokens) / t_lexico}
+    for motor in MOTORES:
+        t_motor, _ = medir(lambda: AnalizadorSintactico(tokens, motor).analizar(), repeticiones)
+        resultados[f"{motor}_tokens_por_s"] = len(tokens) / t_motor
+    return resultados
+
+
+def _mostrar_tokens(resultados):
+    print(f"{resultados['tokens']} tokens")
+    for clave, valor in resultados.items():
+        if clave.endswith("_por_s"):
+            print(f"  {clave[:-len('_tokens_por_s')]:10} {valor / 1e6:.3f} Mtokens/s")
+
+
+def benchmark_memoria(sentencias=100000):
+    """Memoria del arbol con objetos NodoArbol contra el ArbolCompacto"""
+    tokens = tokens_sintacticos(tokenizar(generar_asignaciones(sentencias)))
+
+    resultados = {"sentencias": sentencias, "tokens": len(tokens)}
+    for arbol in ARBOLES:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado, _ = AnalizadorSintactico(tokens, arbol=arbol).analizar()
+        transcurrido = time.perf_counter() - inicio
+        actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultados[arbol] = {"memoria_bytes": actual, "pico_bytes": pico, "tiempo_s": transcurrido}
+        del resultado
+    return resultados
+
+
+def _mostrar_memoria(resultados):
+    print(f"{resultados['sentencias']} sentencias, {resultados['tokens']} tokens")
+    for arbol in ARBOLES:
+        datos = resultados[arbol]
+        print(f"  {arbol:9} arbol {datos['memoria_bytes'] / 1e6:7.1f} MB  "
+              f"pico {datos['pico_bytes'] / 1e6:7.1f} MB  "
+              f"tiempo {datos['tiempo_s'] * 1000:8.1f} ms")
+
+
+def benchmark_paralelo(tamanos_kb=(64, 256, 1024, 4096), procesos=None, repeticiones=3):
+    """Analisis en serie contra analizar_paralelo para varios tamanos de programa.
+
+    Mide el paralelo creando el grupo de procesos en cada llamada (lo que
+    paga un uso aislado) y reutilizandolo; sirve para elegir UMBRAL_PARALELO.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    resultados = {"procesos": procesos, "tamanos": {}}
+    with ProcessPoolExecutor(procesos) as ejecutor:
+        for kb in tamanos_kb:
+            lineas, _ = generar_con_errores(kb * 1024 // 30, kb // 16)
+            codigo = "\n".join(lineas)
+
+            def en_serie():
+                tokens = tokens_sintacticos(tokenizar(codigo))
+                return AnalizadorSintactico(tokens, "iterativo", "compacto",
+                                            recuperacion=True).analizar()
+
+            t_serie, (arbol, errores) = medir(en_serie, repeticiones)
+            t_nuevo, _ = medir(lambda: analizar_paralelo(codigo, procesos, umbral=0),
+                               repeticiones)
+            t_reusado, (arbol_p, errores_p) = medir(
+                lambda: analizar_paralelo(codigo, procesos, umbral=0, ejecutor=ejecutor),
+                repeticiones)
+            assert len(arbol.arbol) == len(arbol_p.arbol)
+            assert [(str(e), e.posicion, e.linea) for e in errores] == \
+                   [(str(e), e.posicion, e.linea) for e in errores_p]
+            resultados["tamanos"][kb] = {
+                "bytes": len(codigo),
+                "serie_s": t_serie,
+                "paralelo_s": t_nuevo,
+                "paralelo_reusado_s": t_reusado,
+            }
+    return resultados
+
+
+def _mostrar_paralelo(resultados):
+    print(f"{resultados['procesos']} proceso(s)")
+    for kb, datos in resultados["tamanos"].items():
+        print(f"  {datos['bytes'] / 1e3:8.0f} KB  serie {datos['serie_s'] * 1000:8.1f} ms  "
+              f"paralelo {datos['paralelo_s'] * 1000:8.1f} ms "
+              f"({datos['serie_s'] / datos['paralelo_s']:.2f}x)  "
+              f"grupo reusado {datos['paralelo_reusado_s'] * 1000:8.1f} ms "
+              f"({datos['serie_s'] / datos['paralelo_reusado_s']:.2f}x)")
+
+
+def generar_evaluable(sentencias, entradas=20, semilla=0):
+    """Programa sin divisiones por cero donde cada asignacion puede usar las anteriores.
+
+    Las variables e0..e{entradas-1} son entradas. Los divisores son
+    literales distintos de cero y las anteriores solo se suman, asi los
+    valores no crecen sin control.
+    """
+    azar = random.Random(semilla)
+    lineas = []
+    for i in range(sentencias):
+        partes = []
+        for j in range(azar.randint(2, 6)):
+            operando = (f"e{azar.randrange(entradas)}" if azar.random() < 0.5
+                        else str(azar.randint(1, 99)) if azar.random() < 0.7
+                        else f"{azar.randint(1, 9)}.{azar.randint(1, 99)}")
+            if j == 0:
+                partes.append(operando)
+            elif azar.random() < 0.2:
+                partes.append(f"/ {azar.randint(1, 9)}")
+            else:
+                partes.append(f"{azar.choice('+-*')} {operando}")
+        if i and azar.random() < 0.6:
+            partes.append(f"+ x{azar.randrange(i)}")
+        lineas.append(f"x{i} = ({' '.join(partes)})")
+    return "\n".join(lineas)
+
+
+def benchmark_evaluacion(sentencias=2000, evaluaciones=200, entradas=20):
+    """Evaluar muchas veces el mismo programa: compilado contra recorrer el arbol"""
+    codigo = generar_evaluable(sentencias, entradas)
+    arbol, errores = AnalizadorSintactico(tokens_sintacticos(tokenizar(codigo)),
+                                          "iterativo").analizar()
+    assert not errores
+    azar = random.Random(1)
+    valores = [{f"e{i}": azar.randint(-50, 50) for i in range(entradas)}
+               for _ in range(evaluaciones)]
+
+    inicio = time.perf_counter()
+    programa = compilar_programa(arbol)
+    t_compilar = time.perf_counter() - inicio
+
+    def cada_una(evaluar):
+        return [evaluar(entrada) for entrada in valores]
+
+    t_arbol, esperado = medir(lambda: cada_una(lambda e: interpretar(arbol, e)))
+    t_compilado, obtenido = medir(lambda: cada_una(programa.evaluar))
+    assert obtenido == esperado
+
+    # Camino rapido: ranuras preparadas de antemano y ejecutar() directo
+    ranuras = [[None] * len(programa.nombres) for _ in valores]
+    for lista, entrada in zip(ranuras, valores):
+        for nombre in programa.entradas:
+            lista[programa.ranura[nombre]] = entrada[nombre]
+    t_ranuras, _ = medir(lambda: [programa.ejecutar(lista) for lista in ranuras])
+
+    return {
+        "sentencias": sentencias,
+        "evaluaciones": evaluaciones,
+        "compilar_s": t_compilar,
+        "arbol_s": t_arbol,
+        "compilado_s": t_compilado,
+        "ranuras_s": t_ranuras,
+    }
+
+
+def _mostrar_evaluacion(resultados):
+    print(f"{resultados['sentencias']} sentencias, {resultados['evaluaciones']} evaluaciones "
+          f"(compilacion {resultados['compilar_s'] * 1000:.1f} ms)")
+    por_evaluacion = lambda clave: resultados[clave] / resultados["evaluaciones"] * 1000
+    for clave, nombre in (("arbol_s", "recorrido del arbol"), ("compilado_s", "compilado"),
+                          ("ranuras_s", "compilado, ranuras")):
+        print(f"  {nombre:20} {por_evaluacion(clave):8.3f} ms por evaluacion  "
+              f"({resultados['arbol_s'] / resultados[clave]:.1f}x)")
+
+
+def benchmark_columnas(sentencias=200, filas=100000, entradas=20, filas_por_fila=2000):
+    """Evaluar un programa sobre muchas filas: compilado fila por fila contra por columnas.
+
+    El camino fila por fila se mide sobre las primeras filas_por_fila filas
+    y se compara por fila. Necesita NumPy.
+    """
+    import numpy
+
+    codigo = generar_evaluable(sentencias, entradas)
+    arbol, errores = AnalizadorSintactico(tokens_sintacticos(tokenizar(codigo)),
+                                          "iterativo").analizar()
+    assert not errores
+    programa = compilar_programa(arbol)
+    azar = numpy.random.default_rng(1)
+    columnas = {f"e{i}": azar.integers(-50, 51, filas) for i in range(entradas)}
+
+    muestra = min(filas, filas_por_fila)
+    filas_sueltas = [{nombre: int(columna[i]) for nombre, columna in columnas.items()}
+                     for i in range(muestra)]
+    t_filas, esperado = medir(lambda: [programa.evaluar(fila) for fila in filas_sueltas])
+    t_columnas, obtenido = medir(lambda: evaluar_columnas(programa, columnas))
+    ultima = f"x{sentencias - 1}"
+    assert numpy.allclose([float(fila[ultima]) for fila in esperado],
+                          obtenido[ultima][:muestra])
+    return {
+        "sentencias": sentencias,
+        "filas": filas,
+        "fila_por_fila_us": t_filas / muestra * 1e6,
+        "columnas_us": t_columnas / filas * 1e6,
+    }
+
+
+def _mostrar_columnas(resultados):
+    print(f"{resultados['sentencias']} sentencias sobre {resultados['filas']} filas")
+    for clave, nombre in (("fila_por_fila_us", "fila por fila"), ("columnas_us", "por columnas")):
+        print(f"  {nombre:15} {resultados[clave]:9.3f} us por fila  "
+              f"({resultados['fila_por_fila_us'] / resultados[clave]:.1f}x)")
+
+
+def generar_repetitivo(sentencias, subexpresiones=50, entradas=20, semilla=0):
+    """Programa que repite unas pocas subexpresiones, con partes solo de literales.
+
+    Imita el codigo generado: cada asignacion combina subexpresiones de una
+    reserva fija como '(e3 + e7) * e1' y constantes como '(3 + 5)'.
+    """
+    azar = random.Random(semilla)
+    operando = lambda: f"e{azar.randrange(entradas)}"
+    reserva = []
+    for _ in range(subexpresiones):
+        if azar.random() < 0.3:
+            reserva.append(f"({azar.randint(1, 99)} {azar.choice('+-*')} {azar.randint(1, 9)}.5)")
+        else:
+            reserva.append(f"(({operando()} {azar.choice('+-*')} {operando()}) "
+                           f"{azar.choice('+-*')} {operando()})")
+    lineas = []
+    for i in range(sentencias):
+        partes = [azar.choice(reserva) for _ in range(azar.randint(2, 5))]
+        lineas.append(f"x{i} = " + f" {azar.choice('+-*')} ".join(partes))
+    return "\n".join(lineas)
+
+
+def benchmark_optimizacion(sentencias=5000):
+    """Arbol original contra optimizado: nodos, memoria y tiempo de evaluacion"""
+    codigo = generar_repetitivo(sentencias)
+    tokens = tokens_sintacticos(tokenizar(codigo))
+
+    tracemalloc.start()
+    arbol, errores = AnalizadorSintactico(tokens, "iterativo").analizar()
+    memoria_arbol, _ = tracemalloc.get_traced_memory()
+    assert not errores
+    dag, estadisticas = optimizar(arbol)
+    memoria_total, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    t_optimizar, _ = medir(lambda: optimizar(arbol))
+
+    entradas = {f"e{i}": i + 1 for i in range(20)}
+    resultados = {"sentencias": sentencias, "optimizar_s": t_optimizar,
+                  "estadisticas": estadisticas.a_dict()}
+    for nombre, raiz, memoria in (("arbol", arbol, memoria_arbol),
+                                  ("optimizado", dag, memoria_total - memoria_arbol)):
+        inicio = time.perf_counter()
+        programa = compilar_programa(raiz)
+        t_compilar = time.perf_counter() - inicio
+        ranuras = [None] * len(programa.nombres)
+        for entrada in programa.entradas:
+            ranuras[programa.ranura[entrada]] = entradas[entrada]
+        t_ejecutar, _ = medir(lambda: programa.ejecutar(list(ranuras)))
+        t_interpretar, _ = medir(lambda: interpretar(raiz, entradas))
+        resultados[nombre] = {"memoria_bytes": memoria, "compilar_s": t_compilar,
+                              "ejecutar_s": t_ejecutar, "interpretar_s": t_interpretar}
+    assert interpretar(arbol, entradas) == compilar_programa(dag).evaluar(entradas)
+    return resultados
+
+
+def _mostrar_optimizacion(resultados):
+    estadisticas = resultados["estadisticas"]
+    print(f"{resultados['sentencias']} sentencias: {estadisticas['nodos_entrada']} -> "
+          f"{estadisticas['nodos_salida']} nodos ({estadisticas['plegado']['operaciones']} "
+          f"plegadas, {estadisticas['compartido']['nodos']} nodos compartidos) "
+          f"en {resultados['optimizar_s'] * 1000:.1f} ms")
+    for nombre in ("arbol", "optimizado"):
+        datos = resultados[nombre]
+        print(f"  {nombre:10} memoria {datos['memoria_bytes'] / 1e6:7.1f} MB  "
+              f"compilar {datos['compilar_s'] * 1000:7.1f} ms  "
+              f"ejecutar {datos['ejecutar_s'] * 1000:7.2f} ms  "
+              f"interpretar {datos['interpretar_s'] * 1000:7.1f} ms")
+
+
+def benchmark_cache(sentencias=20000, ruta=None):
+    """Analizar sin cache contra un acierto en memoria y uno en disco (sqlite)"""
+    lineas, _ = generar_con_errores(sentencias, sentencias // 1000)
+    codigo = "\n".join(lineas)
+    ruta = ruta or os.path.join(DIRECTORIO_CACHE, "bench_resultados.sqlite")
+    cache = CacheAnalisis(ruta=ruta)
+    cache.vaciar()
+
+    inicio = time.perf_counter()
+    cache.analizar(codigo)
+    t_fallo = time.perf_counter() - inicio
+    t_memoria, resultado = medir(lambda: cache.analizar(codigo))
+    assert resultado.origen == "memoria"
+
+    def desde_disco():
+        # Una cache nueva sobre la misma base: el acierto viene del disco
+        otra = CacheAnalisis(ruta=ruta)
+        try:
+            return otra.analizar(codigo)
+        finally:
+            otra.cerrar()
+
+    t_disco, resultado = medir(desde_disco)
+    assert resultado.origen == "disco"
+    tamano = cache.estadisticas()["bytes_memoria"]
+    cache.vaciar()
+    cache.cerrar()
+    return {"sentencias": sentencias, "bytes_codigo": len(codigo), "bytes_guardados": tamano,
+            "fallo_s": t_fallo, "memoria_s": t_memoria, "disco_s": t_disco}
+
+
+def _mostrar_cache(resultados):
+    print(f"{resultados['sentencias']} sentencias ({resultados['bytes_codigo'] / 1e6:.1f} MB de "
+          f"codigo, {resultados['bytes_guardados'] / 1e6:.1f} MB serializados)")
+    for clave, nombre in (("fallo_s", "sin cache"), ("memoria_s", "acierto en memoria"),
+                          ("disco_s", "acierto en disco")):
+        print(f"  {nombre:20} {resultados[clave] * 1000:8.1f} ms  "
+              f"({resultados['fallo_s'] / resultados[clave]:.1f}x)")
+
+
+def benchmark_mapeado(sentencias=100000):
+    """Leer el archivo y tokenizar contra mapearlo y tokenizar tramos, hasta el arbol.
+
+    La memoria es el pico de tracemalloc de cada pasada completa (lectura,
+    lexico y sintactico con arbol compacto).
+    """
+    lineas, _ = generar_con_errores(sentencias, sentencias // 1000)
+    ruta = os.path.join(DIRECTORIO_CACHE, "bench_mapeado.txt")
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write("\n".join(lineas))
+
+    def leyendo():
+        with open(ruta, encoding="utf-8") as archivo:
+            tokens = tokens_sintacticos(tokenizar(archivo.read()))
+        return AnalizadorSintactico(tokens, arbol="compacto", recuperacion=True).analizar()
+
+    def mapeando():
+        with FuenteMapeada(ruta) as fuente:
+            tokens = tokenizar_mapeado(fuente, incluir_errores=False)
+            arbol, errores = AnalizadorSintactico(tokens, arbol="compacto",
+                                                  recuperacion=True).analizar()
+            # Las ubicaciones se resuelven antes de cerrar la fuente
+            return arbol, [(error.linea, error.columna) for error in errores]
+
+    try:
+        resultados = {"sentencias": sentencias, "bytes": os.path.getsize(ruta)}
+        for nombre, funcion in (("lectura", leyendo), ("mapeo", mapeando)):
+            tiempo, (arbol, errores) = medir(funcion)
+            resultados[nombre] = {"tiempo_s": tiempo, "pico_bytes": _pico_memoria(funcion),
+                                  "nodos": len(arbol.arbol), "errores": len(errores)}
+        assert all(resultados["lectura"][clave] == resultados["mapeo"][clave]
+                   for clave in ("nodos", "errores"))
+    finally:
+        os.remove(ruta)
+    return resultados
+
+
+def _mostrar_mapeado(resultados):
+    print(f"{resultados['sentencias']} sentencias ({resultados['bytes'] / 1e6:.1f} MB), "
+          f"{resultados['lectura']['nodos']} nodos, {resultados['lectura']['errores']} errores")
+    for nombre in ("lectura", "mapeo"):
+        medida = resultados[nombre]
+        print(f"  {nombre:8} {medida['tiempo_s'] * 1000:8.1f} ms  "
+              f"pico {medida['pico_bytes'] / 1e6:7.1f} MB")
+
+
+def benchmark_vista(sentencias=100000):
+    """Texto completo del arbol (lo que recibia el panel) contra el IndiceArbol de la vista.
+
+    No incluye el costo de Tk: el texto ademas se insertaba entero en el
+    widget, mientras que la vista solo crea los elementos que se expanden.
+    """
+    # vistas importa tkinter: solo este benchmark lo necesita
+    from vistas import IndiceArbol
+
+    tokens = tokens_sintacticos(tokenizar(generar_asignaciones(sentencias)))
+    arbol, _ = AnalizadorSintactico(tokens, arbol="compacto").analizar()
+
+    def texto():
+        salida = io.StringIO()
+        escribir_arbol(arbol, salida)
+        return salida.getvalue()
+
+    t_texto, renderizado = medir(texto)
+    t_indice, indice = medir(lambda: IndiceArbol(arbol))
+    inicio = time.perf_counter()
+    indice.buscar("x0")
+    t_primera = time.perf_counter() - inicio
+    t_busqueda, coincidencias = medir(lambda: indice.buscar(f"x{sentencias - 1}"))
+    assert len(coincidencias) == 1
+    return {"sentencias": sentencias, "nodos": len(indice),
+            "texto_s": t_texto, "texto_pico_bytes": _pico_memoria(texto),
+            "caracteres": len(renderizado),
+            "indice_s": t_indice, "indice_pico_bytes": _pico_memoria(lambda: IndiceArbol(arbol)),
+            "primera_busqueda_s": t_primera, "busqueda_s": t_busqueda}
+
+
+def _mostrar_vista(resultados):
+    print(f"{resultados['sentencias']} sentencias, {resultados['nodos']} nodos")
+    print(f"  texto completo {resultados['texto_s'] * 1000:8.1f} ms  "
+          f"pico {resultados['texto_pico_bytes'] / 1e6:6.1f} MB  "
+          f"({resultados['caracteres'] / 1e6:.1f} M caracteres para el widget)")
+    print(f"  indice         {resultados['indice_s'] * 1000:8.1f} ms  "
+          f"pico {resultados['indice_pico_bytes'] / 1e6:6.1f} MB")
+    print(f"  busqueda: {resultados['primera_busqueda_s'] * 1000:.1f} ms la primera (arma el "
+          f"indice), {resultados['busqueda_s'] * 1e6:.1f} us las siguientes")
+
+
+def generar_con_errores(sentencias, errores, semilla=0):
+    """Programa de asignaciones con 'errores' lineas sinteticamente mal formadas.
+
+    Retorna (lineas, indices de las lineas con error).
+    """
+    azar = random.Random(semilla)
+    lineas = generar_asignaciones(sentencias, semilla).split("\n")
+    malas = sorted(azar.sample(range(len(lineas)), min(errores, len(lineas))))
+    for i in malas:
+        lineas[i] = f"e{i} = (v{i} + * 2)"
+    return lineas, malas
+
+
+def benchmark_recuperacion(sentencias=10000, errores=100):
+    """Tiempo total para conocer todos los errores de un archivo con N errores.
+
+    Flujo actual: analizar, corregir la linea del primer error y volver a
+    analizar (lexico + sintactico) hasta que no queden errores. Con
+    recuperacion: una sola pasada reporta todos los errores.
+    """
+    lineas, malas = generar_con_errores(sentencias, errores)
+
+    def pasada(codigo, recuperacion):
+        tokens = tokens_sintacticos(tokenizar(codigo))
+        return AnalizadorSintactico(tokens, recuperacion=recuperacion,
+                                    max_errores=len(tokens) + 1).analizar()[1]
+
+    inicio = time.perf_counter()
+    reportados = pasada("\n".join(lineas), True)
+    t_recuperacion = time.perf_counter() - inicio
+    lineas_reportadas = {error.linea for error in reportados}
+
+    corregidas = list(lineas)
+    pasadas = 0
+    inicio = time.perf_counter()
+    while True:
+        pasadas += 1
+        encontrados = pasada("\n".join(corregidas), False)
+        if not encontrados:
+            break
+        i = encontrados[0].linea - 1
+        corregidas[i] = f"e{i} = v{i} + 2"
+    t_pasadas = time.perf_counter() - inicio
+
+    return {
+        "sentencias": len(lineas),
+        "errores": len(malas),
+        "recuperacion": {"tiempo_s": t_recuperacion, "pasadas": 1,
+                         "lineas_detectadas": len(lineas_reportadas & {i + 1 for i in malas})},
+        "n_pasadas": {"tiempo_s": t_pasadas, "pasadas": pasadas,
+                      "lineas_detectadas": pasadas - 1},
+    }
+
+
+def _mostrar_recuperacion(resultados):
+    print(f"{resultados['sentencias']} sentencias con {resultados['errores']} errores")
+    for modo in ("recuperacion", "n_pasadas"):
+        datos = resultados[modo]
+        print(f"  {modo:12} {datos['pasadas']:5} pasada(s)  "
+              f"{datos['lineas_detectadas']:5} errores encontrados  "
+              f"total {datos['tiempo_s'] * 1000:10.1f} ms")
+
+
+def benchmark_incremental(lineas=50000, ediciones=50, semilla=0):
+    """Latencia de editar una linea: re-analisis incremental contra analisis completo"""
+    azar = random.Random(semilla)
+    codigo = generar_asignaciones(lineas, semilla)
+
+    inicio = time.perf_counter()
+    incremental = AnalizadorIncremental(codigo)
+    t_carga = time.perf_counter() - inicio
+
+    def completo(texto):
+        tokens = tokens_sintacticos(tokenizar(texto))
+        return AnalizadorSintactico(tokens, "iterativo", recuperacion=True,
+                                    max_errores=None).analizar()
+
+    t_completo, _ = medir(lambda: completo(codigo), 3)
+
+    por_lineas = []
+    por_texto = []
+    for _ in range(ediciones):
+        i = azar.randrange(lineas)
+        nueva = f"x{i} = {azar.randint(0, 999)} * (v{azar.randint(0, 500)} + 1)"
+        inicio = time.perf_counter()
+        incremental.reemplazar_lineas(i, i + 1, [nueva])
+        por_lineas.append(time.perf_counter() - inicio)
+
+        # Misma clase de edicion pero entregando el texto completo nuevo
+        i = azar.randrange(lineas)
+        partes = incremental.codigo.split("\n")
+        partes[i] = f"x{i} = {azar.randint(0, 999)}"
+        texto = "\n".join(partes)
+        inicio = time.perf_counter()
+        incremental.actualizar(texto)
+        por_texto.append(time.perf_counter() - inicio)
+
+    arbol, errores = completo(incremental.codigo)
+    assert imprimir_arbol(arbol) == imprimir_arbol(incremental.arbol)
+    assert errores == incremental.errores
+
+    return {
+        "lineas": lineas,
+        "ediciones": ediciones,
+        "carga_inicial_s": t_carga,
+        "completo_s": t_completo,
+        "reemplazar_lineas": {"p50_s": percentil(por_lineas, 50),
+                              "p99_s": percentil(por_lineas, 99)},
+        "actualizar": {"p50_s": percentil(por_texto, 50), "p99_s": percentil(por_texto, 99)},
+    }
+
+
+def _mostrar_incremental(resultados):
+    print(f"{resultados['lineas']} lineas, {resultados['ediciones']} ediciones de una linea")
+    print(f"  analisis completo   {resultados['completo_s'] * 1000:10.2f} ms")
+    print(f"  carga incremental   {resultados['carga_inicial_s'] * 1000:10.2f} ms")
+    for modo in ("reemplazar_lineas", "actualizar"):
+        datos = resultados[modo]
+        print(f"  {modo:19} p50 {datos['p50_s'] * 1000:7.3f} ms  "
+              f"p99 {datos['p99_s'] * 1000:7.3f} ms  "
+              f"({resultados['completo_s'] / datos['p50_s']:.0f}x)")
+
+
+def benchmark_en_vivo(lineas=50000, ediciones=50, semilla=0):
+    """Actualizacion completa del modo en vivo: re-analisis incremental y el IndiceArbol.
+
+    Compara reutilizar el indice anterior (solo se recorren las sentencias
+    que cambiaron) contra armarlo entero en cada edicion, y ambos contra el
+    pipeline completo de ejecutar_analisis.
+    """
+    # interfaz_combinada importa vistas y por lo tanto tkinter
+    from interfaz_combinada import ejecutar_analisis, ejecutar_incremental
+
+    azar = random.Random(semilla)
+    codigo = generar_asignaciones(lineas, semilla)
+    t_completo, _ = medir(lambda: ejecutar_analisis(codigo, "python"), 3)
+
+    reutilizando = AnalizadorIncremental(codigo)
+    desde_cero = AnalizadorIncremental(codigo)
+    _, indice = ejecutar_incremental(reutilizando, codigo)
+    con_indice = []
+    sin_indice = []
+    for _ in range(ediciones):
+        i = azar.randrange(lineas)
+        partes = reutilizando.codigo.split("\n")
+        partes[i] = f"x{i} = {azar.randint(0, 999)} * (v{azar.randint(0, 500)} + 1)"
+        texto = "\n".join(partes)
+        inicio = time.perf_counter()
+        _, indice = ejecutar_incremental(reutilizando, texto, anterior=indice)
+        con_indice.append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        _, nuevo = ejecutar_incremental(desde_cero, texto)
+        sin_indice.append(time.perf_counter() - inicio)
+
+    # Sin cambios (por ejemplo, la misma tecla borrada y escrita otra vez)
+    inicio = time.perf_counter()
+    _, repetido = ejecutar_incremental(reutilizando, texto, anterior=indice)
+    t_igual = time.perf_counter() - inicio
+    assert repetido is indice
+    assert (len(indice) == len(nuevo) and indice.tamanos == nuevo.tamanos
+            and indice.distancias == nuevo.distancias
+            and all(indice.etiqueta(n) == nuevo.etiqueta(n) for n in range(len(indice))))
+
+    return {
+        "lineas": lineas,
+        "ediciones": ediciones,
+        "nodos": len(indice),
+        "completo_s": t_completo,
+        "reutilizando": {"p50_s": percentil(con_indice, 50), "p99_s": percentil(con_indice, 99)},
+        "indice_nuevo": {"p50_s": percentil(sin_indice, 50), "p99_s": percentil(sin_indice, 99)},
+        "sin_cambios_s": t_igual,
+    }
+
+
+def _mostrar_en_vivo(resultados):
+    print(f"{resultados['lineas']} lineas ({resultados['nodos']} nodos), "
+          f"{resultados['ediciones']} ediciones de una linea, con el IndiceArbol")
+    print(f"  analisis completo   {resultados['completo_s'] * 1000:10.2f} ms")
+    for modo in ("indice_nuevo", "reutilizando"):
+        datos = resultados[modo]
+        print(f"  {modo:19} p50 {datos['p50_s'] * 1000:7.3f} ms  "
+              f"p99 {datos['p99_s'] * 1000:7.3f} ms  "
+              f"({resultados['completo_s'] / datos['p50_s']:.0f}x)")
+    print(f"  sin cambios         {resultados['sin_cambios_s'] * 1000:10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    binario = subcomandos.add_parser("binario", help="formato de texto contra binario de Flex")
+    binario.add_argument("--mb", type=float, default=4, help="tamano de la fuente en MB")
+    binario.add_argument("--ejecutable", default=EJECUTABLE_FLEX)
+
+    compilacion = subcomandos.add_parser(
+        "compilacion", help="tablas de Flex y optimizacion de GCC del analizador")
+    compilacion.add_argument("--mb", type=float, default=8, help="tamano de la fuente en MB")
+    compilacion.add_argument("--repeticiones", type=int, default=5)
+
+    motores = subcomandos.add_parser("motores", help="motor recursivo contra iterativo")
+    motores.add_argument("--operandos", type=int, default=200000)
+    motores.add_argument("--profundidad", type=int, default=50000)
+
+    tokens = subcomandos.add_parser("tokens", help="tokens por segundo con ~1M tokens")
+    tokens.add_argument("--cantidad", type=int, default=1000000)
+
+    memoria = subcomandos.add_parser("memoria", help="arbol de objetos contra arbol compacto")
+    memoria.add_argument("--sentencias", type=int, default=100000)
+
+    recuperacion = subcomandos.add_parser(
+        "recuperacion", help="una pasada con recuperacion contra N pasadas")
+    recuperacion.add_argument("--sentencias", type=int, default=10000)
+    recuperacion.add_argument("--errores", type=int, default=100)
+
+    suite = subcomandos.add_parser("suite", help="tiempos por fase sobre cargas sinteticas")
+    suite.add_argument("--cargas", nargs="+", choices=tuple(CARGAS), default=tuple(CARGAS))
+    suite.add_argument("--tokens", type=int, default=100000, help="tokens aproximados por carga")
+    suite.add_argument("--repeticiones", type=int, default=10)
+    suite.add_argument("--semilla", type=int, default=0)
+    suite.add_argument("--ejecutable", default=EJECUTABLE_FLEX)
+    suite.add_argument("--salida", help="guardar los resultados en este archivo JSON")
+
+    comparar = subcomandos.add_parser(
+        "comparar", help="falla si alguna fase empeoro mas que el umbral")
+    comparar.add_argument("base", help="JSON de referencia (bench.py suite --salida)")
+    comparar.add_argument("nuevo", help="JSON a comparar")
+    comparar.add_argument("--umbral", type=float, default=0.10,
+                          help="aumento relativo permitido (0.10 = 10%%)")
+    comparar.add_argument("--metrica", default="p50_s",
+                          choices=("min_s", "p50_s", "p90_s", "p99_s"))
+
+    evaluacion = subcomandos.add_parser(
+        "evaluacion", help="programa compilado contra recorrer el arbol en cada evaluacion")
+    evaluacion.add_argument("--sentencias", type=int, default=2000)
+    evaluacion.add_argument("--evaluaciones", type=int, default=200)
+
+    cache = subcomandos.add_parser(
+        "cache", help="analisis completo contra aciertos de la cache en memoria y en disco")
+    cache.add_argument("--sentencias", type=int, default=20000)
+
+    optimizacion = subcomandos.add_parser(
+        "optimizacion", help="arbol original contra plegado y con subexpresiones compartidas")
+    optimizacion.add_argument("--sentencias", type=int, default=5000)
+
+    columnas = subcomandos.add_parser(
+        "columnas", help="evaluar fila por fila contra por columnas de NumPy")
+    columnas.add_argument("--sentencias", type=int, default=200)
+    columnas.add_argument("--filas", type=int, default=100000)
+
+    paralelo = subcomandos.add_parser(
+        "paralelo", help="un programa grande en serie contra repartido entre procesos")
+    paralelo.add_argument("--kb", type=int, nargs="+", default=[64, 256, 1024, 4096])
+    paralelo.add_argument("--procesos", type=int, default=None)
+    paralelo.add_argument("--repeticiones", type=int, default=3)
+
+    vista = subcomandos.add_parser(
+        "vista", help="texto completo del arbol contra el indice de la vista perezosa")
+    vista.add_argument("--sentencias", type=int, default=100000)
+
+    mapeado = subcomandos.add_parser(
+        "mapeado", help="leer y tokenizar contra mapear el archivo y tokenizar tramos")
+    mapeado.add_argument("--sentencias", type=int, default=100000)
+
+    incremental = subcomandos.add_parser(
+        "incremental", help="editar una linea: re-analisis incremental contra completo")
+    incremental.add_argument("--lineas", type=int, default=50000)
+    incremental.add_argument("--ediciones", type=int, default=50)
+
+    en_vivo = subcomandos.add_parser(
+        "en_vivo", help="actualizacion en vivo con el indice del arbol, reutilizado o nuevo")
+    en_vivo.add_argument("--lineas", type=int, default=50000)
+    en_vivo.add_argument("--ediciones", type=int, default=50)
+
+    argumentos = parser.parse_args()
+
+    if argumentos.comando == "suite":
+        resultados = benchmark_suite(argumentos.cargas, argumentos.tokens,
+                                     argumentos.repeticiones, argumentos.ejecutable,
+                                     argumentos.semilla)
+        _mostrar_suite(resultados)
+        if argumentos.salida:
+            with open(argumentos.salida, "w", encoding="utf-8") as archivo:
+                json.dump(resultados, archivo, indent=2)
+    elif argumentos.comando == "comparar":
+        with open(argumentos.base, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        with open(argumentos.nuevo, encoding="utf-8") as archivo:
+            nuevo = json.load(archivo)
+        regresiones = comparar_resultados(base, nuevo, argumentos.umbral, argumentos.metrica)
+        for carga, fase, antes, despues, cambio in regresiones:
+            print(f"REGRESION {carga}/{fase}: {antes * 1000:.2f} ms -> "
+                  f"{despues * 1000:.2f} ms ({cambio:+.0%})")
+        print("Sin regresiones" if not regresiones else f"{len(regresiones)} regresion(es)")
+        sys.exit(1 if regresiones else 0)
+    elif argumentos.comando == "binario":
+        _mostrar_formato_binario(
+            benchmark_formato_binario(argumentos.mb, argumentos.ejecutable))
+    elif argumentos.comando == "compilacion":
+        _mostrar_compilacion(benchmark_compilacion(argumentos.mb, argumentos.repeticiones))
+    elif argumentos.comando == "motores":
+        _mostrar_motores(benchmark_motores(argumentos.operandos, argumentos.profundidad))
+    elif argumentos.comando == "tokens":
+        _mostrar_tokens(benchmark_tokens(argumentos.cantidad))
+    elif argumentos.comando == "memoria":
+        _mostrar_memoria(benchmark_memoria(argumentos.sentencias))
+    elif argumentos.comando == "evaluacion":
+        _mostrar_evaluacion(benchmark_evaluacion(argumentos.sentencias, argumentos.evaluaciones))
+    elif argumentos.comando == "cache":
+        _mostrar_cache(benchmark_cache(argumentos.sentencias))
+    elif argumentos.comando == "optimizacion":
+        _mostrar_optimizacion(benchmark_optimizacion(argumentos.sentencias))
+    elif argumentos.comando == "columnas":
+        _mostrar_columnas(benchmark_columnas(argumentos.sentencias, argumentos.filas))
+    elif argumentos.comando == "paralelo":
+        _mostrar_paralelo(benchmark_paralelo(argumentos.kb, argumentos.procesos,
+                                             argumentos.repeticiones))
+    elif argumentos.comando == "vista":
+        _mostrar_vista(benchmark_vista(argumentos.sentencias))
+    elif argumentos.comando == "mapeado":
+        _mostrar_mapeado(benchmark_mapeado(argumentos.sentencias))
+    elif argumentos.comando == "incremental":
+        _mostrar_incremental(benchmark_incremental(argumentos.lineas, argumentos.ediciones))
+    elif argumentos.comando == "en_vivo":
+        _mostrar_en_vivo(benchmark_en_vivo(argumentos.lineas, argumentos.ediciones))
+    elif argumentos.comando == "recuperacion":
+        _mostrar_recuperacion(benchmark_recuperacion(argumentos.sentencias, argumentos.errores))
+
+
+if __name__ == "__main__":
+    main()
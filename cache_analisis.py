@@ -0,0 +1,390 @@
+"""Cache de resultados de analisis: LRU en memoria acotado por bytes y sqlite opcional"""
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import analizador_lexico
+import analizador_sintactico
+from analizador_lexico import EJECUTABLE_FLEX, analizar_lexico, tokens_sintacticos
+from analizador_sintactico import (CLASE_POR_TIPO, AnalizadorSintactico, ArbolCompacto,
+                                   ErrorSintactico, Token, VistaNodo, sin_recolector)
+from perfilado import tramo
+
+# Cambia si cambia la forma serializada: invalida las entradas guardadas
+FORMATO = 2
+
+# Tamano por defecto del nivel en memoria, en bytes serializados
+MAX_BYTES = 64 << 20
+
+_version_fuentes = None
+
+
+def version_analisis(backend="python"):
+    """Hash del codigo del lexico y del sintactico (y del ejecutable de Flex si se usa).
+
+    Cualquier cambio en analizador_lexico.py o analizador_sintactico.py
+    cambia la version y con ella todas las claves; ese hash se calcula una
+    vez por proceso. Para los backends de Flex se agrega la clave de
+    compilacion anotada junto al ejecutable (o su tamano y fecha si no la
+    tiene), que se vuelve a leer en cada llamada porque la interfaz puede
+    recompilarlo.
+    """
+    global _version_fuentes
+    if _version_fuentes is None:
+        resumen = hashlib.sha256(f"formato {FORMATO}".encode("ascii"))
+        for modulo in (analizador_lexico, analizador_sintactico):
+            with open(modulo.__file__, "rb") as archivo:
+                resumen.update(archivo.read())
+        _version_fuentes = resumen.hexdigest()[:16]
+    if backend == "python":
+        return _version_fuentes
+    try:
+        with open(EJECUTABLE_FLEX + ".clave", encoding="ascii") as archivo:
+            ejecutable = archivo.read().strip()
+    except OSError:
+        try:
+            estado = os.stat(EJECUTABLE_FLEX)
+            ejecutable = f"{estado.st_size}-{estado.st_mtime_ns}"
+        except OSError:
+            ejecutable = "sin-ejecutable"
+    return f"{_version_fuentes}-{ejecutable}"
+
+
+class ResultadoAnalisis:
+    """Tokens lexicos (con los ERROR), arbol compacto (VistaNodo o None) y errores sintacticos"""
+    __slots__ = ("tokens", "arbol", "errores", "origen")
+
+    def __init__(self, tokens, arbol, errores, origen=None):
+        self.tokens = tokens
+        self.arbol = arbol
+        self.errores = errores
+        self.origen = origen  # None (recien calculado), "memoria" o "disco"
+
+    @property
+    def nodos(self):
+        return len(self.arbol.arbol) if self.arbol is not None else 0
+
+
+class EntradaInvalida(ValueError):
+    """Bytes guardados que no son un resultado serializado valido"""
+
+
+# Largo de la cabecera JSON, al comienzo de cada entrada
+_LARGO_CABECERA = struct.Struct("<I")
+# Tipo de cada columna de enteros, en el orden en que se guardan
+_COLUMNAS_TOKENS = ("B", "q", "i")
+_COLUMNAS_ARBOL = ("i",) * 5
+
+
+def serializar(tokens, arbol, errores):
+    """Bytes de un resultado: tokens y arbol como columnas de enteros mas tablas de cadenas.
+
+    Las cadenas y los escalares van en una cabecera JSON y las columnas
+    como bytes de array a continuacion: nada de lo guardado se ejecuta al
+    leerlo, asi una base sqlite ajena no puede correr codigo.
+    """
+    nombres = sorted({token.tipo for token in tokens})
+    indice_nombre = {nombre: i for i, nombre in enumerate(nombres)}
+    columnas = [
+        array("B", [indice_nombre[token.tipo] for token in tokens]),
+        array("q", [-1 if token.inicio is None else token.inicio for token in tokens]),
+        array("i", [-1 if token.linea is None else token.linea for token in tokens]),
+    ]
+    cabecera = {
+        "nombres": nombres,
+        "valores": [token.valor for token in tokens],
+        "errores": [[str(error), error.posicion, error.inicio, error.linea]
+                    for error in errores],
+        "arbol": None,
+    }
+    if arbol is not None:
+        if not isinstance(arbol, VistaNodo):
+            raise TypeError("El arbol debe ser compacto (VistaNodo de un ArbolCompacto)")
+        compacto = arbol.arbol
+        cabecera["arbol"] = {"raiz": arbol.indice, "cadenas": compacto.cadenas}
+        columnas.extend((compacto.tipos, compacto.valores, compacto.primer_hijo,
+                         compacto.siguiente_hermano, compacto._ultimo_hijo))
+    cabecera["columnas"] = [len(columna) for columna in columnas]
+    texto = json.dumps(cabecera, separators=(",", ":")).encode("ascii")
+    return b"".join([_LARGO_CABECERA.pack(len(texto)), texto,
+                     *(columna.tobytes() for columna in columnas)])
+
+
+def _leer(datos):
+    """(cabecera, columnas) de una entrada; lanza EntradaInvalida si no es valida"""
+    try:
+        largo, = _LARGO_CABECERA.unpack_from(datos)
+        desplazamiento = _LARGO_CABECERA.size + largo
+        cabecera = json.loads(bytes(datos[_LARGO_CABECERA.size:desplazamiento]))
+        tipos = _COLUMNAS_TOKENS + (_COLUMNAS_ARBOL if cabecera["arbol"] is not None else ())
+        if len(cabecera["columnas"]) != len(tipos):
+            raise EntradaInvalida("Columnas de mas o de menos")
+        columnas = []
+        for tipo, cantidad in zip(tipos, cabecera["columnas"]):
+            columna = array(tipo)
+            fin = desplazamiento + cantidad * columna.itemsize
+            if cantidad < 0 or fin > len(datos):
+                raise EntradaInvalida("Entrada truncada")
+            columna.frombytes(datos[desplazamiento:fin])
+            columnas.append(columna)
+            desplazamiento = fin
+    except (struct.error, ValueError, KeyError, TypeError) as e:
+        raise EntradaInvalida(f"Entrada de cache invalida: {e}") from e
+    if desplazamiento != len(datos):
+        raise EntradaInvalida("Bytes sobrantes")
+    return cabecera, columnas
+
+
+def _validar(cabecera, columnas):
+    """Verifica que los indices de las columnas esten dentro de sus tablas"""
+    tipos, inicios, lineas = columnas[:3]
+    textos = [cabecera["nombres"], cabecera["valores"]]
+    if cabecera["arbol"] is not None:
+        textos.append(cabecera["arbol"]["cadenas"])
+    if not all(isinstance(texto, str) for tabla in textos for texto in tabla):
+        raise EntradaInvalida("Tabla de cadenas con valores que no son texto")
+    if not (len(tipos) == len(inicios) == len(lineas) == len(cabecera["valores"])):
+        raise EntradaInvalida("Columnas de tokens de distinto largo")
+    if tipos and max(tipos) >= len(cabecera["nombres"]):
+        raise EntradaInvalida("Tipo de token fuera de la tabla")
+    if cabecera["arbol"] is not None:
+        nodos = len(columnas[3])
+        if any(len(columna) != nodos for columna in columnas[3:]):
+            raise EntradaInvalida("Columnas del arbol de distinto largo")
+        cadenas = len(cabecera["arbol"]["cadenas"])
+        if not 0 <= cabecera["arbol"]["raiz"] < nodos:
+            raise EntradaInvalida("Raiz fuera del arbol")
+        for columna, tope in zip(columnas[3:], (cadenas, cadenas, nodos, nodos, nodos)):
+            if columna and (max(columna) >= tope or min(columna) < -1):
+                raise EntradaInvalida("Indice del arbol fuera de rango")
+        # Cada nodo es primer hijo o siguiente hermano de a lo sumo un nodo, y
+        # la raiz de ninguno: desde la raiz los enlaces forman un arbol y
+        # recorrerlo termina (un ciclo necesitaria un nodo con dos entradas)
+        enlazados = [nodo for nodo in columnas[5] if nodo >= 0]
+        enlazados.extend(nodo for nodo in columnas[6] if nodo >= 0)
+        distintos = set(enlazados)
+        if len(distintos) != len(enlazados) or cabecera["arbol"]["raiz"] in distintos:
+            raise EntradaInvalida("Enlaces del arbol con ciclos o nodos compartidos")
+
+
+def deserializar(datos, origen=None):
+    """ResultadoAnalisis de unos bytes de serializar; lanza EntradaInvalida si no lo son"""
+    cabecera, columnas = _leer(datos)
+    try:
+        _validar(cabecera, columnas)
+        nombres, valores = cabecera["nombres"], cabecera["valores"]
+        tipos, inicios, lineas = columnas[:3]
+        clases = [CLASE_POR_TIPO.get(nombre, -1) for nombre in nombres]
+        with sin_recolector():
+            tokens = [Token(nombres[t], valor, None if inicio < 0 else inicio, clases[t],
+                            None if linea < 0 else linea)
+                      for t, valor, inicio, linea in zip(tipos, valores, inicios, lineas)]
+
+        arbol = None
+        if cabecera["arbol"] is not None:
+            compacto = ArbolCompacto()
+            for columna, leida in zip((compacto.tipos, compacto.valores,
+                                       compacto.primer_hijo, compacto.siguiente_hermano,
+                                       compacto._ultimo_hijo), columnas[3:]):
+                columna.extend(leida)
+            compacto.internar_varias(cabecera["arbol"]["cadenas"])
+            arbol = compacto.resultado(cabecera["arbol"]["raiz"])
+
+        errores = []
+        for mensaje, posicion, inicio, linea in cabecera["errores"]:
+            error = ErrorSintactico(mensaje, posicion)
+            error.inicio, error.linea = inicio, linea
+            errores.append(error)
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        if isinstance(e, EntradaInvalida):
+            raise
+        raise EntradaInvalida(f"Entrada de cache invalida: {e}") from e
+    return ResultadoAnalisis(tokens, arbol, errores, origen)
+
+
+class CacheAnalisis:
+    """Resultados de analisis por hash del codigo, backend, motor y version del analizador.
+
+    El nivel en memoria es un LRU de objetos ResultadoAnalisis ya
+    armados, acotado por max_bytes (medidos como su tamano serializado):
+    al pasarse se desalojan los menos usados. Con ruta se agrega un nivel
+    persistente en sqlite con los bytes de serializar, compartido entre
+    ejecuciones y procesos; un acierto en disco se decodifica una vez y
+    sube a memoria. max_bytes_disco acota el archivo desalojando por fecha
+    de ultimo uso. Los tokens, el arbol y los errores de un acierto en
+    memoria se comparten entre quienes los piden: no se deben modificar.
+    Se puede usar desde varios hilos.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, ruta=None, max_bytes_disco=None):
+        self.max_bytes = max_bytes
+        self.max_bytes_disco = max_bytes_disco
+        # clave -> (ResultadoAnalisis, tamano serializado), del menos al mas usado
+        self._memoria = OrderedDict()
+        self._bytes = 0
+        self._candado = threading.Lock()
+        self.aciertos_memoria = self.aciertos_disco = self.fallos = 0
+        self.guardados = self.desalojados = 0
+        self.ruta = ruta
+        self._conexion = None
+        if ruta is not None:
+            carpeta = os.path.dirname(ruta)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            self._conexion = sqlite3.connect(ruta, timeout=30, check_same_thread=False,
+                                             isolation_level=None)
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS resultados (clave TEXT PRIMARY KEY, "
+                "datos BLOB NOT NULL, tamano INTEGER NOT NULL, usado REAL NOT NULL)")
+            self._conexion.execute(
+                "CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado)")
+
+    def clave(self, codigo, backend="python", motor="iterativo"):
+        resumen = hashlib.sha256(f"{version_analisis(backend)}\0{backend}\0{motor}\0".encode())
+        resumen.update(codigo.encode("utf-8", "surrogatepass"))
+        return resumen.hexdigest()
+
+    def obtener(self, clave):
+        """ResultadoAnalisis guardado con esa clave, o None.
+
+        Una entrada que no se puede decodificar (corrupta o de otro
+        formato) cuenta como fallo y se descarta.
+        """
+        with self._candado:
+            entrada = self._memoria.get(clave)
+            if entrada is not None:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+                resultado = entrada[0]
+                return ResultadoAnalisis(resultado.tokens, resultado.arbol, resultado.errores,
+                                         "memoria")
+            fila = None
+            if self._conexion is not None:
+                fila = self._conexion.execute("SELECT datos FROM resultados WHERE clave = ?",
+                                              (clave,)).fetchone()
+            if fila is None:
+                self.fallos += 1
+                return None
+        datos = fila[0]
+        try:
+            resultado = deserializar(datos, "disco")
+        except EntradaInvalida:
+            with self._candado:
+                self.fallos += 1
+                self._conexion.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+            return None
+        with self._candado:
+            self.aciertos_disco += 1
+            self._conexion.execute("UPDATE resultados SET usado = ? WHERE clave = ?",
+                                   (time.time(), clave))
+            self._guardar_en_memoria(clave, resultado, len(datos))
+        return resultado
+
+    def guardar(self, clave, tokens, arbol, errores):
+        """Guarda un resultado (arbol compacto o None); retorna su tamano serializado"""
+        datos = serializar(tokens, arbol, errores)
+        with self._candado:
+            self.guardados += 1
+            self._guardar_en_memoria(clave, ResultadoAnalisis(tokens, arbol, errores),
+                                     len(datos))
+            if self._conexion is not None:
+                self._conexion.execute(
+                    "INSERT OR REPLACE INTO resultados (clave, datos, tamano, usado) "
+                    "VALUES (?, ?, ?, ?)", (clave, datos, len(datos), time.time()))
+                if self.max_bytes_disco is not None:
+                    self._podar_disco()
+        return len(datos)
+
+    def analizar(self, codigo, backend="python", motor="iterativo", perfilador=None,
+                 verificar=None):
+        """ResultadoAnalisis del codigo: de la cache o analizando (con recuperacion) y guardando.
+
+        verificar(), si se da, se llama antes del lexico, del sintactico y de
+        guardar; si lanza una excepcion el analisis se abandona sin guardar.
+        """
+        verificar = verificar or (lambda: None)
+        clave = self.clave(codigo, backend, motor)
+        with tramo(perfilador, "cache"):
+            resultado = self.obtener(clave)
+        if perfilador is not None:
+            perfilador.contar("cache_aciertos" if resultado is not None else "cache_fallos")
+        if resultado is not None:
+            return resultado
+
+        verificar()
+        tokens = analizar_lexico(codigo, backend, perfilador)
+        verificar()
+        arbol, errores = AnalizadorSintactico(tokens_sintacticos(tokens), motor, "compacto",
+                                              recuperacion=True,
+                                              perfilador=perfilador).analizar()
+        verificar()
+        with tramo(perfilador, "cache_guardar"):
+            self.guardar(clave, tokens, arbol, errores)
+        return ResultadoAnalisis(tokens, arbol, errores)
+
+    def _guardar_en_memoria(self, clave, resultado, tamano):
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes -= anterior[1]
+        if tamano > self.max_bytes:
+            return  # no cabe: solo queda en disco
+        self._memoria[clave] = (resultado, tamano)
+        self._bytes += tamano
+        while self._bytes > self.max_bytes:
+            _, (_, desalojado) = self._memoria.popitem(last=False)
+            self._bytes -= desalojado
+            self.desalojados += 1
+
+    def _podar_disco(self):
+        total = self._conexion.execute("SELECT COALESCE(SUM(tamano), 0) FROM resultados")
+        exceso = total.fetchone()[0] - self.max_bytes_disco
+        if exceso <= 0:
+            return
+        filas = self._conexion.execute("SELECT clave, tamano FROM resultados ORDER BY usado")
+        viejas = []
+        for clave, tamano in filas:
+            if exceso <= 0:
+                break
+            viejas.append((clave,))
+            exceso -= tamano
+        self._conexion.executemany("DELETE FROM resultados WHERE clave = ?", viejas)
+
+    def vaciar(self):
+        """Descarta todas las entradas (tambien las del disco) sin tocar las estadisticas"""
+        with self._candado:
+            self._memoria.clear()
+            self._bytes = 0
+            if self._conexion is not None:
+                self._conexion.execute("DELETE FROM resultados")
+
+    def estadisticas(self):
+        consultas = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        estadisticas = {
+            "aciertos_memoria": self.aciertos_memoria,
+            "aciertos_disco": self.aciertos_disco,
+            "fallos": self.fallos,
+            "tasa_aciertos": (consultas - self.fallos) / consultas if consultas else None,
+            "guardados": self.guardados,
+            "desalojados": self.desalojados,
+            "entradas_memoria": len(self._memoria),
+            "bytes_memoria": self._bytes,
+        }
+        if self._conexion is not None:
+            with self._candado:
+                entradas, bytes_disco = self._conexion.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM resultados").fetchone()
+            estadisticas["entradas_disco"] = entradas
+            estadisticas["bytes_disco"] = bytes_disco
+        return estadisticas
+
+    def cerrar(self):
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
@@ -0,0 +1,163 @@
+"""Compilacion de analizador.l con Flex y GCC, con cache por contenido y perfiles"""
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+from analizador_lexico import EJECUTABLE_FLEX
+
+FUENTE_FLEX = "analizador.l"
+DIRECTORIO_CACHE = ".cache_analizador"
+
+# Opciones (flex, gcc) de cada perfil. "normal" reproduce la compilacion
+# original: tablas comprimidas y sin optimizar. "rapido" genera tablas
+# completas (-CF: una transicion por estado y byte, sin yy_chk ni yy_def) y
+# compila con -O2; el ejecutable es mas grande pero escanea mas rapido.
+PERFILES = {
+    "normal": ((), ()),
+    "rapido": (("-CF",), ("-O2",)),
+}
+
+_versiones = {}
+
+
+class ErrorCompilacion(RuntimeError):
+    """Flex o GCC terminaron con error; 'detalle' es su salida de error"""
+
+    def __init__(self, herramienta, detalle):
+        super().__init__(f"Error en {herramienta}:\n{detalle}")
+        self.herramienta = herramienta
+        self.detalle = detalle
+
+
+def opciones_perfil(perfil):
+    """(opciones de flex, opciones de gcc) de un perfil por nombre o dado como tupla"""
+    if isinstance(perfil, str):
+        if perfil not in PERFILES:
+            raise ValueError(f"Perfil de compilacion desconocido: '{perfil}'")
+        return PERFILES[perfil]
+    opciones_flex, opciones_gcc = perfil
+    return tuple(opciones_flex), tuple(opciones_gcc)
+
+
+def version_herramienta(programa):
+    """Primera linea de 'programa --version', o None si no esta instalado.
+
+    Se consulta una vez por proceso.
+    """
+    if programa not in _versiones:
+        try:
+            resultado = subprocess.run([programa, "--version"], capture_output=True, text=True,
+                                       timeout=10)
+            salida = resultado.stdout.strip() or resultado.stderr.strip()
+            _versiones[programa] = salida.splitlines()[0] if salida else ""
+        except (OSError, subprocess.TimeoutExpired):
+            _versiones[programa] = None
+    return _versiones[programa]
+
+
+def herramientas_disponibles(flex="flex", gcc="gcc"):
+    """True si Flex y GCC estan instalados (se puede recompilar)"""
+    return version_herramienta(flex) is not None and version_herramienta(gcc) is not None
+
+
+def clave_compilacion(fuente=FUENTE_FLEX, perfil="normal", flex="flex", gcc="gcc"):
+    """Hash del contenido de la fuente, las versiones de flex y gcc y las opciones"""
+    opciones_flex, opciones_gcc = opciones_perfil(perfil)
+    resumen = hashlib.sha256()
+    with open(fuente, "rb") as archivo:
+        resumen.update(archivo.read())
+    for parte in (version_herramienta(flex), version_herramienta(gcc),
+                  " ".join(opciones_flex), " ".join(opciones_gcc)):
+        resumen.update(b"\0" + str(parte).encode("utf-8"))
+    return resumen.hexdigest()[:32]
+
+
+def _ruta_clave(destino):
+    return destino + ".clave"
+
+
+def esta_actualizado(destino, clave):
+    """True si destino existe y fue instalado desde la compilacion con esa clave"""
+    try:
+        with open(_ruta_clave(destino), encoding="ascii") as archivo:
+            return archivo.read().strip() == clave and os.path.exists(destino)
+    except OSError:
+        return False
+
+
+def _ejecutar(herramienta, argumentos, timeout):
+    resultado = subprocess.run(argumentos, capture_output=True, text=True, timeout=timeout)
+    if resultado.returncode != 0:
+        raise ErrorCompilacion(herramienta, resultado.stderr)
+
+
+def _instalar(ejecutable, destino, clave):
+    """Copia el ejecutable a destino (reemplazo atomico) y anota su clave"""
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    shutil.copy2(ejecutable, temporal)
+    os.replace(temporal, destino)
+    with open(_ruta_clave(destino), "w", encoding="ascii") as archivo:
+        archivo.write(clave + "\n")
+
+
+def compilar(fuente=FUENTE_FLEX, destino=EJECUTABLE_FLEX, perfil="normal",
+             cache=DIRECTORIO_CACHE, flex="flex", gcc="gcc", informar=None, timeout=60):
+    """Deja en destino el analizador compilado de fuente con el perfil dado.
+
+    Los artefactos (lex.yy.c y el ejecutable) se guardan en cache/<clave>,
+    con la clave de clave_compilacion(); si ya existen no se ejecuta ni Flex
+    ni GCC. Retorna (clave, origen) con origen "actual" (destino ya era esa
+    compilacion), "cache" o "compilado". informar(texto), si se da, recibe
+    el avance de cada paso. Lanza ErrorCompilacion si Flex o GCC fallan y
+    FileNotFoundError si no estan instalados.
+    """
+    informar = informar or (lambda texto: None)
+    opciones_flex, opciones_gcc = opciones_perfil(perfil)
+    clave = clave_compilacion(fuente, perfil, flex, gcc)
+
+    if esta_actualizado(destino, clave):
+        return clave, "actual"
+
+    carpeta = os.path.join(cache, clave)
+    ejecutable = os.path.join(carpeta, os.path.basename(destino))
+    if os.path.exists(ejecutable):
+        _instalar(ejecutable, destino, clave)
+        return clave, "cache"
+
+    # Se compila en una carpeta temporal dentro de la cache y al terminar se
+    # renombra, asi un proceso concurrente nunca ve una compilacion a medias
+    os.makedirs(cache, exist_ok=True)
+    temporal = tempfile.mkdtemp(prefix="tmp-", dir=cache)
+    try:
+        fuente_c = os.path.join(temporal, "lex.yy.c")
+        _ejecutar("Flex", [flex, *opciones_flex, "-o", fuente_c, fuente], timeout)
+        informar("Flex OK\n")
+        _ejecutar("GCC", [gcc, *opciones_gcc, fuente_c, "-o",
+                          os.path.join(temporal, os.path.basename(destino))], timeout)
+        informar("GCC OK\n")
+        try:
+            os.replace(temporal, carpeta)
+        except OSError:
+            pass  # otro proceso guardo la misma clave primero
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    _instalar(ejecutable, destino, clave)
+    return clave, "compilado"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--perfil", choices=tuple(PERFILES), default="normal")
+    parser.add_argument("--fuente", default=FUENTE_FLEX)
+    parser.add_argument("--destino", default=EJECUTABLE_FLEX)
+    parser.add_argument("--cache", default=DIRECTORIO_CACHE)
+    argumentos = parser.parse_args()
+
+    clave, origen = compilar(argumentos.fuente, argumentos.destino, argumentos.perfil,
+                             argumentos.cache, informar=lambda texto: print(texto, end=""))
+    print(f"{argumentos.destino}: {origen} (perfil {argumentos.perfil}, clave {clave})")
@@ -0,0 +1,458 @@
+"""Evaluacion de programas: compilacion del arbol a codigo Python con tabla de simbolos"""
+from decimal import Decimal
+
+from analizador_sintactico import NodoArbol
+
+# Una expresion mas anidada que esto se parte en variables temporales: el
+# compilador de Python tiene un limite de anidamiento y las cadenas largas de
+# operadores producen arboles tan profundos como largos
+LIMITE_ANIDAMIENTO = 32
+
+# Filas por bloque en evaluar_columnas: acota la memoria de los temporales
+TAMANO_BLOQUE = 1 << 16
+
+_OPERADORES = {"+", "-", "*", "/"}
+
+
+class ErrorEvaluacion(RuntimeError):
+    """Error al compilar o evaluar un programa.
+
+    'sentencia' es el indice (desde 0) de la sentencia del Programa donde
+    ocurrio, o None.
+    """
+
+    def __init__(self, mensaje, sentencia=None):
+        super().__init__(mensaje)
+        self.sentencia = sentencia
+
+
+def dividir(a, b):
+    """Division exacta: int/int da int si es exacta y Decimal si no; con Decimal, Decimal"""
+    if not b:
+        raise ZeroDivisionError("Division por cero")
+    if type(a) is int and type(b) is int:
+        cociente, resto = divmod(a, b)
+        if not resto:
+            return cociente
+        return Decimal(a) / Decimal(b)
+    return a / b
+
+
+def convertir_valor(valor):
+    """Valor de entrada como int o Decimal (los float se toman por su texto)"""
+    if isinstance(valor, (int, Decimal)) and not isinstance(valor, bool):
+        return valor
+    if isinstance(valor, float):
+        return Decimal(repr(valor))
+    if isinstance(valor, str):
+        return Decimal(valor) if "." in valor else int(valor)
+    raise TypeError(f"Valor no numerico: {valor!r}")
+
+
+def _compartidos(raiz):
+    """ids de las Operacion que se evaluan mas de una vez en un DAG de NodoArbol.
+
+    Son las que tienen varios padres y las que son la expresion de una
+    sentencia repetida; las que estan dentro de una Operacion compartida ya
+    quedan en el temporal de esta.
+    """
+    padres = {}
+    primero = {}  # id -> (nodo, su primer padre)
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        for hijo in nodo.hijos:
+            clave = id(hijo)
+            if clave in padres:
+                padres[clave] += 1
+            else:
+                padres[clave] = 1
+                primero[clave] = (hijo, nodo)
+                pendientes.append(hijo)
+    # Los nodos siguen vivos en el arbol, asi sus ids no se reutilizan
+    return {clave for clave, (nodo, padre) in primero.items()
+            if nodo.tipo == "Operacion"
+            and (padres[clave] > 1
+                 or padre.tipo != "Operacion" and padres.get(id(padre), 1) > 1)}
+
+
+def _sentencias(programa):
+    if programa.tipo != "Programa":
+        raise ErrorEvaluacion(f"Error: Se esperaba un Programa, no '{programa.tipo}'")
+    return programa.hijos
+
+
+def _verificar_sentencia(sentencia, indice):
+    """(nombre asignado o None, expresion) de una sentencia evaluable"""
+    if sentencia.tipo == "Error":
+        raise ErrorEvaluacion(f"Error: La sentencia {indice + 1} tiene errores de sintaxis "
+                              f"({sentencia.valor})", indice)
+    if sentencia.tipo == "Asignacion":
+        hijos = sentencia.hijos
+        if len(hijos) != 2:
+            raise ErrorEvaluacion(f"Error: Asignacion incompleta en la sentencia {indice + 1}",
+                                  indice)
+        return hijos[0].valor, hijos[1]
+    return None, sentencia
+
+
+def _mensaje(error, indice, nombre):
+    if indice is None:
+        donde = "el programa"
+    else:
+        donde = f"la sentencia {indice + 1}" + (f" (asignacion a '{nombre}')" if nombre else "")
+    if isinstance(error, ZeroDivisionError):
+        return f"Error: Division por cero en {donde}"
+    return f"Error: {type(error).__name__} en {donde}"
+
+
+class ProgramaCompilado:
+    """Programa traducido una vez a una funcion de Python.
+
+    Cada variable tiene una ranura en un arreglo plano; 'ranura' da la de
+    cada nombre y 'nombres' el nombre de cada ranura. 'entradas' son las
+    variables que se leen antes de asignarse: sus valores los da quien
+    evalua, y 'asignadas' las que el programa asigna. Las asignaciones se
+    traducen a codigo de tres direcciones sobre variables locales
+    (Identificador → variable local de su ranura, Decimal → constante
+    precargada, '/' → dividir()), y al terminar los valores se copian a las
+    ranuras. Las sentencias que son solo una
+    expresion se evaluan (pueden fallar) pero su valor no se guarda.
+
+    Si el programa es un DAG de NodoArbol (optimizador.optimizar), cada
+    Operacion que se evalua mas de una vez se calcula en un temporal y se
+    reutiliza mientras no se asigne ninguna de las variables que lee.
+    """
+
+    def __init__(self, programa):
+        self.nombres = []
+        self.ranura = {}
+        self.entradas = []
+        self.asignadas = []
+        self._primera_lectura = {}   # entrada -> sentencia que la lee primero
+        self._constantes = []
+        self._indice_constante = {}
+        self._sentencia_de_linea = {}
+        self._nombre_de_sentencia = []
+        self._temporales = 0
+        # Subexpresiones compartidas: id -> temporal vigente, id -> variables
+        # que lee, y variable -> ids de los temporales que dependen de ella
+        self._compartidos = _compartidos(programa) if isinstance(programa, NodoArbol) else set()
+        self._comunes = {}
+        self._leidas = {}
+        self._dependientes = {}
+
+        cuerpo = []
+        for indice, sentencia in enumerate(_sentencias(programa)):
+            nombre, expresion = _verificar_sentencia(sentencia, indice)
+            codigo = self._expresion(expresion, indice, cuerpo)
+            if nombre is None:
+                cuerpo.append((codigo, indice))
+            else:
+                if nombre not in self.asignadas:
+                    self.asignadas.append(nombre)
+                cuerpo.append((f"{self._variable(nombre)} = {codigo}", indice))
+                for clave in self._dependientes.pop(nombre, ()):
+                    self._comunes.pop(clave, None)
+            self._nombre_de_sentencia.append(nombre)
+
+        lineas = ["def _programa(_r, _c, _dividir=dividir):"]
+        if self._constantes:
+            lineas.append(f"    {', '.join(f'c{i}' for i in range(len(self._constantes)))}, = _c")
+        for nombre in self.entradas:
+            ranura = self.ranura[nombre]
+            lineas.append(f"    v{ranura} = _r[{ranura}]")
+        for texto, indice in cuerpo:
+            lineas.append("    " + texto)
+            self._sentencia_de_linea[len(lineas)] = indice
+        if self.nombres:
+            lineas.append(f"    _r[:] = ({', '.join(f'v{i}' for i in range(len(self.nombres)))},)")
+        self.fuente = "\n".join(lineas) + "\n"
+
+        espacio = {"dividir": dividir}
+        self._codigo = compile(self.fuente, "<programa>", "exec")
+        exec(self._codigo, espacio)
+        self._funcion = espacio["_programa"]
+        self._constantes = tuple(self._constantes)
+
+    def _variable(self, nombre):
+        ranura = self.ranura.get(nombre)
+        if ranura is None:
+            ranura = self.ranura[nombre] = len(self.nombres)
+            self.nombres.append(nombre)
+        return f"v{ranura}"
+
+    def _expresion(self, raiz, indice, cuerpo):
+        """Codigo de una expresion; las partes muy anidadas van a temporales en cuerpo"""
+        # Recorrido en postorden con pila explicita; 'valores' guarda
+        # (codigo, anidamiento) de los subarboles ya traducidos
+        valores = []
+        pendientes = [(raiz, False)]
+        while pendientes:
+            nodo, visitado = pendientes.pop()
+            tipo = nodo.tipo
+            if tipo == "Operacion":
+                if not visitado:
+                    comun = self._comunes.get(id(nodo)) if self._compartidos else None
+                    if comun is not None:
+                        valores.append((comun, 0))
+                        continue
+                    hijos = nodo.hijos
+                    if len(hijos) != 2 or nodo.valor not in _OPERADORES:
+                        raise ErrorEvaluacion(
+                            f"Error: Operacion mal formada en la sentencia {indice + 1}", indice)
+                    pendientes.append((nodo, True))
+                    pendientes.append((hijos[1], False))
+                    pendientes.append((hijos[0], False))
+                    continue
+                derecho, nivel_derecho = valores.pop()
+                izquierdo, nivel_izquierdo = valores.pop()
+                if nodo.valor == "/":
+                    codigo = f"_dividir({izquierdo}, {derecho})"
+                else:
+                    codigo = f"({izquierdo} {nodo.valor} {derecho})"
+                nivel = max(nivel_izquierdo, nivel_derecho) + 1
+                if id(nodo) in self._compartidos:
+                    temporal = f"t{self._temporales}"
+                    self._temporales += 1
+                    cuerpo.append((f"{temporal} = {codigo}", indice))
+                    codigo, nivel = temporal, 0
+                    self._comunes[id(nodo)] = temporal
+                    for leida in self._variables_leidas(nodo):
+                        self._dependientes.setdefault(leida, []).append(id(nodo))
+                elif nivel >= LIMITE_ANIDAMIENTO:
+                    temporal = f"t{self._temporales}"
+                    self._temporales += 1
+                    cuerpo.append((f"{temporal} = {codigo}", indice))
+                    codigo, nivel = temporal, 0
+                valores.append((codigo, nivel))
+            elif tipo == "Numero":
+                valores.append((str(int(nodo.valor)), 0))
+            elif tipo == "Decimal":
+                valores.append((self._constante(Decimal(nodo.valor)), 0))
+            elif tipo == "Identificador":
+                nombre = nodo.valor
+                if nombre not in self.ranura:
+                    self.entradas.append(nombre)
+                    self._primera_lectura[nombre] = indice
+                valores.append((self._variable(nombre), 0))
+            else:
+                raise ErrorEvaluacion(f"Error: Nodo '{tipo}' no evaluable en la sentencia "
+                                      f"{indice + 1}", indice)
+        return valores[0][0]
+
+    def _variables_leidas(self, nodo):
+        """Variables que lee un subarbol compartido (memorizado por nodo compartido)"""
+        if id(nodo) in self._leidas:
+            return self._leidas[id(nodo)]
+        leidas = set()
+        pendientes = list(nodo.hijos)
+        while pendientes:
+            hijo = pendientes.pop()
+            if hijo.tipo == "Identificador":
+                leidas.add(hijo.valor)
+            elif id(hijo) in self._leidas:
+                leidas |= self._leidas[id(hijo)]
+            else:
+                pendientes.extend(hijo.hijos)
+        self._leidas[id(nodo)] = leidas
+        return leidas
+
+    def _constante(self, valor):
+        clave = str(valor)
+        indice = self._indice_constante.get(clave)
+        if indice is None:
+            indice = self._indice_constante[clave] = len(self._constantes)
+            self._constantes.append(valor)
+        return f"c{indice}"
+
+    def ejecutar(self, ranuras):
+        """Evalua sobre una lista de ranuras (las de entradas ya cargadas) y la actualiza.
+
+        Es el camino rapido para evaluar muchas veces: no convierte ni
+        verifica las entradas.
+        """
+        return self._ejecutar(ranuras, self._constantes, dividir)
+
+    def _ejecutar(self, ranuras, constantes, division):
+        """ejecutar() con otras constantes y otra division (p. ej. las de NumPy)"""
+        try:
+            self._funcion(ranuras, constantes, division)
+        except ArithmeticError as e:
+            indice = self._sentencia_del_error(e)
+            nombre = None if indice is None else self._nombre_de_sentencia[indice]
+            raise ErrorEvaluacion(_mensaje(e, indice, nombre), indice) from e
+        return ranuras
+
+    def evaluar(self, entradas=None):
+        """Retorna {variable: valor} con los valores de 'entradas' (nombre -> numero)"""
+        entradas = entradas or {}
+        ranuras = [None] * len(self.nombres)
+        for nombre in self.entradas:
+            if nombre not in entradas:
+                raise self._sin_valor(nombre)
+            ranuras[self.ranura[nombre]] = convertir_valor(entradas[nombre])
+        self.ejecutar(ranuras)
+        return dict(zip(self.nombres, ranuras))
+
+    def _sin_valor(self, nombre):
+        indice = self._primera_lectura[nombre]
+        return ErrorEvaluacion(f"Error: Variable sin valor '{nombre}' en la sentencia "
+                               f"{indice + 1}", indice)
+
+    def _sentencia_del_error(self, error):
+        """Sentencia de la linea del codigo generado donde se lanzo el error"""
+        traza = error.__traceback__
+        linea = None
+        while traza is not None:
+            if traza.tb_frame.f_code is self._funcion.__code__:
+                linea = traza.tb_lineno
+            traza = traza.tb_next
+        return self._sentencia_de_linea.get(linea)
+
+
+def compilar_programa(programa):
+    """Compila un arbol Programa (NodoArbol o VistaNodo) a un ProgramaCompilado"""
+    return ProgramaCompilado(programa)
+
+
+def interpretar(programa, entradas=None):
+    """Evaluacion directa recorriendo el arbol en cada llamada (referencia y comparacion).
+
+    Mismos valores y errores que ProgramaCompilado.evaluar, salvo que este
+    reporta las entradas sin valor antes de empezar a evaluar.
+    """
+    valores = {nombre: convertir_valor(valor) for nombre, valor in (entradas or {}).items()}
+    resultado = {}
+
+    def evaluar(nodo, indice):
+        tipo = nodo.tipo
+        if tipo == "Numero":
+            return int(nodo.valor)
+        if tipo == "Decimal":
+            return Decimal(nodo.valor)
+        if tipo == "Identificador":
+            if nodo.valor in resultado:
+                return resultado[nodo.valor]
+            if nodo.valor not in valores:
+                raise ErrorEvaluacion(f"Error: Variable sin valor '{nodo.valor}' en la "
+                                      f"sentencia {indice + 1}", indice)
+            return resultado.setdefault(nodo.valor, valores[nodo.valor])
+        if tipo == "Operacion" and nodo.valor in _OPERADORES and len(nodo.hijos) == 2:
+            izquierdo = evaluar(nodo.hijos[0], indice)
+            derecho = evaluar(nodo.hijos[1], indice)
+            if nodo.valor == "+":
+                return izquierdo + derecho
+            if nodo.valor == "-":
+                return izquierdo - derecho
+            if nodo.valor == "*":
+                return izquierdo * derecho
+            return dividir(izquierdo, derecho)
+        raise ErrorEvaluacion(f"Error: Nodo '{tipo}' no evaluable en la sentencia {indice + 1}",
+                              indice)
+
+    for indice, sentencia in enumerate(_sentencias(programa)):
+        nombre, expresion = _verificar_sentencia(sentencia, indice)
+        try:
+            valor = evaluar(expresion, indice)
+        except ArithmeticError as e:
+            raise ErrorEvaluacion(_mensaje(e, indice, nombre), indice) from e
+        if nombre is not None:
+            resultado[nombre] = valor
+    return resultado
+
+
+def _importar_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("evaluar_columnas necesita NumPy: pip install numpy") from e
+    return numpy
+
+
+class _DivisionPorCeroEnFila(ZeroDivisionError):
+    def __init__(self, fila):
+        super().__init__("Division por cero")
+        self.fila = fila
+
+
+def _division_columnas(numpy):
+    def dividir_columnas(a, b):
+        ceros = numpy.equal(b, 0)
+        if ceros.any():
+            raise _DivisionPorCeroEnFila(int(numpy.flatnonzero(ceros)[0]) if ceros.ndim else 0)
+        return numpy.true_divide(a, b)
+    return dividir_columnas
+
+
+def evaluar_columnas(programa, columnas, tamano_bloque=TAMANO_BLOQUE, filas=None):
+    """Evalua un programa sobre columnas de valores: una operacion por arreglo completo.
+
+    programa es un arbol Programa o un ProgramaCompilado. columnas da, por
+    nombre, los valores de cada entrada: un arreglo de NumPy, una lista o
+    un escalar (se repite en todas las filas); sirve un dict o una tabla
+    columnar que se indexe por nombre (p. ej. un DataFrame). Retorna
+    {variable asignada: arreglo de NumPy}; las asignaciones se encadenan, asi
+    que una sentencia usa las columnas que calcularon las anteriores.
+
+    filas da el largo cuando ninguna entrada es un arreglo (por defecto
+    1); si se da, las columnas deben tenerlo. Las filas se procesan en
+    bloques de tamano_bloque para acotar la memoria de los temporales.
+    Semantica de NumPy: Numero es int64, Decimal es
+    float64 y '/' siempre da float64 (una division exacta no vuelve a
+    int) y un desborde de int64 no se detecta. Como cada operacion se
+    aplica a todas las filas antes de la siguiente, una division por cero
+    lanza ErrorEvaluacion con la primera sentencia y la primera fila de la
+    division que falla, que puede no ser la primera fila con error.
+    """
+    numpy = _importar_numpy()
+    if not isinstance(programa, ProgramaCompilado):
+        programa = compilar_programa(programa)
+
+    entradas = {}
+    for nombre in programa.entradas:
+        try:
+            columna = columnas[nombre]
+        except KeyError:
+            raise programa._sin_valor(nombre) from None
+        columna = numpy.asarray(columna)
+        if columna.dtype.kind not in "biuf":
+            columna = columna.astype(numpy.float64)
+        if columna.ndim > 1:
+            raise ValueError(f"La columna '{nombre}' debe ser un arreglo de una dimension")
+        if columna.ndim == 1:
+            if filas is None:
+                filas = len(columna)
+            elif len(columna) != filas:
+                raise ValueError(f"La columna '{nombre}' tiene {len(columna)} filas, "
+                                 f"se esperaban {filas}")
+        entradas[nombre] = columna
+    if filas is None:
+        filas = 1
+
+    constantes = tuple(numpy.float64(constante) for constante in programa._constantes)
+    division = _division_columnas(numpy)
+    resultados = {}
+    for inicio in range(0, filas, tamano_bloque):
+        fin = min(inicio + tamano_bloque, filas)
+        ranuras = [None] * len(programa.nombres)
+        for nombre, columna in entradas.items():
+            ranuras[programa.ranura[nombre]] = columna[inicio:fin] if columna.ndim else columna
+        try:
+            programa._ejecutar(ranuras, constantes, division)
+        except ErrorEvaluacion as e:
+            if isinstance(e.__cause__, _DivisionPorCeroEnFila):
+                raise ErrorEvaluacion(f"{e}, fila {inicio + e.__cause__.fila}",
+                                      e.sentencia) from e.__cause__
+            raise
+
+        for nombre in programa.asignadas:
+            valor = numpy.asarray(ranuras[programa.ranura[nombre]])
+            salida = resultados.get(nombre)
+            if salida is None:
+                salida = resultados[nombre] = numpy.empty(filas, valor.dtype)
+            elif not numpy.can_cast(valor.dtype, salida.dtype, "safe"):
+                salida = resultados[nombre] = salida.astype(
+                    numpy.result_type(salida.dtype, valor.dtype))
+            salida[inicio:fin] = valor
+    return resultados
@@ -1,309 +1,601 @@
-import tkinter as tk
-from tkinter import scrolledtext, messagebox
-import subprocess
-import os
-from analizador_sintactico import parsear_tokens, AnalizadorSintactico, imprimir_arbol
-
-class AnalizadorCompletoGUI:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Analizador Lexico y Sintactico")
-        self.root.geometry("900x700")
-        
-        bg_color = "#f0f0f0"
-        self.root.configure(bg=bg_color)
-        
-        main_frame = tk.Frame(root, bg=bg_color)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        # TÍTULO
-        titulo = tk.Label(main_frame, 
-                         text="Analizador Lexico y Sintactico",
-                         font=("Arial", 16, "bold"),
-                         bg=bg_color,
-                         fg="#2c3e50")
-        titulo.pack(pady=(0, 5))
-        
-        subtitulo = tk.Label(main_frame,
-                            text="Ingresa expresiones matematicas o asignaciones (ej: x = 3 + 5)",
-                            font=("Arial", 10),
-                            bg=bg_color,
-                            fg="#7f8c8d")
-        subtitulo.pack(pady=(0, 15))
-        
-        # FRAME DE ENTRADA
-        entrada_frame = tk.LabelFrame(main_frame,
-                                      text="  Codigo Fuente  ",
-                                      font=("Arial", 11, "bold"),
-                                      bg=bg_color,
-                                      fg="#34495e",
-                                      padx=10,
-                                      pady=10)
-        entrada_frame.pack(fill=tk.BOTH, pady=(0, 10))
-        
-        self.entrada = scrolledtext.ScrolledText(entrada_frame,
-                                                 height=5,
-                                                 width=90,
-                                                 font=("Consolas", 11),
-                                                 wrap=tk.WORD,
-                                                 borderwidth=2,
-                                                 relief=tk.GROOVE)
-        self.entrada.pack(padx=5, pady=5)
-        
-        ejemplo = "x = 3 + 5\ny = x * 2"
-        self.entrada.insert("1.0", ejemplo)
-        self.entrada.tag_add("ejemplo", "1.0", tk.END)
-        self.entrada.tag_config("ejemplo", foreground="gray")
-        
-        self.entrada.bind("<FocusIn>", self.limpiar_ejemplo)
-        self.es_ejemplo = True
-        
-        # BOTONES
-        botones_frame = tk.Frame(main_frame, bg=bg_color)
-        botones_frame.pack(pady=10)
-        
-        self.btn_analizar = tk.Button(botones_frame,
-                                      text="▶ Analizar",
-                                      command=self.analizar_completo,
-                                      bg="#27ae60",
-                                      fg="white",
-                                      font=("Arial", 12, "bold"),
-                                      width=15,
-                                      height=1,
-                                      cursor="hand2",
-                                      relief=tk.RAISED,
-                                      borderwidth=3)
-        self.btn_analizar.pack(side=tk.LEFT, padx=5)
-        
-        btn_limpiar = tk.Button(botones_frame,
-                               text="Limpiar",
-                               command=self.limpiar,
-                               bg="#e74c3c",
-                               fg="white",
-                               font=("Arial", 12, "bold"),
-                               width=15,
-                               height=1,
-                               cursor="hand2",
-                               relief=tk.RAISED,
-                               borderwidth=3)
-        btn_limpiar.pack(side=tk.LEFT, padx=5)
-        
-        # FRAME DE RESULTADOS (con dos columnas)
-        resultados_frame = tk.Frame(main_frame, bg=bg_color)
-        resultados_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Columna izquierda: Tokens
-        tokens_frame = tk.LabelFrame(resultados_frame,
-                                     text="  Analisis Lexico (Tokens)  ",
-                                     font=("Arial", 10, "bold"),
-                                     bg=bg_color,
-                                     fg="#34495e",
-                                     padx=10,
-                                     pady=10)
-        tokens_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        
-        self.resultado_tokens = scrolledtext.ScrolledText(tokens_frame,
-                                                          height=15,
-                                                          width=40,
-                                                          font=("Consolas", 10),
-                                                          wrap=tk.WORD,
-                                                          state='disabled',
-                                                          borderwidth=2,
-                                                          relief=tk.GROOVE,
-                                                          bg="#ffffff")
-        self.resultado_tokens.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
-        
-        # Columna derecha: Árbol sintáctico
-        arbol_frame = tk.LabelFrame(resultados_frame,
-                                    text="  Analisis Sintactico (Arbol)  ",
-                                    font=("Arial", 10, "bold"),
-                                    bg=bg_color,
-                                    fg="#34495e",
-                                    padx=10,
-                                    pady=10)
-        arbol_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        
-        self.resultado_arbol = scrolledtext.ScrolledText(arbol_frame,
-                                                         height=15,
-                                                         width=40,
-                                                         font=("Consolas", 10),
-                                                         wrap=tk.WORD,
-                                                         state='disabled',
-                                                         borderwidth=2,
-                                                         relief=tk.GROOVE,
-                                                         bg="#ffffff")
-        self.resultado_arbol.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
-        
-        # Footer
-        footer = tk.Label(main_frame,
-                         text="Analisis Lexico con Flex | Analisis Sintactico Descendente Recursivo",
-                         font=("Arial", 8),
-                         bg=bg_color,
-                         fg="#95a5a6")
-        footer.pack(side=tk.BOTTOM, pady=(10, 0))
-        
-        self.verificar_ejecutable()
-    
-    def limpiar_ejemplo(self, event):
-        if self.es_ejemplo:
-            self.entrada.delete("1.0", tk.END)
-            self.entrada.tag_remove("ejemplo", "1.0", tk.END)
-            self.es_ejemplo = False
-    
-    def verificar_ejecutable(self):
-        if not os.path.exists("analizador.exe"):
-            respuesta = messagebox.askyesno(
-                "Analizador no encontrado",
-                "No se encontro 'analizador.exe'.\n\n"
-                "¿Deseas compilarlo ahora?\n\n"
-                "Requiere Flex y GCC instalados"
-            )
-            if respuesta:
-                self.compilar_analizador()
-    
-    def compilar_analizador(self):
-        try:
-            self.mostrar_tokens("⏳ Compilando...\n")
-            self.root.update()
-            
-            resultado_flex = subprocess.run(
-                ["flex", "analizador.l"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if resultado_flex.returncode != 0:
-                self.mostrar_tokens("Error en Flex:\n" + resultado_flex.stderr)
-                return
-            
-            self.mostrar_tokens("Flex OK\n")
-            self.root.update()
-            
-            resultado_gcc = subprocess.run(
-                ["gcc", "lex.yy.c", "-o", "analizador.exe"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if resultado_gcc.returncode != 0:
-                self.mostrar_tokens("Error en GCC:\n" + resultado_gcc.stderr)
-                return
-            
-            self.mostrar_tokens("Compilacion exitosa\n")
-            messagebox.showinfo("Analizador compilado correctamente")
-            
-        except FileNotFoundError:
-            error_msg = (
-                "No se encontro Flex o GCC\n\n"
-                "Instala con: pacman -S flex gcc"
-            )
-            self.mostrar_tokens(error_msg)
-            messagebox.showerror("Error", error_msg)
-        except Exception as e:
-            self.mostrar_tokens(f"Error: {str(e)}")
-    
-    def analizar_completo(self):
-        codigo = self.entrada.get("1.0", tk.END).strip()
-        
-        if not codigo or self.es_ejemplo:
-            messagebox.showwarning("Advertencia", "Ingresa codigo para analizar")
-            return
-        
-        if not os.path.exists("analizador.exe"):
-            messagebox.showerror("Error", "Compila el analizador primero")
-            self.verificar_ejecutable()
-            return
-        
-        # PASO 1: Analisis Lexico
-        try:
-            with open("temp_input.txt", "w") as f:
-                f.write(codigo)
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo crear archivo:\n{e}")
-            return
-        
-        try:
-            resultado = subprocess.run(
-                ["./analizador.exe", "temp_input.txt"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            salida_lexico = resultado.stdout
-            
-            if not salida_lexico.strip():
-                self.mostrar_tokens("Sin salida del lexico")
-                self.mostrar_arbol("")
-                return
-            
-            # Mostrar tokens
-            self.mostrar_tokens(salida_lexico)
-            
-            # PASO 2: Analisis Sintactico
-            tokens = parsear_tokens(salida_lexico)
-            
-            if not tokens:
-                self.mostrar_arbol("No hay tokens para analizar")
-                return
-            
-            analizador = AnalizadorSintactico(tokens)
-            arbol, errores = analizador.analizar()
-            
-            # Mostrar resultado sintáctico
-            if errores:
-                resultado_sintactico = "ERRORES DE SINTAXIS:\n\n"
-                for error in errores:
-                    resultado_sintactico += f"  • {error}\n"
-            else:
-                resultado_sintactico = "SINTAXIS CORRECTA\n\n"
-                resultado_sintactico += "Arbol Sintactico:\n\n"
-                if arbol:
-                    resultado_sintactico += imprimir_arbol(arbol)
-                else:
-                    resultado_sintactico += "(arbol vacio)"
-            
-            self.mostrar_arbol(resultado_sintactico)
-                
-        except FileNotFoundError:
-            error_msg = "No se encontro analizador.exe"
-            self.mostrar_tokens(error_msg)
-            messagebox.showerror("Error", error_msg)
-        except subprocess.TimeoutExpired:
-            self.mostrar_tokens("Tiempo de espera agotado")
-        except Exception as e:
-            self.mostrar_tokens(f"Error: {str(e)}")
-        finally:
-            if os.path.exists("temp_input.txt"):
-                try:
-                    os.remove("temp_input.txt")
-                except:
-                    pass
-    
-    def limpiar(self):
-        self.entrada.delete("1.0", tk.END)
-        self.mostrar_tokens("")
-        self.mostrar_arbol("")
-        self.es_ejemplo = False
-    
-    def mostrar_tokens(self, texto):
-        self.resultado_tokens.config(state='normal')
-        self.resultado_tokens.delete("1.0", tk.END)
-        self.resultado_tokens.insert("1.0", texto)
-        self.resultado_tokens.config(state='disabled')
-    
-    def mostrar_arbol(self, texto):
-        self.resultado_arbol.config(state='normal')
-        self.resultado_arbol.delete("1.0", tk.END)
-        self.resultado_arbol.insert("1.0", texto)
-        self.resultado_arbol.config(state='disabled')
-
-def main():
-    root = tk.Tk()
-    app = AnalizadorCompletoGUI(root)
-    root.mainloop()
-
-if __name__ == "__main__":
+import tkinter as tk
+from tkinter import scrolledtext, messagebox, filedialog
+import subprocess
+import os
+import queue
+import sqlite3
+import threading
+from analizador_incremental import AnalizadorIncremental
+from analizador_sintactico import AnalizadorSintactico
+from analizador_lexico import analizar_lexico, obtener_cliente, tokens_sintacticos
+from cache_analisis import CacheAnalisis
+from compilacion import (DIRECTORIO_CACHE, ErrorCompilacion, clave_compilacion, compilar,
+                         esta_actualizado, herramientas_disponibles)
+from perfilado import Perfilador, tramo
+from vistas import FilasTokens, IndiceArbol, ListaVirtual, VistaArbol
+
+# Tokens como maximo en el panel de tokens del modo en vivo (el incremental
+# los vuelve a lexicar para listarlos)
+LIMITE_TOKENS_VISTA = 20000
+# Espera tras la ultima tecla antes de re-analizar en modo en vivo
+RETARDO_EN_VIVO_MS = 300
+# Cada cuanto el hilo de Tk revisa si el trabajador termino (~60 por segundo)
+INTERVALO_SONDEO_MS = 16
+# Resultados de analisis guardados entre ejecuciones (ver cache_analisis)
+RUTA_CACHE_RESULTADOS = os.path.join(DIRECTORIO_CACHE, "resultados.sqlite")
+MAX_BYTES_CACHE_DISCO = 256 << 20
+
+
+class Cancelado(Exception):
+    """El analisis fue reemplazado por uno mas reciente"""
+
+
+def ejecutar_analisis(codigo, backend, perfilador=None, cancelado=lambda: False, cache=None):
+    """Pipeline completo sin tocar la interfaz (se ejecuta en el hilo trabajador).
+
+    Retorna (filas del panel de tokens, contenido del panel del arbol: un
+    IndiceArbol o el texto de los errores). Entre etapas, y mientras se
+    indexa el arbol, lanza Cancelado si cancelado() es verdadero. Con una
+    CacheAnalisis, el lexico y el sintactico se toman de ella si el mismo
+    codigo ya se analizo (y si no, se verifica igual entre etapas).
+    """
+    def verificar():
+        if cancelado():
+            raise Cancelado()
+    
+    if cache is not None:
+        resultado = cache.analizar(codigo, backend, "iterativo", perfilador, verificar)
+        tokens = resultado.tokens
+        if not tokens:
+            return "Sin salida del lexico", ""
+        verificar()
+        with tramo(perfilador, "formato_tokens"):
+            filas_tokens = FilasTokens(tokens)
+        if all(token.tipo == "ERROR" for token in tokens):
+            return filas_tokens, "No hay tokens para analizar"
+        return filas_tokens, _resultado_sintactico(resultado.arbol, resultado.errores, perfilador,
+                                                   verificar)
+    
+    # PASO 1: Analisis Lexico
+    tokens = analizar_lexico(codigo, backend, perfilador)
+    
+    if not tokens:
+        return "Sin salida del lexico", ""
+    verificar()
+    
+    with tramo(perfilador, "formato_tokens"):
+        filas_tokens = FilasTokens(tokens)
+    
+    # PASO 2: Analisis Sintactico
+    tokens = tokens_sintacticos(tokens)
+    
+    if not tokens:
+        return filas_tokens, "No hay tokens para analizar"
+    verificar()
+    
+    analizador = AnalizadorSintactico(tokens, motor="iterativo", recuperacion=True,
+                                      perfilador=perfilador)
+    arbol, errores = analizador.analizar()
+    verificar()
+    
+    return filas_tokens, _resultado_sintactico(arbol, errores, perfilador, verificar)
+
+
+def ejecutar_incremental(incremental, codigo, perfilador=None, cancelado=lambda: False,
+                         anterior=None):
+    """Como ejecutar_analisis, pero re-analizando solo lo que cambio (backend Python).
+
+    Los tokens se listan hasta LIMITE_TOKENS_VISTA sin volver a lexicar todo.
+    'anterior' es el IndiceArbol de la actualizacion previa: se reutiliza si
+    el arbol no cambio y, si no, se copian las sentencias que siguen igual.
+    """
+    def verificar():
+        if cancelado():
+            raise Cancelado()
+    
+    # Quien llama tiene el candado del estado incremental: un analisis que
+    # quedo esperando detras de otro mas nuevo no debe actualizarlo
+    verificar()
+    with tramo(perfilador, "incremental"):
+        incremental.actualizar(codigo)
+    if perfilador is not None:
+        perfilador.contar("tramos_analizados", incremental.tramos_analizados)
+    verificar()
+    
+    with tramo(perfilador, "formato_tokens"):
+        primeros = incremental.primeros_tokens(LIMITE_TOKENS_VISTA)
+        filas_tokens = FilasTokens(primeros, incremental.total_tokens,
+                                   truncado=len(primeros) == LIMITE_TOKENS_VISTA)
+    
+    if not incremental.total_tokens:
+        return filas_tokens, "No hay tokens para analizar"
+    
+    arbol, errores = incremental.analizar()
+    return filas_tokens, _resultado_sintactico(arbol, errores, perfilador, verificar, anterior)
+
+
+def _resultado_sintactico(arbol, errores, perfilador, verificar, anterior=None):
+    """Contenido del panel del arbol: el texto de los errores o el IndiceArbol"""
+    if errores:
+        resultado_sintactico = "ERRORES DE SINTAXIS:\n\n"
+        for error in errores:
+            linea = getattr(error, "linea", None)
+            if linea is not None:
+                resultado_sintactico += f"  • Linea {linea}: {error}\n"
+            else:
+                resultado_sintactico += f"  • {error}\n"
+        return resultado_sintactico
+    
+    if not arbol:
+        return "SINTAXIS CORRECTA\n(arbol vacio)"
+    with tramo(perfilador, "indice_arbol"):
+        return IndiceArbol.actualizado(arbol, anterior, verificar)
+
+
+class AnalizadorCompletoGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Analizador Lexico y Sintactico")
+        self.root.geometry("900x700")
+        
+        bg_color = "#f0f0f0"
+        self.root.configure(bg=bg_color)
+        
+        main_frame = tk.Frame(root, bg=bg_color)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # TÍTULO
+        titulo = tk.Label(main_frame, 
+                         text="Analizador Lexico y Sintactico",
+                         font=("Arial", 16, "bold"),
+                         bg=bg_color,
+                         fg="#2c3e50")
+        titulo.pack(pady=(0, 5))
+        
+        subtitulo = tk.Label(main_frame,
+                            text="Ingresa expresiones matematicas o asignaciones (ej: x = 3 + 5)",
+                            font=("Arial", 10),
+                            bg=bg_color,
+                            fg="#7f8c8d")
+        subtitulo.pack(pady=(0, 15))
+        
+        # FRAME DE ENTRADA
+        entrada_frame = tk.LabelFrame(main_frame,
+                                      text="  Codigo Fuente  ",
+                                      font=("Arial", 11, "bold"),
+                                      bg=bg_color,
+                                      fg="#34495e",
+                                      padx=10,
+                                      pady=10)
+        entrada_frame.pack(fill=tk.BOTH, pady=(0, 10))
+        
+        self.entrada = scrolledtext.ScrolledText(entrada_frame,
+                                                 height=5,
+                                                 width=90,
+                                                 font=("Consolas", 11),
+                                                 wrap=tk.WORD,
+                                                 borderwidth=2,
+                                                 relief=tk.GROOVE)
+        self.entrada.pack(padx=5, pady=5)
+        
+        ejemplo = "x = 3 + 5\ny = x * 2"
+        self.entrada.insert("1.0", ejemplo)
+        self.entrada.tag_add("ejemplo", "1.0", tk.END)
+        self.entrada.tag_config("ejemplo", foreground="gray")
+        
+        self.entrada.bind("<FocusIn>", self.limpiar_ejemplo)
+        self.entrada.bind("<KeyRelease>", self.programar_en_vivo)
+        self.es_ejemplo = True
+        
+        # Trabajo en segundo plano: los hilos dejan sus resultados en la cola
+        # y el hilo de Tk los recoge con root.after. Cada analisis nuevo
+        # incrementa la generacion; los resultados de generaciones viejas se
+        # descartan y sus hilos se detienen en la siguiente verificacion.
+        self._resultados = queue.Queue()
+        self._generacion = 0
+        self._en_vivo_pendiente = None
+        # Estado del modo en vivo con el lexico de Python (uno a la vez)
+        self._incremental = None
+        self._candado_incremental = threading.Lock()
+        self._indice_en_vivo = None
+        try:
+            self.cache = CacheAnalisis(ruta=RUTA_CACHE_RESULTADOS,
+                                       max_bytes_disco=MAX_BYTES_CACHE_DISCO)
+        except (OSError, sqlite3.Error):
+            # Sin permiso de escritura, por ejemplo: solo la cache en memoria
+            self.cache = CacheAnalisis()
+        self.root.after(INTERVALO_SONDEO_MS, self._revisar_resultados)
+        
+        # BOTONES
+        botones_frame = tk.Frame(main_frame, bg=bg_color)
+        botones_frame.pack(pady=10)
+        
+        self.btn_analizar = tk.Button(botones_frame,
+                                      text="▶ Analizar",
+                                      command=self.analizar_completo,
+                                      bg="#27ae60",
+                                      fg="white",
+                                      font=("Arial", 12, "bold"),
+                                      width=15,
+                                      height=1,
+                                      cursor="hand2",
+                                      relief=tk.RAISED,
+                                      borderwidth=3)
+        self.btn_analizar.pack(side=tk.LEFT, padx=5)
+        
+        btn_limpiar = tk.Button(botones_frame,
+                               text="Limpiar",
+                               command=self.limpiar,
+                               bg="#e74c3c",
+                               fg="white",
+                               font=("Arial", 12, "bold"),
+                               width=15,
+                               height=1,
+                               cursor="hand2",
+                               relief=tk.RAISED,
+                               borderwidth=3)
+        btn_limpiar.pack(side=tk.LEFT, padx=5)
+        
+        # SELECCION DEL ANALIZADOR LEXICO
+        self.backend = tk.StringVar(value="python")
+        
+        tk.Label(botones_frame,
+                 text="Lexico:",
+                 font=("Arial", 10, "bold"),
+                 bg=bg_color,
+                 fg="#34495e").pack(side=tk.LEFT, padx=(20, 5))
+        
+        for texto, valor in (("Python", "python"),
+                             ("Flex", "flex"),
+                             ("Flex (servidor)", "servidor")):
+            tk.Radiobutton(botones_frame,
+                           text=texto,
+                           value=valor,
+                           variable=self.backend,
+                           command=self.cambiar_backend,
+                           font=("Arial", 10),
+                           bg=bg_color).pack(side=tk.LEFT)
+        
+        # PERFIL DE COMPILACION de analizador.exe: marcado, tablas completas y
+        # -O2; por defecto el perfil normal, el de la compilacion original
+        self.compilacion_rapida = tk.BooleanVar(value=False)
+        tk.Checkbutton(botones_frame,
+                       text="Flex optimizado",
+                       variable=self.compilacion_rapida,
+                       command=self.cambiar_backend,
+                       font=("Arial", 10),
+                       bg=bg_color).pack(side=tk.LEFT)
+        
+        # PERFILADO (tiempos por etapa y contadores en la barra de estado)
+        self.perfilador = Perfilador(activo=False)
+        self.perfilar = tk.BooleanVar(value=False)
+        tk.Checkbutton(botones_frame,
+                       text="Perfilar",
+                       variable=self.perfilar,
+                       command=self.cambiar_perfilado,
+                       font=("Arial", 10),
+                       bg=bg_color).pack(side=tk.LEFT, padx=(20, 0))
+        
+        # MODO EN VIVO (re-analiza al dejar de escribir)
+        self.en_vivo = tk.BooleanVar(value=False)
+        tk.Checkbutton(botones_frame,
+                       text="En vivo",
+                       variable=self.en_vivo,
+                       command=self.programar_en_vivo,
+                       font=("Arial", 10),
+                       bg=bg_color).pack(side=tk.LEFT)
+        
+        # FRAME DE RESULTADOS (con dos columnas)
+        resultados_frame = tk.Frame(main_frame, bg=bg_color)
+        resultados_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Columna izquierda: Tokens
+        tokens_frame = tk.LabelFrame(resultados_frame,
+                                     text="  Analisis Lexico (Tokens)  ",
+                                     font=("Arial", 10, "bold"),
+                                     bg=bg_color,
+                                     fg="#34495e",
+                                     padx=10,
+                                     pady=10)
+        tokens_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        
+        # Lista virtual: solo las filas visibles existen en el widget
+        self.resultado_tokens = ListaVirtual(tokens_frame,
+                                             height=15,
+                                             width=40,
+                                             font=("Consolas", 10),
+                                             borderwidth=2,
+                                             relief=tk.GROOVE,
+                                             bg="#ffffff")
+        self.resultado_tokens.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
+        
+        # Columna derecha: Árbol sintáctico
+        arbol_frame = tk.LabelFrame(resultados_frame,
+                                    text="  Analisis Sintactico (Arbol)  ",
+                                    font=("Arial", 10, "bold"),
+                                    bg=bg_color,
+                                    fg="#34495e",
+                                    padx=10,
+                                    pady=10)
+        arbol_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        
+        # BUSQUEDA en el arbol (por tipo o valor exacto; Enter pasa a la siguiente)
+        busqueda_frame = tk.Frame(arbol_frame, bg=bg_color)
+        busqueda_frame.pack(fill=tk.X, padx=5)
+        
+        self.busqueda = tk.StringVar()
+        entrada_busqueda = tk.Entry(busqueda_frame,
+                                    textvariable=self.busqueda,
+                                    font=("Consolas", 10))
+        entrada_busqueda.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        entrada_busqueda.bind("<Return>", self.buscar_en_arbol)
+        
+        tk.Button(busqueda_frame,
+                  text="Buscar",
+                  command=self.buscar_en_arbol,
+                  font=("Arial", 8),
+                  cursor="hand2").pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.resultado_busqueda = tk.Label(busqueda_frame,
+                                           text="",
+                                           font=("Consolas", 8),
+                                           bg=bg_color,
+                                           fg="#34495e",
+                                           width=12)
+        self.resultado_busqueda.pack(side=tk.LEFT)
+        
+        # Arbol perezoso: los nodos se crean al expandir a su padre
+        self.resultado_arbol = VistaArbol(arbol_frame, height=15)
+        self.resultado_arbol.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
+        
+        # Barra de estado del perfilado
+        estado_frame = tk.Frame(main_frame, bg=bg_color)
+        estado_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        self.barra_estado = tk.Label(estado_frame,
+                                     text="Perfilado desactivado",
+                                     font=("Consolas", 8),
+                                     bg=bg_color,
+                                     fg="#34495e",
+                                     anchor=tk.W)
+        self.barra_estado.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        tk.Button(estado_frame,
+                  text="Guardar perfil",
+                  command=self.guardar_perfil,
+                  font=("Arial", 8),
+                  cursor="hand2").pack(side=tk.RIGHT)
+        
+        # Footer
+        footer = tk.Label(main_frame,
+                         text="Analisis Lexico con Flex | Analisis Sintactico Descendente Recursivo",
+                         font=("Arial", 8),
+                         bg=bg_color,
+                         fg="#95a5a6")
+        footer.pack(side=tk.BOTTOM, pady=(10, 0))
+    
+    def limpiar_ejemplo(self, event):
+        if self.es_ejemplo:
+            self.entrada.delete("1.0", tk.END)
+            self.entrada.tag_remove("ejemplo", "1.0", tk.END)
+            self.es_ejemplo = False
+    
+    def cambiar_backend(self):
+        if self.backend.get() != "python":
+            self.verificar_ejecutable()
+    
+    def cambiar_perfilado(self):
+        self.perfilador = Perfilador(activo=self.perfilar.get())
+        self.barra_estado.config(
+            text="Perfilado activo" if self.perfilador.activo else "Perfilado desactivado")
+    
+    def guardar_perfil(self):
+        if not self.perfilador.tramos:
+            messagebox.showinfo("Perfil", "Activa 'Perfilar' y analiza para obtener un perfil")
+            return
+        ruta = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if ruta:
+            self.perfilador.volcar(ruta)
+    
+    def perfil_compilacion(self):
+        return "rapido" if self.compilacion_rapida.get() else "normal"
+    
+    def verificar_ejecutable(self):
+        if os.path.exists("analizador.exe"):
+            # Sin Flex o GCC no se puede recompilar: se usa el ejecutable que
+            # hay, aunque no tenga clave (p. ej. uno ya compilado)
+            if not herramientas_disponibles():
+                return
+            # Si analizador.l, las herramientas o el perfil cambiaron se
+            # recompila (o se toma de la cache) sin preguntar
+            try:
+                clave = clave_compilacion(perfil=self.perfil_compilacion())
+            except OSError:
+                return
+            if not esta_actualizado("analizador.exe", clave):
+                self.compilar_analizador()
+        else:
+            respuesta = messagebox.askyesno(
+                "Analizador no encontrado",
+                "No se encontro 'analizador.exe'.\n\n"
+                "¿Deseas compilarlo ahora?\n\n"
+                "Requiere Flex y GCC instalados"
+            )
+            if respuesta:
+                self.compilar_analizador()
+    
+    def compilar_analizador(self):
+        self.mostrar_tokens("⏳ Compilando...\n")
+        threading.Thread(target=self._trabajo_compilacion,
+                         args=(self.perfil_compilacion(),),
+                         daemon=True).start()
+    
+    def _trabajo_compilacion(self, perfil):
+        """Compila (o toma de la cache) el analizador e informa cada paso por la cola"""
+        def informar(tipo, texto):
+            self._resultados.put((tipo, None, texto))
+        
+        try:
+            # El servidor tiene abierto el ejecutable que se va a reemplazar
+            obtener_cliente().cerrar()
+            _, origen = compilar("analizador.l", "analizador.exe", perfil,
+                                 informar=lambda texto: informar("tokens", texto))
+            if origen == "compilado":
+                informar("compilado", f"Compilacion exitosa (perfil {perfil})\n")
+            elif origen == "cache":
+                informar("tokens", f"Analizador tomado de la cache (perfil {perfil})\n")
+            
+        except ErrorCompilacion as e:
+            informar("tokens", str(e))
+        except FileNotFoundError:
+            informar("error", (
+                "No se encontro Flex o GCC\n\n"
+                "Instala con: pacman -S flex gcc"
+            ))
+        except Exception as e:
+            informar("tokens", f"Error: {str(e)}")
+    
+    def analizar_completo(self):
+        codigo = self.entrada.get("1.0", tk.END).strip()
+        
+        if not codigo or self.es_ejemplo:
+            messagebox.showwarning("Advertencia", "Ingresa codigo para analizar")
+            return
+        
+        backend = self.backend.get()
+        
+        if backend != "python" and not os.path.exists("analizador.exe"):
+            messagebox.showerror("Error", "Compila el analizador primero")
+            self.verificar_ejecutable()
+            return
+        
+        self.iniciar_analisis(codigo, backend)
+    
+    def programar_en_vivo(self, event=None):
+        """Reprograma el analisis en vivo (debounce) tras cada tecla"""
+        if self._en_vivo_pendiente is not None:
+            self.root.after_cancel(self._en_vivo_pendiente)
+            self._en_vivo_pendiente = None
+        if self.en_vivo.get() and not self.es_ejemplo:
+            self._en_vivo_pendiente = self.root.after(RETARDO_EN_VIVO_MS, self._analizar_en_vivo)
+    
+    def _analizar_en_vivo(self):
+        self._en_vivo_pendiente = None
+        codigo = self.entrada.get("1.0", tk.END).strip()
+        backend = self.backend.get()
+        if backend != "python" and not os.path.exists("analizador.exe"):
+            return
+        if codigo:
+            self.iniciar_analisis(codigo, backend, en_vivo=True)
+        else:
+            self.cancelar_analisis()
+            self.mostrar_tokens("")
+            self.mostrar_arbol("")
+    
+    def cancelar_analisis(self):
+        """Invalida el analisis en curso; su hilo se detiene en la siguiente etapa"""
+        self._generacion += 1
+    
+    def iniciar_analisis(self, codigo, backend, en_vivo=False):
+        """Lanza el pipeline en un hilo trabajador, cancelando el anterior"""
+        self.cancelar_analisis()
+        generacion = self._generacion
+        perfilador = Perfilador(activo=self.perfilar.get())
+        self.barra_estado.config(text="Analizando...")
+        threading.Thread(target=self._trabajo_analisis,
+                         args=(generacion, codigo, backend, perfilador, en_vivo),
+                         daemon=True).start()
+    
+    def _trabajo_analisis(self, generacion, codigo, backend, perfilador, en_vivo):
+        cancelado = lambda: generacion != self._generacion
+        try:
+            if en_vivo and backend == "python":
+                # El estado incremental no admite dos actualizaciones a la vez
+                with self._candado_incremental:
+                    if self._incremental is None:
+                        self._incremental = AnalizadorIncremental(codigo)
+                    textos = ejecutar_incremental(self._incremental, codigo, perfilador,
+                                                  cancelado, self._indice_en_vivo)
+                    if isinstance(textos[1], IndiceArbol):
+                        self._indice_en_vivo = textos[1]
+            else:
+                textos = ejecutar_analisis(codigo, backend, perfilador, cancelado, self.cache)
+            self._resultados.put(("analisis", generacion, (textos, perfilador)))
+        except Cancelado:
+            pass
+        except FileNotFoundError:
+            self._resultados.put(("error", generacion, "No se encontro analizador.exe"))
+        except subprocess.TimeoutExpired:
+            self._resultados.put(("tokens", generacion, "Tiempo de espera agotado"))
+        except Exception as e:
+            self._resultados.put(("tokens", generacion, f"Error: {str(e)}"))
+    
+    def _revisar_resultados(self):
+        """Aplica en el hilo de Tk los resultados que dejaron los trabajadores"""
+        try:
+            while True:
+                tipo, generacion, datos = self._resultados.get_nowait()
+                if generacion is not None and generacion != self._generacion:
+                    continue
+                self._aplicar_resultado(tipo, datos)
+        except queue.Empty:
+            pass
+        self.root.after(INTERVALO_SONDEO_MS, self._revisar_resultados)
+    
+    def _aplicar_resultado(self, tipo, datos):
+        if tipo == "analisis":
+            (filas_tokens, contenido_arbol), perfilador = datos
+            with tramo(perfilador, "mostrar"):
+                self.mostrar_tokens(filas_tokens)
+                self.mostrar_arbol(contenido_arbol)
+            self.perfilador = perfilador
+            self.barra_estado.config(
+                text=perfilador.resumen() if perfilador.activo else self._estado_cache())
+        elif tipo == "tokens":
+            self.mostrar_tokens(datos)
+            self.barra_estado.config(text="")
+        elif tipo == "compilado":
+            self.mostrar_tokens(datos)
+            messagebox.showinfo("Analizador compilado correctamente")
+        elif tipo == "error":
+            self.mostrar_tokens(datos)
+            self.barra_estado.config(text="")
+            messagebox.showerror("Error", datos)
+    
+    def _estado_cache(self):
+        estadisticas = self.cache.estadisticas()
+        consultas = (estadisticas["aciertos_memoria"] + estadisticas["aciertos_disco"]
+                     + estadisticas["fallos"])
+        if not consultas:
+            return "Listo"
+        return (f"Listo | cache: {consultas - estadisticas['fallos']}/{consultas} aciertos, "
+                f"{estadisticas['bytes_memoria'] / 1e6:.1f} MB en memoria")
+    
+    def limpiar(self):
+        self.cancelar_analisis()
+        self.entrada.delete("1.0", tk.END)
+        self.mostrar_tokens("")
+        self.mostrar_arbol("")
+        self.es_ejemplo = False
+    
+    def buscar_en_arbol(self, event=None):
+        actual, total = self.resultado_arbol.buscar(self.busqueda.get())
+        self.resultado_busqueda.config(text=f"{actual}/{total}" if total else "sin resultados")
+    
+    def mostrar_tokens(self, contenido):
+        """Muestra un texto o unas filas (FilasTokens) en el panel de tokens"""
+        self.resultado_tokens.mostrar(contenido)
+    
+    def mostrar_arbol(self, contenido):
+        """Muestra un IndiceArbol o un texto en el panel del arbol"""
+        self.resultado_arbol.mostrar(contenido)
+        self.resultado_busqueda.config(text="")
+
+def main():
+    root = tk.Tk()
+    app = AnalizadorCompletoGUI(root)
+    root.mainloop()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -452,10 +452,92 @@ char *yytext;
 #line 2 "analizador.l"
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
+#ifdef _WIN32
+#include <io.h>
+#include <fcntl.h>
+#endif
+
+/* Codigos del formato binario (deben coincidir con analizador_sintactico.py) */
+enum {
+    T_FIN, T_NUMERO, T_DECIMAL, T_IDENTIFICADOR, T_ASIGNACION,
+    T_SUMA, T_RESTA, T_MULTIPLICACION, T_DIVISION,
+    T_PARENTESIS_IZQ, T_PARENTESIS_DER, T_ERROR
+};
+
+static const char *nombres[] = {
+    "FIN", "NUMERO", "DECIMAL", "IDENTIFICADOR", "ASIGNACION",
+    "SUMA", "RESTA", "MULTIPLICACION", "DIVISION",
+    "PARENTESIS_IZQ", "PARENTESIS_DER", "ERROR"
+};
 
 int token_count = 0;
-#line 457 "lex.yy.c"
-#line 458 "lex.yy.c"
+int binario = 0;        /* --binario: registros compactos en vez de texto */
+long posicion = 0;      /* desplazamiento del token actual en la fuente */
+long siguiente = 0;     /* desplazamiento del siguiente byte sin leer */
+
+#define YY_USER_ACTION posicion = siguiente; siguiente += yyleng;
+
+static int codificar_varint(unsigned char *destino, unsigned long valor) {
+    int n = 0;
+    while (valor >= 0x80) {
+        destino[n++] = (unsigned char)((valor & 0x7F) | 0x80);
+        valor >>= 7;
+    }
+    destino[n++] = (unsigned char)valor;
+    return n;
+}
+
+/* Registro binario: tipo (1 byte), longitud (varint), lexema, posicion (varint).
+   Los lexemas cortos se arman en un solo bloque para hacer un unico fwrite. */
+static void emitir_binario(int tipo) {
+    unsigned char registro[96];
+    int n = 0;
+    
+    registro[n++] = (unsigned char)tipo;
+    n += codificar_varint(registro + n, (unsigned long)yyleng);
+    
+    if (yyleng <= 64) {
+        memcpy(registro + n, yytext, yyleng);
+        n += yyleng;
+    } else {
+        fwrite(registro, 1, n, stdout);
+        fwrite(yytext, 1, yyleng, stdout);
+        n = 0;
+    }
+    
+    n += codificar_varint(registro + n, (unsigned long)posicion);
+    fwrite(registro, 1, n, stdout);
+}
+
+static void emitir(int tipo) {
+    if (tipo != T_ERROR) {
+        token_count++;
+    }
+    
+    if (binario) {
+        emitir_binario(tipo);
+    } else if (tipo == T_ERROR) {
+        printf("ERROR:Caracter no reconocido '%s'\n", yytext);
+    } else {
+        printf("%s:%s\n", nombres[tipo], yytext);
+    }
+}
+
+/* Cierra la salida de un documento: ---TOTAL en texto, registro FIN en binario */
+static void emitir_total() {
+    if (binario) {
+        unsigned char registro[16];
+        int n = 0;
+        registro[n++] = T_FIN;
+        n += codificar_varint(registro + n, (unsigned long)token_count);
+        fwrite(registro, 1, n, stdout);
+    } else {
+        printf("\n---TOTAL:%d\n", token_count);
+    }
+}
+#line 539 "lex.yy.c"
+#line 540 "lex.yy.c"
 
 #define INITIAL 0
 
@@ -672,10 +754,10 @@ YY_DECL
 		}
 
 	{
-#line 8 "analizador.l"
+#line 90 "analizador.l"
 
 
-#line 678 "lex.yy.c"
+#line 760 "lex.yy.c"
 
 	while ( /*CONSTCOND*/1 )		/* loops until end-of-file is reached */
 		{
@@ -734,71 +816,71 @@ do_action:	/* This label is used only to access EOF actions. */
 
 case 1:
 YY_RULE_SETUP
-#line 10 "analizador.l"
-{ token_count++; printf("NUMERO:%s\n", yytext); }
+#line 92 "analizador.l"
+{ emitir(T_NUMERO); }
 	YY_BREAK
 case 2:
 YY_RULE_SETUP
-#line 11 "analizador.l"
-{ token_count++; printf("DECIMAL:%s\n", yytext); }
+#line 93 "analizador.l"
+{ emitir(T_DECIMAL); }
 	YY_BREAK
 case 3:
 YY_RULE_SETUP
-#line 13 "analizador.l"
-{ token_count++; printf("IDENTIFICADOR:%s\n", yytext); }
+#line 95 "analizador.l"
+{ emitir(T_IDENTIFICADOR); }
 	YY_BREAK
 case 4:
 YY_RULE_SETUP
-#line 14 "analizador.l"
-{ token_count++; printf("ASIGNACION:%s\n", yytext); }
+#line 96 "analizador.l"
+{ emitir(T_ASIGNACION); }
 	YY_BREAK
 case 5:
 YY_RULE_SETUP
-#line 16 "analizador.l"
-{ token_count++; printf("SUMA:%s\n", yytext); }
+#line 98 "analizador.l"
+{ emitir(T_SUMA); }
 	YY_BREAK
 case 6:
 YY_RULE_SETUP
-#line 17 "analizador.l"
-{ token_count++; printf("RESTA:%s\n", yytext); }
+#line 99 "analizador.l"
+{ emitir(T_RESTA); }
 	YY_BREAK
 case 7:
 YY_RULE_SETUP
-#line 18 "analizador.l"
-{ token_count++; printf("MULTIPLICACION:%s\n", yytext); }
+#line 100 "analizador.l"
+{ emitir(T_MULTIPLICACION); }
 	YY_BREAK
 case 8:
 YY_RULE_SETUP
-#line 19 "analizador.l"
-{ token_count++; printf("DIVISION:%s\n", yytext); }
+#line 101 "analizador.l"
+{ emitir(T_DIVISION); }
 	YY_BREAK
 case 9:
 YY_RULE_SETUP
-#line 20 "analizador.l"
-{ token_count++; printf("PARENTESIS_IZQ:%s\n", yytext); }
+#line 102 "analizador.l"
+{ emitir(T_PARENTESIS_IZQ); }
 	YY_BREAK
 case 10:
 YY_RULE_SETUP
-#line 21 "analizador.l"
-{ token_count++; printf("PARENTESIS_DER:%s\n", yytext); }
+#line 103 "analizador.l"
+{ emitir(T_PARENTESIS_DER); }
 	YY_BREAK
 case 11:
 /* rule 11 can match eol */
 YY_RULE_SETUP
-#line 22 "analizador.l"
+#line 104 "analizador.l"
 { }
 	YY_BREAK
 case 12:
 YY_RULE_SETUP
-#line 23 "analizador.l"
-{ printf("ERROR:Caracter no reconocido '%s'\n", yytext); }
+#line 105 "analizador.l"
+{ emitir(T_ERROR); }
 	YY_BREAK
 case 13:
 YY_RULE_SETUP
-#line 25 "analizador.l"
+#line 107 "analizador.l"
 ECHO;
 	YY_BREAK
-#line 801 "lex.yy.c"
+#line 883 "lex.yy.c"
 case YY_STATE_EOF(INITIAL):
 	yyterminate();
 
@@ -1803,16 +1885,76 @@ void yyfree (void * ptr )
 
 #define YYTABLES_NAME "yytables"
 
-#line 25 "analizador.l"
+#line 107 "analizador.l"
 
 
 int yywrap() {
     return 1;
 }
 
+/* Modo servidor: lee documentos "<longitud>\n<bytes>" de stdin en un ciclo
+   y responde a cada uno con su flujo de tokens terminado en ---TOTAL
+   (o en el registro FIN con --binario) */
+int servidor() {
+    long longitud;
+    
+    while (scanf("%ld", &longitud) == 1 && longitud >= 0) {
+        getchar();  /* salto de linea despues de la longitud */
+        
+        /* yy_scan_buffer exige dos bytes nulos al final */
+        char *buffer = malloc(longitud + 2);
+        if (!buffer) {
+            return 1;
+        }
+        if (fread(buffer, 1, longitud, stdin) != (size_t)longitud) {
+            free(buffer);
+            return 1;
+        }
+        buffer[longitud] = buffer[longitud + 1] = YY_END_OF_BUFFER_CHAR;
+        
+        YY_BUFFER_STATE documento = yy_scan_buffer(buffer, longitud + 2);
+        token_count = 0;
+        siguiente = 0;
+        yylex();
+        yy_delete_buffer(documento);
+        free(buffer);
+        
+        emitir_total();
+        fflush(stdout);
+    }
+    
+    return 0;
+}
+
 int main(int argc, char **argv) {
-    if (argc > 1) {
-        FILE *file = fopen(argv[1], "r");
+    int modo_servidor = 0;
+    char *ruta = NULL;
+    
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--servidor") == 0) {
+            modo_servidor = 1;
+        } else if (strcmp(argv[i], "--binario") == 0) {
+            binario = 1;
+        } else {
+            ruta = argv[i];
+        }
+    }
+    
+#ifdef _WIN32
+    if (binario) {
+        _setmode(_fileno(stdout), _O_BINARY);
+    }
+    if (modo_servidor) {
+        _setmode(_fileno(stdin), _O_BINARY);
+    }
+#endif
+    
+    if (modo_servidor) {
+        return servidor();
+    }
+    
+    if (ruta) {
+        FILE *file = fopen(ruta, "r");
         if (!file) {
             printf("ERROR: No se pudo abrir el archivo\n");
             return 1;
@@ -1821,7 +1963,7 @@ int main(int argc, char **argv) {
     }
     
     yylex();
-    printf("\n---TOTAL:%d\n", token_count);
+    emitir_total();
     
     return 0;
 }
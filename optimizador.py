@@ -0,0 +1,164 @@
+"""Optimizacion del arbol sintactico: plegado de constantes y subexpresiones compartidas"""
+import operator
+from decimal import Decimal
+
+from analizador_sintactico import NodoArbol, sin_recolector
+from evaluador import dividir
+from perfilado import tramo
+
+# Conversion del texto de cada hoja constante a su valor, como en el evaluador
+_CONSTANTES = {"Numero": int, "Decimal": Decimal}
+
+_OPERACIONES = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": dividir,
+}
+
+
+class EstadisticasOptimizacion:
+    """Conteos de una optimizacion.
+
+    nodos_entrada son los nodos del arbol recibido y nodos_salida los
+    objetos NodoArbol distintos del resultado. plegadas son las Operacion
+    reemplazadas por su valor (nodos_plegados, los nodos que eso quito);
+    reutilizados son las veces que un subarbol se cambio por uno igual ya
+    creado (nodos_compartidos, los nodos que eso ahorro).
+    """
+
+    def __init__(self):
+        self.nodos_entrada = 0
+        self.nodos_salida = 0
+        self.plegadas = 0
+        self.nodos_plegados = 0
+        self.reutilizados = 0
+        self.nodos_compartidos = 0
+
+    @property
+    def ahorrados(self):
+        return self.nodos_entrada - self.nodos_salida
+
+    def a_dict(self):
+        return {
+            "nodos_entrada": self.nodos_entrada,
+            "nodos_salida": self.nodos_salida,
+            "ahorrados": self.ahorrados,
+            "plegado": {"operaciones": self.plegadas, "nodos": self.nodos_plegados},
+            "compartido": {"reutilizados": self.reutilizados, "nodos": self.nodos_compartidos},
+        }
+
+    def __repr__(self):
+        return (f"EstadisticasOptimizacion({self.nodos_entrada} -> {self.nodos_salida} nodos, "
+                f"{self.plegadas} plegadas, {self.reutilizados} reutilizados)")
+
+
+def plegar_constante(operador, izquierdo, derecho):
+    """Nodo hoja con el valor de una Operacion entre dos hojas constantes, o None.
+
+    Usa la aritmetica del evaluador (int exacto, Decimal, dividir), asi el
+    valor es el mismo que daria evaluar la Operacion. Una division por cero
+    no se pliega: queda para que la evaluacion la reporte con su sentencia.
+    Tampoco un resultado negativo, que la gramatica no puede escribir como
+    constante. El texto de la hoja es el que aceptaria el lexico: un
+    Decimal se escribe sin exponente y siempre con punto.
+    """
+    try:
+        valor = _OPERACIONES[operador](_CONSTANTES[izquierdo.tipo](izquierdo.valor),
+                                       _CONSTANTES[derecho.tipo](derecho.valor))
+    except ArithmeticError:
+        return None
+    if valor < 0:
+        return None
+    if type(valor) is int:
+        return NodoArbol("Numero", str(valor))
+    texto = format(valor, "f")
+    return NodoArbol("Decimal", texto if "." in texto else texto + ".0")
+
+
+def contar_nodos(raiz):
+    """Nodos distintos alcanzables desde raiz (en un DAG, cada nodo compartido una vez)"""
+    vistos = {id(raiz)}
+    pendientes = [raiz]
+    while pendientes:
+        for hijo in pendientes.pop().hijos:
+            if id(hijo) not in vistos:
+                vistos.add(id(hijo))
+                pendientes.append(hijo)
+    return len(vistos)
+
+
+def optimizar(programa, plegar=True, compartir=True, perfilador=None):
+    """Arbol optimizado de un Programa (o cualquier nodo); retorna (raiz, estadisticas).
+
+    Con plegar, cada Operacion cuyos dos operandos son Numero o Decimal se
+    reemplaza por una hoja con su valor (de abajo hacia arriba, asi
+    '2 * (3 + 5)' queda en 16), salvo que el valor sea negativo: las hojas
+    siempre son constantes que el lexico y la gramatica pueden expresar.
+    Con compartir, los subarboles iguales (mismo tipo, valor e hijos) se
+    crean una sola vez: el resultado es un DAG donde '(a + b) * c'
+    repetido en cien sentencias es un solo objeto.
+
+    Acepta NodoArbol o VistaNodo y siempre crea nodos nuevos, sin modificar
+    la entrada. Los nodos del resultado pueden tener varios padres: no se
+    deben modificar. compilar_programa aprovecha lo compartido: calcula una
+    vez cada subexpresion compartida mientras no cambien sus variables.
+    """
+    estadisticas = EstadisticasOptimizacion()
+    unicos = {}  # (tipo, valor, ids de los hijos) -> nodo unico
+    # Nodos del arbol (sin compartir) bajo cada nodo unico, para contar lo ahorrado
+    tamanos = {}
+
+    with tramo(perfilador, "optimizacion"), sin_recolector():
+        # Postorden con pila explicita: los arboles pueden ser tan profundos
+        # como largas las cadenas de operadores
+        resultados = []
+        pendientes = [(programa, None)]
+        while pendientes:
+            nodo, cantidad = pendientes.pop()
+            if cantidad is None:
+                # Primera visita: se anota cuantos hijos recoger a la vuelta
+                estadisticas.nodos_entrada += 1
+                hijos = nodo.hijos
+                pendientes.append((nodo, len(hijos)))
+                pendientes.extend((hijo, None) for hijo in reversed(hijos))
+                continue
+
+            tipo, valor = nodo.tipo, nodo.valor
+            hijos = []
+            if cantidad:
+                hijos = resultados[-cantidad:]
+                del resultados[-cantidad:]
+            tamano = 1 + sum(tamanos[id(hijo)] for hijo in hijos)
+
+            if (plegar and tipo == "Operacion" and valor in _OPERACIONES and len(hijos) == 2
+                    and hijos[0].tipo in _CONSTANTES and hijos[1].tipo in _CONSTANTES):
+                plegado = plegar_constante(valor, hijos[0], hijos[1])
+                if plegado is not None:
+                    estadisticas.plegadas += 1
+                    estadisticas.nodos_plegados += tamano - 1
+                    tipo, valor, hijos, tamano = plegado.tipo, plegado.valor, [], 1
+
+            if compartir:
+                clave = (tipo, valor, tuple(map(id, hijos)))
+                unico = unicos.get(clave)
+                if unico is not None:
+                    estadisticas.reutilizados += 1
+                    resultados.append(unico)
+                    continue
+                unico = unicos[clave] = NodoArbol(tipo, valor, hijos)
+            else:
+                unico = NodoArbol(tipo, valor, hijos)
+            tamanos[id(unico)] = tamano
+            resultados.append(unico)
+
+    raiz = resultados[0]
+    # Las hojas que se plegaron ya se habian creado: se cuentan solo los
+    # nodos alcanzables desde la raiz
+    estadisticas.nodos_salida = contar_nodos(raiz)
+    estadisticas.nodos_compartidos = (estadisticas.nodos_entrada - estadisticas.nodos_plegados
+                                      - estadisticas.nodos_salida)
+    if perfilador is not None:
+        perfilador.contar("plegadas", estadisticas.plegadas)
+        perfilador.contar("nodos_compartidos", estadisticas.nodos_compartidos)
+    return raiz, estadisticas
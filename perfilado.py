@@ -0,0 +1,121 @@
+"""Instrumentacion opcional del pipeline: tramos de tiempo y contadores"""
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+_SIN_TRAMO = nullcontext()
+
+
+class Perfilador:
+    """Acumula tramos de tiempo y contadores de una ejecucion del pipeline.
+
+    Las etapas se miden con 'with perfilador.tramo("nombre"):' y los
+    contadores con contar() o maximo(). Los ganchos se llaman como
+    gancho(evento, nombre, valor), con evento "tramo" (valor en segundos) o
+    "contador" (valor acumulado). Con activo=False nada se registra y
+    tramo() retorna un contexto vacio.
+    """
+
+    def __init__(self, activo=True, ganchos=None):
+        self.activo = activo
+        self.ganchos = list(ganchos) if ganchos else []
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta los tramos y contadores registrados"""
+        self.tramos = []  # (nombre, inicio en s desde reiniciar, duracion en s, nivel)
+        self.contadores = {}
+        self._origen = time.perf_counter()
+        self._nivel = 0
+
+    def agregar_gancho(self, gancho):
+        self.ganchos.append(gancho)
+
+    def tramo(self, nombre):
+        """Contexto que mide el tiempo de una etapa"""
+        if not self.activo:
+            return _SIN_TRAMO
+        return self._tramo(nombre)
+
+    @contextmanager
+    def _tramo(self, nombre):
+        nivel = self._nivel
+        self._nivel += 1
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracion = time.perf_counter() - inicio
+            self._nivel = nivel
+            self.tramos.append((nombre, inicio - self._origen, duracion, nivel))
+            for gancho in self.ganchos:
+                gancho("tramo", nombre, duracion)
+
+    def contar(self, nombre, cantidad=1):
+        """Suma cantidad al contador nombre"""
+        if self.activo:
+            self._fijar(nombre, self.contadores.get(nombre, 0) + cantidad)
+
+    def maximo(self, nombre, valor):
+        """Guarda en el contador nombre el mayor valor visto"""
+        if self.activo and valor > self.contadores.get(nombre, valor - 1):
+            self._fijar(nombre, valor)
+
+    def _fijar(self, nombre, valor):
+        self.contadores[nombre] = valor
+        for gancho in self.ganchos:
+            gancho("contador", nombre, valor)
+
+    def totales(self):
+        """Tiempo total en segundos por nombre de tramo, en orden de aparicion"""
+        totales = {}
+        for nombre, _, duracion, _ in self.tramos:
+            totales[nombre] = totales.get(nombre, 0.0) + duracion
+        return totales
+
+    def a_dict(self):
+        return {
+            "tramos": [
+                {"nombre": nombre, "inicio_s": inicio, "duracion_s": duracion, "nivel": nivel}
+                for nombre, inicio, duracion, nivel in sorted(self.tramos, key=lambda t: t[1])
+            ],
+            "totales_s": self.totales(),
+            "contadores": dict(self.contadores),
+        }
+
+    def a_json(self, **opciones):
+        return json.dumps(self.a_dict(), **opciones)
+
+    def volcar(self, ruta):
+        """Guarda el perfil en un archivo JSON"""
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(self.a_dict(), archivo, indent=2)
+
+    def resumen(self):
+        """Una linea con los tiempos de primer nivel y los contadores"""
+        totales = {}
+        for nombre, _, duracion, nivel in self.tramos:
+            if nivel == 0:
+                totales[nombre] = totales.get(nombre, 0.0) + duracion
+        partes = [f"{nombre} {duracion * 1000:.1f} ms" for nombre, duracion in totales.items()]
+        partes += [f"{nombre}: {valor}" for nombre, valor in self.contadores.items()]
+        return " | ".join(partes)
+
+
+def percentil(valores, p):
+    """Percentil p (0 a 100) con interpolacion lineal"""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    posicion = (len(ordenados) - 1) * p / 100
+    i = int(posicion)
+    if i + 1 >= len(ordenados):
+        return ordenados[-1]
+    return ordenados[i] + (ordenados[i + 1] - ordenados[i]) * (posicion - i)
+
+
+def tramo(perfilador, nombre):
+    """perfilador.tramo(nombre), o un contexto vacio si no hay perfilador"""
+    if perfilador is None:
+        return _SIN_TRAMO
+    return perfilador.tramo(nombre)
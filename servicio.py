@@ -0,0 +1,377 @@
+"""Servicio local de analisis lexico y sintactico: una solicitud JSON por linea (NDJSON).
+
+Uso: python servicio.py [--puerto 8765 | --unix RUTA] [--trabajadores N]
+     python servicio.py carga [--conexiones 16] [--duracion 10]
+
+Cada linea recibida es una solicitud y cada respuesta una linea, en el
+mismo orden dentro de cada conexion:
+
+    {"id": 1, "codigo": "x = 2 + 3", "arbol": "json", "tokens": true}
+    {"id": 1, "tokens": [["IDENTIFICADOR", "x", 1], ...], "errores": [], "arbol": {...}}
+
+Campos opcionales: "motor", "backend", "arbol" ("texto", como
+imprimir_arbol, "json", "sexpr" o null), "limite_nodos" y "tokens".
+{"metricas": true} responde las metricas del servicio; un error se
+responde como {"id": ..., "error": "mensaje"}.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analizador_lexico import BACKENDS, analizar_lexico, tokens_sintacticos
+from analizador_sintactico import FORMATOS_ARBOL, MOTORES, AnalizadorSintactico, escribir_arbol
+from perfilado import percentil
+
+PUERTO = 8765
+
+# Una solicitud mas larga que esto (en bytes) se rechaza y se cierra la conexion
+LIMITE_SOLICITUD = 1 << 24
+
+# Latencias recientes que se guardan para los percentiles de las metricas
+MUESTRAS_LATENCIA = 10000
+
+
+def validar(solicitud):
+    """Mensaje de error de una solicitud con campos invalidos, o None"""
+    motor = solicitud.get("motor", "iterativo")
+    backend = solicitud.get("backend", "python")
+    formato = solicitud.get("arbol", "texto")
+    limite = solicitud.get("limite_nodos")
+    if not isinstance(solicitud.get("codigo"), str):
+        return "Falta 'codigo' (texto)"
+    if not isinstance(motor, str) or motor not in MOTORES:
+        return f"Motor sintactico desconocido: '{motor}'"
+    if not isinstance(backend, str) or backend not in BACKENDS:
+        return f"Backend lexico desconocido: '{backend}'"
+    if formato is not None and (not isinstance(formato, str) or formato not in FORMATOS_ARBOL):
+        return f"Formato de arbol desconocido: '{formato}'"
+    if limite is not None and (type(limite) is not int or limite < 0):
+        return "'limite_nodos' debe ser un entero no negativo o null"
+    return None
+
+
+def procesar(solicitud):
+    """Trabajador: analiza una solicitud ya decodificada; retorna (linea de respuesta, es_error).
+
+    La respuesta se serializa aqui, asi el proceso del servicio solo
+    recibe y reenvia texto. El arbol en JSON se inserta tal como lo escribe
+    escribir_arbol, sin decodificarlo.
+    """
+    respuesta = {"id": solicitud.get("id")}
+    codigo = solicitud.get("codigo")
+    motor = solicitud.get("motor", "iterativo")
+    backend = solicitud.get("backend", "python")
+    formato = solicitud.get("arbol", "texto")
+    error = validar(solicitud)
+    if error is not None:
+        respuesta["error"] = error
+        return json.dumps(respuesta, ensure_ascii=False), True
+
+    inicio = time.perf_counter()
+    try:
+        tokens = analizar_lexico(codigo, backend)
+        if solicitud.get("tokens", True):
+            respuesta["tokens"] = [[token.tipo, token.valor, token.linea] for token in tokens]
+        respuesta["errores_lexicos"] = [{"linea": token.linea, "mensaje": token.valor}
+                                        for token in tokens if token.tipo == "ERROR"]
+        arbol, errores = AnalizadorSintactico(tokens_sintacticos(tokens), motor,
+                                              arbol="compacto", recuperacion=True).analizar()
+        respuesta["errores"] = [{"linea": error.linea, "mensaje": str(error)}
+                                for error in errores]
+        texto_arbol = None
+        if formato is not None:
+            texto_arbol = io.StringIO()
+            escribir_arbol(arbol, texto_arbol, formato,
+                           limite_nodos=solicitud.get("limite_nodos"))
+            texto_arbol = texto_arbol.getvalue()
+    except Exception as e:
+        return json.dumps({"id": respuesta["id"], "error": f"Error de analisis: {e}"},
+                          ensure_ascii=False), True
+    respuesta["tiempo_ms"] = (time.perf_counter() - inicio) * 1000
+
+    linea = json.dumps(respuesta, ensure_ascii=False)
+    if texto_arbol is not None:
+        if formato == "json":
+            valor = texto_arbol.strip() or "null"
+        else:
+            valor = json.dumps(texto_arbol, ensure_ascii=False)
+        linea = f'{linea[:-1]}, "arbol": {valor}}}'
+    return linea, False
+
+
+class Metricas:
+    """Conteos y latencias del servicio (en el hilo del bucle de eventos)"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.conexiones = 0
+        self.solicitudes = 0
+        self.errores = 0
+        self.agotadas = 0
+        self.en_curso = 0
+        self.bytes_recibidos = 0
+        self.latencias = deque(maxlen=MUESTRAS_LATENCIA)  # (fin, segundos)
+
+    def registrar(self, inicio, error=False, agotada=False):
+        fin = time.perf_counter()
+        self.solicitudes += 1
+        self.errores += error
+        self.agotadas += agotada
+        self.latencias.append((fin, fin - inicio))
+
+    def a_dict(self, ventana=10.0):
+        """Metricas acumuladas y de los ultimos 'ventana' segundos"""
+        ahora = time.perf_counter()
+        transcurrido = ahora - self.inicio
+        recientes = [latencia for fin, latencia in self.latencias if ahora - fin <= ventana]
+        ventana = min(ventana, transcurrido)
+
+        def ms(segundos):
+            return None if segundos is None else segundos * 1000
+
+        return {
+            "activo_s": transcurrido,
+            "conexiones": self.conexiones,
+            "solicitudes": self.solicitudes,
+            "errores": self.errores,
+            "agotadas": self.agotadas,
+            "en_curso": self.en_curso,
+            "bytes_recibidos": self.bytes_recibidos,
+            "solicitudes_por_s": self.solicitudes / transcurrido if transcurrido else 0.0,
+            "recientes_por_s": len(recientes) / ventana if ventana else 0.0,
+            "latencia_ms": {f"p{p}": ms(percentil(recientes, p)) for p in (50, 90, 99)},
+        }
+
+
+class ServicioAnalisis:
+    """Servidor asyncio que reparte el analisis entre un grupo acotado de trabajadores.
+
+    El bucle de eventos solo lee lineas, decodifica el JSON y escribe
+    respuestas; el lexico, el sintactico y la serializacion corren en el
+    ejecutor (procesos por defecto: el analisis es Python puro y con hilos
+    competiria por el GIL). A lo sumo max_pendientes solicitudes estan en
+    el ejecutor a la vez: cuando se llega al limite las conexiones dejan de
+    leer, asi la contrapresion llega a los clientes por TCP en vez de crecer
+    una cola sin fin. Cada solicitud tiene timeout segundos; al agotarse se
+    responde con error, aunque el trabajador termina la tarea y su lugar
+    solo se libera entonces. Si un proceso trabajador muere, las
+    solicitudes afectadas responden con error y se crea un ejecutor nuevo.
+    """
+
+    def __init__(self, trabajadores=None, max_pendientes=None, timeout=10.0, hilos=False):
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes or self.trabajadores * 4
+        self.timeout = timeout
+        self._tipo_ejecutor = ThreadPoolExecutor if hilos else ProcessPoolExecutor
+        self.ejecutor = self._tipo_ejecutor(self.trabajadores)
+        self.metricas = Metricas()
+        self._lugares = None
+        self._servidor = None
+
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO, unix=None):
+        """Empieza a escuchar; retorna el asyncio.Server (puerto=0 elige uno libre)"""
+        self._lugares = asyncio.Semaphore(self.max_pendientes)
+        if unix is not None:
+            self._servidor = await asyncio.start_unix_server(self.atender, unix,
+                                                             limit=LIMITE_SOLICITUD)
+        else:
+            self._servidor = await asyncio.start_server(self.atender, host, puerto,
+                                                        limit=LIMITE_SOLICITUD)
+        return self._servidor
+
+    async def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    async def atender(self, lector, escritor):
+        """Atiende una conexion: una solicitud a la vez, respuestas en orden"""
+        self.metricas.conexiones += 1
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except ValueError:
+                    # Linea mas larga que LIMITE_SOLICITUD: no hay forma de
+                    # resincronizar la conexion
+                    escritor.write(b'{"id": null, "error": "Solicitud demasiado grande"}\n')
+                    await escritor.drain()
+                    break
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                respuesta = await self.responder(linea)
+                escritor.write(respuesta.encode("utf-8") + b"\n")
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.metricas.conexiones -= 1
+            escritor.close()
+
+    async def responder(self, linea):
+        """Linea de respuesta (sin salto de linea) para una linea de solicitud"""
+        inicio = time.perf_counter()
+        self.metricas.bytes_recibidos += len(linea)
+        try:
+            solicitud = json.loads(linea)
+            if not isinstance(solicitud, dict):
+                raise ValueError("la solicitud debe ser un objeto")
+        except ValueError as e:
+            self.metricas.registrar(inicio, error=True)
+            return json.dumps({"id": None, "error": f"JSON invalido: {e}"})
+        if solicitud.get("metricas"):
+            return json.dumps({"id": solicitud.get("id"), "metricas": self.metricas.a_dict()})
+        invalida = validar(solicitud)
+        if invalida is not None:
+            # Se responde sin pasar por el ejecutor
+            self.metricas.registrar(inicio, error=True)
+            return json.dumps({"id": solicitud.get("id"), "error": invalida}, ensure_ascii=False)
+
+        await self._lugares.acquire()
+        self.metricas.en_curso += 1
+        bucle = asyncio.get_running_loop()
+        ejecutor = self.ejecutor
+        futuro = None
+        try:
+            futuro = ejecutor.submit(procesar, solicitud)
+            # El lugar se libera cuando el trabajador termina, no al agotarse
+            # el timeout: asi max_pendientes acota de verdad el trabajo en curso
+            futuro.add_done_callback(lambda _: bucle.call_soon_threadsafe(self._liberar))
+            respuesta, error = await asyncio.wait_for(asyncio.wrap_future(futuro),
+                                                      self.timeout)
+        except asyncio.TimeoutError:
+            self.metricas.registrar(inicio, error=True, agotada=True)
+            return json.dumps({"id": solicitud.get("id"),
+                               "error": f"Tiempo agotado ({self.timeout} s)"})
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._reemplazar_ejecutor(ejecutor)
+            self.metricas.registrar(inicio, error=True)
+            return json.dumps({"id": solicitud.get("id"), "error": f"Error del trabajador: {e}"})
+        finally:
+            if futuro is None:
+                # submit fallo: no hay trabajador que libere el lugar
+                self._liberar()
+        self.metricas.registrar(inicio, error=error)
+        return respuesta
+
+    def _reemplazar_ejecutor(self, roto):
+        """Crea un ejecutor nuevo si un trabajador murio (una vez por ejecutor roto)"""
+        if self.ejecutor is roto:
+            roto.shutdown(wait=False, cancel_futures=True)
+            self.ejecutor = self._tipo_ejecutor(self.trabajadores)
+
+    def _liberar(self):
+        self.metricas.en_curso -= 1
+        self._lugares.release()
+
+
+async def servir(host="127.0.0.1", puerto=PUERTO, unix=None, **opciones):
+    """Ejecuta el servicio hasta que se interrumpa"""
+    servicio = ServicioAnalisis(**opciones)
+    servidor = await servicio.iniciar(host, puerto, unix)
+    direccion = unix or "{}:{}".format(*servidor.sockets[0].getsockname()[:2])
+    print(f"Escuchando en {direccion} con {servicio.trabajadores} trabajador(es), "
+          f"hasta {servicio.max_pendientes} solicitudes en curso", file=sys.stderr)
+    try:
+        await servidor.serve_forever()
+    finally:
+        await servicio.cerrar()
+
+
+async def carga(host="127.0.0.1", puerto=PUERTO, unix=None, conexiones=16, duracion=10.0,
+                codigo="x = (a + b) * 3\ny = x / 2 - c\n", arbol="json"):
+    """Prueba de carga: conexiones clientes envian solicitudes sin pausa durante duracion s.
+
+    Retorna las solicitudes completadas, los errores, las solicitudes por
+    segundo sostenidas y los percentiles de latencia vistos por el cliente.
+    """
+    solicitud = json.dumps({"codigo": codigo, "arbol": arbol}).encode("utf-8") + b"\n"
+    latencias = []
+    errores = 0
+    fin = time.perf_counter() + duracion
+
+    async def cliente():
+        nonlocal errores
+        if unix is not None:
+            lector, escritor = await asyncio.open_unix_connection(unix, limit=LIMITE_SOLICITUD)
+        else:
+            lector, escritor = await asyncio.open_connection(host, puerto,
+                                                             limit=LIMITE_SOLICITUD)
+        try:
+            while time.perf_counter() < fin:
+                inicio = time.perf_counter()
+                escritor.write(solicitud)
+                await escritor.drain()
+                respuesta = await lector.readline()
+                if not respuesta:
+                    break
+                latencias.append(time.perf_counter() - inicio)
+                if "error" in json.loads(respuesta):
+                    errores += 1
+        finally:
+            escritor.close()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(conexiones)))
+    transcurrido = time.perf_counter() - inicio
+    return {
+        "conexiones": conexiones,
+        "solicitudes": len(latencias),
+        "errores": errores,
+        "duracion_s": transcurrido,
+        "solicitudes_por_s": len(latencias) / transcurrido,
+        "latencia_ms": {f"p{p}": percentil(latencias, p) * 1000 if latencias else None
+                        for p in (50, 90, 99)},
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servicio local de analisis (NDJSON)")
+    parser.add_argument("comando", nargs="?", choices=("servir", "carga"), default="servir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--unix", help="ruta de un socket Unix en vez de TCP")
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="procesos trabajadores (por defecto, uno por nucleo)")
+    parser.add_argument("--pendientes", type=int, default=None,
+                        help="solicitudes en curso como maximo (por defecto, 4 por trabajador)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="segundos por solicitud")
+    parser.add_argument("--hilos", action="store_true", help="trabajadores en hilos, no procesos")
+    parser.add_argument("--conexiones", type=int, default=16, help="carga: clientes simultaneos")
+    parser.add_argument("--duracion", type=float, default=10.0, help="carga: segundos")
+    parser.add_argument("--archivo", help="carga: archivo con el codigo a enviar")
+    argumentos = parser.parse_args(argumentos)
+
+    if argumentos.comando == "carga":
+        opciones = {}
+        if argumentos.archivo:
+            with open(argumentos.archivo, encoding="utf-8") as archivo:
+                opciones["codigo"] = archivo.read()
+        resultado = asyncio.run(carga(argumentos.host, argumentos.puerto, argumentos.unix,
+                                      argumentos.conexiones, argumentos.duracion, **opciones))
+        print(json.dumps(resultado, indent=2))
+        return 1 if resultado["errores"] else 0
+
+    try:
+        asyncio.run(servir(argumentos.host, argumentos.puerto, argumentos.unix,
+                           trabajadores=argumentos.trabajadores,
+                           max_pendientes=argumentos.pendientes, timeout=argumentos.timeout,
+                           hilos=argumentos.hilos))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
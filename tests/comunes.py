@@ -0,0 +1,29 @@
+"""Programas de prueba y formas comparables de los resultados"""
+import random
+
+from analizador_sintactico import imprimir_arbol
+
+# Piezas de codigo para armar programas al azar, con errores lexicos y sintacticos
+PIEZAS = ["x", "y", "1", "2.5", "+", "-", "*", "/", "(", ")", "=", " ", "\n", "\n", "\n",
+          "$", "abc", "33", "x = 1", "y = (2", "\nz = 3\n", "\nw\n"]
+
+# Programas validos de referencia
+PROGRAMAS = [
+    "x = 3 + 5\ny = x * 2",
+    "resultado = (a + b) * (c - 4.75) / 2",
+    "a = 1\nb = a / (a - 1)\nc = b * b",
+    "total = ((((1 + 2) * 3) - 4) / 5)",
+    "x = 1\nx = x + 1\nx = x * x\ny = x - 2.5",
+]
+
+
+def programas_al_azar(cantidad, semilla=0, longitud=60):
+    azar = random.Random(semilla)
+    return ["".join(azar.choice(PIEZAS) for _ in range(azar.randint(0, longitud)))
+            for _ in range(cantidad)]
+
+
+def firma(arbol, errores):
+    """Texto del arbol y datos de cada error, para comparar dos analisis"""
+    texto = imprimir_arbol(arbol) if arbol is not None else None
+    return texto, [(str(error), error.posicion, error.linea) for error in errores]
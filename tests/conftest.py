@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los modulos del proyecto estan en la raiz del repositorio, sin paquete
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
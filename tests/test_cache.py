@@ -0,0 +1,74 @@
+import pytest
+
+from analizador_lexico import tokenizar, tokens_sintacticos
+from analizador_sintactico import AnalizadorSintactico, imprimir_arbol
+from cache_analisis import CacheAnalisis, EntradaInvalida, deserializar, serializar
+from comunes import PROGRAMAS, programas_al_azar
+
+
+def datos_tokens(tokens):
+    return [(t.tipo, t.valor, t.inicio, t.clase, t.linea) for t in tokens]
+
+
+def datos_errores(errores):
+    return [(str(e), e.posicion, e.inicio, e.linea) for e in errores]
+
+
+def analizar(codigo):
+    tokens = tokenizar(codigo)
+    arbol, errores = AnalizadorSintactico(tokens_sintacticos(tokens), arbol="compacto",
+                                          recuperacion=True).analizar()
+    return tokens, arbol, errores
+
+
+def test_serializar_ida_y_vuelta():
+    for codigo in PROGRAMAS + programas_al_azar(200, semilla=5) + ["", "$ # @"]:
+        tokens, arbol, errores = analizar(codigo)
+        resultado = deserializar(serializar(tokens, arbol, errores))
+        assert datos_tokens(resultado.tokens) == datos_tokens(tokens)
+        assert datos_errores(resultado.errores) == datos_errores(errores)
+        if arbol is None:
+            assert resultado.arbol is None
+        else:
+            assert imprimir_arbol(resultado.arbol) == imprimir_arbol(arbol)
+
+
+def test_datos_corruptos():
+    datos = serializar(*analizar("x = (a + b) * 3\ny = 2"))
+    for largo in (0, 3, len(datos) // 2, len(datos) - 1):
+        with pytest.raises(EntradaInvalida):
+            deserializar(datos[:largo])
+
+
+def test_cache_en_memoria_y_en_disco(tmp_path):
+    ruta = str(tmp_path / "resultados.sqlite")
+    codigo = "x = 1 + 2\ny = x * (3 - z)"
+    cache = CacheAnalisis(ruta=ruta)
+    nuevo = cache.analizar(codigo)
+    assert nuevo.origen is None
+    en_memoria = cache.analizar(codigo)
+    assert en_memoria.origen == "memoria"
+    cache.cerrar()
+
+    otra = CacheAnalisis(ruta=ruta)
+    en_disco = otra.analizar(codigo)
+    assert en_disco.origen == "disco"
+    assert otra.analizar(codigo).origen == "memoria"
+    for resultado in (en_memoria, en_disco):
+        assert datos_tokens(resultado.tokens) == datos_tokens(nuevo.tokens)
+        assert imprimir_arbol(resultado.arbol) == imprimir_arbol(nuevo.arbol)
+        assert datos_errores(resultado.errores) == datos_errores(nuevo.errores)
+    otra.cerrar()
+
+
+def test_entrada_corrupta_en_disco_es_un_fallo(tmp_path):
+    ruta = str(tmp_path / "resultados.sqlite")
+    cache = CacheAnalisis(ruta=ruta)
+    cache.analizar("x = 1")
+    cache._conexion.execute("UPDATE resultados SET datos = ?", (b"basura",))
+    cache.cerrar()
+
+    otra = CacheAnalisis(ruta=ruta)
+    assert otra.obtener(otra.clave("x = 1")) is None
+    assert otra.analizar("x = 1").origen is None
+    otra.cerrar()
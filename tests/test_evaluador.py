@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from analizador_lexico import tokenizar, tokens_sintacticos
+from analizador_sintactico import AnalizadorSintactico
+from evaluador import ErrorEvaluacion, compilar_programa, interpretar
+
+OPERANDOS = ["0", "1", "7", "2.5", "0.0", "10", "a", "b", "x", "y", "z", "3.25"]
+
+
+def expresion(azar, profundidad=0):
+    if profundidad > 3 or azar.random() < 0.3:
+        return azar.choice(OPERANDOS)
+    texto = (f"{expresion(azar, profundidad + 1)} {azar.choice('+-*/')} "
+             f"{expresion(azar, profundidad + 1)}")
+    return f"({texto})" if azar.random() < 0.4 else texto
+
+
+def resultado(evaluar):
+    try:
+        return evaluar()
+    except ErrorEvaluacion as error:
+        return ("error", str(error), error.sentencia)
+
+
+@pytest.mark.parametrize("arbol", ["objetos", "compacto"])
+def test_compilado_igual_que_interpretado(arbol):
+    azar = random.Random(4)
+    comparados = 0
+    for _ in range(1500):
+        codigo = "\n".join(f"{azar.choice('xyzw')} = {expresion(azar)}" if azar.random() < 0.8
+                           else expresion(azar) for _ in range(azar.randint(1, 6)))
+        tokens = tokens_sintacticos(tokenizar(codigo))
+        programa, errores = AnalizadorSintactico(tokens, arbol=arbol).analizar()
+        if errores:
+            continue
+        entradas = {nombre: azar.choice([0, 3, -2, 1.5, "2.75"]) for nombre in "abxyzw"}
+        compilado = resultado(lambda: compilar_programa(programa).evaluar(entradas))
+        interpretado = resultado(lambda: interpretar(programa, entradas))
+        assert compilado == interpretado, codigo
+        comparados += 1
+    assert comparados > 1000
+
+
+def test_entrada_sin_valor():
+    tokens = tokens_sintacticos(tokenizar("x = a + 1"))
+    programa, _ = AnalizadorSintactico(tokens).analizar()
+    with pytest.raises(ErrorEvaluacion):
+        compilar_programa(programa).evaluar({})
+    with pytest.raises(ErrorEvaluacion):
+        interpretar(programa, {})
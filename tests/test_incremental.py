@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from analizador_incremental import AnalizadorIncremental
+from analizador_lexico import tokenizar, tokens_sintacticos
+from analizador_sintactico import AnalizadorSintactico
+from comunes import PIEZAS, firma, programas_al_azar
+
+
+def completo(codigo, motor):
+    tokens = tokens_sintacticos(tokenizar(codigo))
+    return AnalizadorSintactico(tokens, motor, recuperacion=True, max_errores=None).analizar()
+
+
+@pytest.mark.parametrize("motor", ["recursivo", "iterativo"])
+def test_ediciones_igual_que_analisis_completo(motor):
+    azar = random.Random(0)
+    for codigo in programas_al_azar(150, semilla=2):
+        incremental = AnalizadorIncremental(codigo, motor)
+        for _ in range(6):
+            if azar.random() < 0.5:
+                inicio = azar.randint(0, len(codigo))
+                fin = azar.randint(inicio, min(len(codigo), inicio + 5))
+                codigo = codigo[:inicio] + azar.choice(PIEZAS + [""]) + codigo[fin:]
+                incremental.actualizar(codigo)
+            else:
+                lineas = codigo.split("\n")
+                desde = azar.randint(0, len(lineas) - 1)
+                hasta = azar.randint(desde + 1, min(len(lineas), desde + 2))
+                nuevas = azar.choice(PIEZAS).split("\n")
+                lineas[desde:hasta] = nuevas
+                codigo = "\n".join(lineas)
+                incremental.reemplazar_lineas(desde, hasta, nuevas)
+            assert incremental.codigo == codigo
+            assert firma(*incremental.analizar()) == firma(*completo(codigo, motor)), codigo
+
+
+def test_sin_cambios_no_analiza_tramos():
+    codigo = "\n".join(f"x{i} = {i} * (y + 1)" for i in range(200))
+    incremental = AnalizadorIncremental(codigo)
+    incremental.actualizar(codigo)
+    assert incremental.tramos_analizados == 0
+    incremental.actualizar(codigo.replace("x7 = 7", "x7 = 8"))
+    assert 0 < incremental.tramos_analizados < 200
+
+
+def test_primeros_tokens():
+    codigo = "a = 1 + 2\nb = a $ 3"
+    incremental = AnalizadorIncremental(codigo)
+    tokens = tokenizar(codigo)
+    assert incremental.total_tokens == len(tokens_sintacticos(tokens))
+    assert [(t.tipo, t.valor) for t in incremental.primeros_tokens(4)] == \
+        [(t.tipo, t.valor) for t in tokens[:4]]
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+from conftest import RAIZ
+
+from analizador_lexico import (CASOS_PARIDAD, FuenteMapeada, comparar_tokens, tokenizar,
+                               tokenizar_mapeado, verificar_paridad)
+from comunes import programas_al_azar
+
+EJECUTABLE = os.path.join(RAIZ, "analizador.exe")
+
+
+@pytest.mark.skipif(not os.path.exists(EJECUTABLE), reason="falta analizador.exe (Flex)")
+def test_paridad_con_flex():
+    casos = CASOS_PARIDAD + programas_al_azar(50, semilla=6)
+    assert verificar_paridad(EJECUTABLE, casos) == {}
+
+
+def test_tokenizar_mapeado_igual_que_tokenizar(tmp_path):
+    for i, codigo in enumerate(CASOS_PARIDAD + programas_al_azar(50, semilla=7)):
+        ruta = tmp_path / f"fuente{i}.txt"
+        ruta.write_bytes(codigo.encode())
+        with FuenteMapeada(str(ruta)) as fuente:
+            mapeados = tokenizar_mapeado(fuente)
+            assert comparar_tokens(tokenizar(codigo), mapeados, con_posicion=True) == []
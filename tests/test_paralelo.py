@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from analisis_paralelo import analizar_paralelo
+from analizador_lexico import tokenizar, tokens_sintacticos
+from analizador_sintactico import AnalizadorSintactico
+from comunes import firma, programas_al_azar
+
+
+@pytest.fixture(scope="module")
+def ejecutor():
+    with ProcessPoolExecutor(2) as ejecutor:
+        yield ejecutor
+
+
+@pytest.mark.parametrize("arbol", ["objetos", "compacto"])
+@pytest.mark.parametrize("max_errores", [None, 1, 3])
+def test_paralelo_igual_que_en_serie(ejecutor, arbol, max_errores):
+    for codigo in programas_al_azar(60, semilla=3, longitud=120):
+        tokens = tokens_sintacticos(tokenizar(codigo))
+        esperado = AnalizadorSintactico(tokens, "iterativo", arbol, recuperacion=True,
+                                        max_errores=max_errores).analizar()
+        obtenido = analizar_paralelo(codigo, procesos=2, arbol=arbol, max_errores=max_errores,
+                                     umbral=0, ejecutor=ejecutor)
+        assert firma(*obtenido) == firma(*esperado), codigo
+
+
+def test_programa_grande_en_trozos(ejecutor):
+    codigo = "\n".join(f"v{i} = (a + {i}) * b - {i}.5 / c" for i in range(3000))
+    tokens = tokens_sintacticos(tokenizar(codigo))
+    esperado = AnalizadorSintactico(tokens, "iterativo", "compacto").analizar()
+    obtenido = analizar_paralelo(codigo, procesos=2, umbral=0, ejecutor=ejecutor)
+    assert firma(*obtenido) == firma(*esperado)
+    assert len(obtenido[0].arbol) == len(esperado[0].arbol)
@@ -0,0 +1,37 @@
+import pytest
+
+from analizador_lexico import tokenizar, tokens_sintacticos
+from analizador_sintactico import MOTORES, AnalizadorSintactico
+from comunes import PROGRAMAS, firma, programas_al_azar
+
+
+def analizar(codigo, motor, arbol="objetos", recuperacion=True):
+    tokens = tokens_sintacticos(tokenizar(codigo))
+    return AnalizadorSintactico(tokens, motor, arbol, recuperacion=recuperacion,
+                                max_errores=None).analizar()
+
+
+@pytest.mark.parametrize("arbol", ["objetos", "compacto"])
+@pytest.mark.parametrize("recuperacion", [True, False])
+def test_motores_iguales(arbol, recuperacion):
+    for codigo in PROGRAMAS + programas_al_azar(300):
+        recursivo = firma(*analizar(codigo, "recursivo", arbol, recuperacion))
+        iterativo = firma(*analizar(codigo, "iterativo", arbol, recuperacion))
+        assert recursivo == iterativo, codigo
+
+
+def test_arbol_compacto_igual_al_de_objetos():
+    for codigo in PROGRAMAS + programas_al_azar(200, semilla=1):
+        assert firma(*analizar(codigo, "iterativo", "compacto")) == \
+            firma(*analizar(codigo, "iterativo", "objetos")), codigo
+
+
+def test_iterativo_sin_limite_de_profundidad():
+    codigo = "x = " + "(" * 20000 + "1" + ")" * 20000
+    arbol, errores = analizar(codigo, "iterativo", "compacto")
+    assert not errores
+    assert arbol is not None
+
+
+def test_motores_conocidos():
+    assert set(MOTORES) == {"recursivo", "iterativo"}
@@ -0,0 +1,420 @@
+"""Vistas perezosas de la interfaz para resultados grandes: arbol y lista de tokens.
+
+IndiceArbol y FilasTokens no dependen de Tk y se construyen en el hilo
+trabajador; VistaArbol y ListaVirtual solo crean los elementos que se ven.
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from tkinter import ttk
+
+from analizador_sintactico import VistaNodo, sin_recolector
+
+# Hijos que se insertan por vez al expandir un nodo; el resto queda en un
+# elemento "... N mas" que se expande igual que un nodo
+HIJOS_POR_BLOQUE = 500
+# Nodos recorridos entre dos llamadas a verificar() al construir el indice
+_NODOS_POR_VERIFICACION = 1 << 14
+# Cadenas sin nodos que puede arrastrar un indice reutilizado antes de rehacerse
+_CADENAS_SIN_USO = 1 << 16
+
+
+class IndiceArbol:
+    """Arbol sintactico aplanado en preorden, con el tamano de cada subarbol.
+
+    Cada nodo es su posicion en preorden. Las columnas guardan el tipo y el
+    valor (indices en 'cadenas', -1 sin valor), la distancia hasta el padre
+    (0 en la raiz, -1 en los hijos de la raiz) y los nodos del subarbol; los
+    hijos de i empiezan en i + 1 y cada uno salta al siguiente con su
+    tamano. Como ninguna columna depende de la posicion, los hijos de la
+    raiz se copian tal cual de un indice 'anterior' a otra posicion: solo
+    se recorren los que no estaban. El indice de busqueda se arma la
+    primera vez que se busca.
+    """
+
+    def __init__(self, raiz, verificar=None, anterior=None):
+        self.cadenas = []
+        self.tipos = array("i")
+        self.valores = array("i")
+        self.distancias = array("i")
+        self.tamanos = array("i")
+        self._busqueda = None
+        # Para reutilizar el indice: cadenas internadas, la raiz, sus hijos
+        # (los objetos, que no cambian de id mientras se guarden) y la
+        # posicion de cada uno
+        self._internadas = {}
+        self._raiz = None
+        self._hijos_raiz = []
+        self._posiciones = array("i")
+        verificar = verificar or (lambda: None)
+        with sin_recolector():
+            if isinstance(raiz, VistaNodo):
+                self._aplanar_compacto(raiz, verificar)
+                self._sumar_tamanos(1, len(self.tamanos))
+            else:
+                self._aplanar_nodos(raiz, verificar, anterior)
+
+    @classmethod
+    def actualizado(cls, raiz, anterior, verificar=None):
+        """Indice de 'raiz' reutilizando 'anterior' (el mismo si la raiz no cambio)"""
+        if (anterior is not None and not isinstance(raiz, VistaNodo)
+                and anterior._raiz == (raiz.tipo, raiz.valor)
+                and anterior._hijos_raiz == raiz.hijos):
+            return anterior
+        return cls(raiz, verificar, anterior)
+
+    def _sumar_tamanos(self, inicio, fin):
+        tamanos, distancias = self.tamanos, self.distancias
+        # En preorden cada hijo va despues de su padre: de atras hacia
+        # adelante, cada subarbol esta completo al sumarlo a su padre
+        for i in range(fin - 1, inicio - 1, -1):
+            distancia = distancias[i]
+            tamanos[i - distancia if distancia > 0 else 0] += tamanos[i]
+
+    def _aplanar_compacto(self, raiz, verificar):
+        compacto = raiz.arbol
+        self.cadenas = list(compacto.cadenas)
+        tipos, valores = compacto.tipos, compacto.valores
+        primer_hijo, siguiente_hermano = compacto.primer_hijo, compacto.siguiente_hermano
+        pendientes = [(raiz.indice, -1)]
+        while pendientes:
+            nodo, padre = pendientes.pop()
+            self._agregar(tipos[nodo], valores[nodo], padre, verificar)
+            posicion = len(self.tipos) - 1
+            hijos = []
+            hijo = primer_hijo[nodo]
+            while hijo >= 0:
+                hijos.append((hijo, posicion))
+                hijo = siguiente_hermano[hijo]
+            hijos.reverse()
+            pendientes.extend(hijos)
+
+    def _aplanar_nodos(self, raiz, verificar, anterior):
+        hijos = self._hijos_raiz = list(raiz.hijos)
+        previos = []
+        if (anterior is not None and anterior._raiz is not None
+                and len(anterior.cadenas) <= 2 * len(anterior) + _CADENAS_SIN_USO):
+            # La lista y el diccionario solo crecen: los indices del anterior
+            # siguen valiendo y su tabla se puede compartir. Si acumulo muchas
+            # cadenas que ya no se usan, se arma todo de nuevo
+            self.cadenas, self._internadas = anterior.cadenas, anterior._internadas
+            previos = anterior._hijos_raiz
+        internadas = self._internadas
+
+        def internar(cadena):
+            indice = internadas.get(cadena)
+            if indice is None:
+                indice = internadas[cadena] = len(self.cadenas)
+                self.cadenas.append(cadena)
+            return indice
+
+        valor = raiz.valor
+        self._raiz = (raiz.tipo, valor)
+        self._agregar(internar(raiz.tipo), -1 if valor is None else internar(valor), -1,
+                      verificar)
+
+        # Los hijos iguales al principio y al final se copian en un bloque
+        # cada uno; en el medio, los que ya estaban se copian de a uno
+        prefijo = _comunes(hijos, previos)
+        sufijo = _comunes(hijos[prefijo:][::-1], previos[prefijo:][::-1])
+        fin_previos = len(previos) - sufijo
+        posiciones = anterior._posiciones if previos else array("i")
+        limites = list(posiciones[prefijo:fin_previos + 1]) + [len(anterior) if previos else 0]
+        self._posiciones = posiciones[:prefijo]
+        if prefijo:
+            self._copiar(anterior, 1, limites[0])
+        medio = {id(hijo): (hijo, limites[i], limites[i + 1])
+                 for i, hijo in enumerate(previos[prefijo:fin_previos])}
+        for hijo in hijos[prefijo:len(hijos) - sufijo]:
+            inicio = len(self.tipos)
+            self._posiciones.append(inicio)
+            copia = medio.get(id(hijo))
+            if copia is not None and copia[0] is hijo:
+                self._copiar(anterior, copia[1], copia[2])
+                continue
+            pendientes = [(hijo, 0)]
+            while pendientes:
+                nodo, padre = pendientes.pop()
+                valor = nodo.valor
+                self._agregar(internar(nodo.tipo), -1 if valor is None else internar(valor),
+                              padre, verificar)
+                posicion = len(self.tipos) - 1
+                pendientes.extend((nieto, posicion) for nieto in reversed(nodo.hijos))
+            self._sumar_tamanos(inicio + 1, len(self.tipos))
+        if sufijo:
+            desplazamiento = len(self.tipos) - limites[-2]
+            self._posiciones.extend([posicion + desplazamiento
+                                     for posicion in posiciones[fin_previos:]])
+            self._copiar(anterior, limites[-2], len(anterior))
+        self.tamanos[0] = len(self.tipos)
+
+    def _copiar(self, anterior, desde, hasta):
+        """Agrega las posiciones [desde, hasta) de 'anterior' (hijos de la raiz enteros)"""
+        self.tipos.extend(anterior.tipos[desde:hasta])
+        self.valores.extend(anterior.valores[desde:hasta])
+        self.distancias.extend(anterior.distancias[desde:hasta])
+        self.tamanos.extend(anterior.tamanos[desde:hasta])
+
+    def _agregar(self, tipo, valor, padre, verificar):
+        if not len(self.tipos) % _NODOS_POR_VERIFICACION:
+            verificar()
+        posicion = len(self.tipos)
+        self.tipos.append(tipo)
+        self.valores.append(valor)
+        self.distancias.append(0 if padre < 0 else -1 if padre == 0 else posicion - padre)
+        self.tamanos.append(1)
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def padre(self, nodo):
+        """Posicion del padre del nodo (-1 en la raiz)"""
+        distancia = self.distancias[nodo]
+        if distancia > 0:
+            return nodo - distancia
+        return 0 if distancia else -1
+
+    def etiqueta(self, nodo):
+        """Texto del nodo, como en escribir_arbol"""
+        tipo = self.cadenas[self.tipos[nodo]]
+        valor = self.valores[nodo]
+        if valor >= 0 and self.cadenas[valor]:
+            return f"{tipo}: {self.cadenas[valor]}"
+        return tipo
+
+    def hijos(self, nodo, desde=None):
+        """Itera los hijos de un nodo (desde la posicion de uno de ellos, si se da)"""
+        hijo = nodo + 1 if desde is None else desde
+        fin = nodo + self.tamanos[nodo]
+        tamanos = self.tamanos
+        while hijo < fin:
+            yield hijo
+            hijo += tamanos[hijo]
+
+    def ancestros(self, nodo):
+        """Padres del nodo desde la raiz hasta el padre directo"""
+        ruta = []
+        padre = self.padre(nodo)
+        while padre >= 0:
+            ruta.append(padre)
+            padre = self.padre(padre)
+        ruta.reverse()
+        return ruta
+
+    def buscar(self, texto):
+        """Nodos en preorden cuyo tipo o valor es el texto (sin distinguir mayusculas)"""
+        if self._busqueda is None:
+            por_cadena = {}
+            for nodo, (tipo, valor) in enumerate(zip(self.tipos, self.valores)):
+                por_cadena.setdefault(tipo, array("i")).append(nodo)
+                if valor >= 0 and valor != tipo:
+                    por_cadena.setdefault(valor, array("i")).append(nodo)
+            self._busqueda = {}
+            for cadena, nodos in por_cadena.items():
+                clave = self.cadenas[cadena].casefold()
+                anteriores = self._busqueda.get(clave)
+                # Dos cadenas que solo difieren en mayusculas comparten la clave
+                self._busqueda[clave] = (nodos if anteriores is None
+                                         else array("i", sorted(anteriores + nodos)))
+        return self._busqueda.get(texto.strip().casefold(), array("i"))
+
+
+def _comunes(primeros, segundos):
+    """Cantidad de elementos iniciales que son el mismo objeto en ambas listas.
+
+    Los nodos no definen __eq__: comparar porciones de las listas compara
+    identidades sin recorrerlas en Python.
+    """
+    bajo, alto = 0, min(len(primeros), len(segundos))
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if primeros[bajo:medio] == segundos[bajo:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+class FilasTokens:
+    """Lineas del panel de tokens (las de formatear_tokens), generadas al pedirlas.
+
+    Con truncado, 'tokens' es solo el comienzo de la lista y se agrega "...";
+    total es la cantidad de tokens sintacticos (se cuenta si no se da).
+    """
+
+    def __init__(self, tokens, total=None, truncado=False):
+        self.tokens = tokens
+        if total is None:
+            total = sum(1 for token in tokens if token.tipo != "ERROR")
+        self.finales = ["...", "", f"---TOTAL:{total}"] if truncado else ["", f"---TOTAL:{total}"]
+
+    def __len__(self):
+        return len(self.tokens) + len(self.finales)
+
+    def __getitem__(self, indice):
+        if indice < len(self.tokens):
+            token = self.tokens[indice]
+            return f"{token.tipo}:{token.valor}"
+        return self.finales[indice - len(self.tokens)]
+
+
+class ListaVirtual(tk.Frame):
+    """Lista de solo lectura que dibuja unicamente las filas visibles.
+
+    'filas' es cualquier secuencia de cadenas (len e indices), p. ej. una
+    lista o FilasTokens; la barra de desplazamiento se mueve sobre todas
+    sus filas pero el widget de texto solo contiene las que entran.
+    """
+
+    def __init__(self, padre, font=("Consolas", 10), **opciones):
+        super().__init__(padre)
+        self.texto = tk.Text(self, font=font, wrap=tk.NONE, state="disabled", **opciones)
+        self.barra = tk.Scrollbar(self, command=self._desplazar)
+        self.barra.pack(side=tk.RIGHT, fill=tk.Y)
+        self.texto.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._alto_fila = tkfont.Font(font=self.texto.cget("font")).metrics("linespace")
+        self.filas = []
+        self.primera = 0
+        self.texto.bind("<Configure>", lambda evento: self._dibujar())
+        self.texto.bind("<MouseWheel>", self._rueda)
+        self.texto.bind("<Button-4>", lambda evento: self._desplazar("scroll", -3, "units"))
+        self.texto.bind("<Button-5>", lambda evento: self._desplazar("scroll", 3, "units"))
+
+    def mostrar(self, filas):
+        """Reemplaza el contenido; un texto se divide en lineas"""
+        if isinstance(filas, str):
+            filas = filas.splitlines()
+        self.filas = filas
+        self.primera = 0
+        self._dibujar()
+
+    def visibles(self):
+        return max(1, self.texto.winfo_height() // self._alto_fila)
+
+    def _rueda(self, evento):
+        self._desplazar("scroll", -3 if evento.delta > 0 else 3, "units")
+        return "break"
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        visibles = self.visibles()
+        if accion == "moveto":
+            primera = int(float(cantidad) * len(self.filas))
+        else:
+            paso = visibles if unidad == "pages" else 1
+            primera = self.primera + int(cantidad) * paso
+        self.primera = max(0, min(primera, len(self.filas) - visibles))
+        self._dibujar()
+
+    def _dibujar(self):
+        total = len(self.filas)
+        visibles = self.visibles()
+        self.primera = max(0, min(self.primera, total - visibles))
+        fin = min(total, self.primera + visibles)
+        self.texto.config(state="normal")
+        self.texto.delete("1.0", tk.END)
+        self.texto.insert("1.0", "\n".join(self.filas[i] for i in range(self.primera, fin)))
+        self.texto.config(state="disabled")
+        if total:
+            self.barra.set(self.primera / total, fin / total)
+        else:
+            self.barra.set(0, 1)
+
+
+class VistaArbol(tk.Frame):
+    """ttk.Treeview de un IndiceArbol que crea los elementos al expandir cada nodo.
+
+    La columna "Nodos" muestra el tamano de cada subarbol, asi un nodo
+    cerrado resume lo que contiene. Cada elemento se identifica con la
+    posicion del nodo en preorden; un nodo con muchos hijos los muestra por
+    bloques de HIJOS_POR_BLOQUE. buscar() salta a los nodos con el indice de
+    busqueda, abriendo solo los nodos del camino.
+    """
+
+    def __init__(self, padre, **opciones):
+        super().__init__(padre)
+        self.arbol = ttk.Treeview(self, columns=("nodos",), selectmode="browse", **opciones)
+        self.arbol.heading("#0", text="Nodo", anchor=tk.W)
+        self.arbol.heading("nodos", text="Nodos", anchor=tk.E)
+        self.arbol.column("nodos", width=80, stretch=False, anchor=tk.E)
+        barra = ttk.Scrollbar(self, command=self.arbol.yview)
+        self.arbol.configure(yscrollcommand=barra.set)
+        barra.pack(side=tk.RIGHT, fill=tk.Y)
+        self.arbol.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.arbol.bind("<<TreeviewOpen>>", self._abrir)
+        self.indice = None
+        self._pendientes = {}  # nodo -> primer hijo aun sin insertar
+        self._busqueda = ("", 0)  # ultimo texto buscado y proxima coincidencia
+
+    def mostrar(self, contenido):
+        """Muestra un IndiceArbol, o un texto (mensajes o errores) como filas sin hijos"""
+        self.arbol.delete(*self.arbol.get_children())
+        self._pendientes.clear()
+        self._busqueda = ("", 0)
+        if isinstance(contenido, IndiceArbol):
+            self.indice = contenido
+            self.arbol.heading("#0", text=f"Sintaxis correcta ({len(contenido)} nodos)")
+            if len(contenido):
+                self._insertar("", 0)
+            return
+        self.indice = None
+        self.arbol.heading("#0", text="Nodo")
+        for linea in contenido.splitlines():
+            self.arbol.insert("", tk.END, text=linea)
+
+    def _insertar(self, padre, nodo):
+        tamano = self.indice.tamanos[nodo]
+        self.arbol.insert(padre, tk.END, iid=str(nodo), text=self.indice.etiqueta(nodo),
+                          values=(tamano,))
+        if tamano > 1:
+            # Hijo provisorio para que el nodo muestre el indicador de expandir
+            self.arbol.insert(str(nodo), tk.END, iid=f"vacio{nodo}")
+            self._pendientes[nodo] = nodo + 1
+
+    def _cargar(self, nodo):
+        """Inserta el siguiente bloque de hijos de un nodo"""
+        padre = str(nodo)
+        for provisorio in (f"vacio{nodo}", f"mas{nodo}"):
+            if self.arbol.exists(provisorio):
+                self.arbol.delete(provisorio)
+        insertados = 0
+        for hijo in self.indice.hijos(nodo, self._pendientes.pop(nodo)):
+            if insertados == HIJOS_POR_BLOQUE:
+                restantes = sum(1 for _ in self.indice.hijos(nodo, hijo))
+                self.arbol.insert(padre, tk.END, iid=f"mas{nodo}",
+                                  text=f"... ({restantes} hijos mas)")
+                self.arbol.insert(f"mas{nodo}", tk.END)
+                self._pendientes[nodo] = hijo
+                return
+            self._insertar(padre, hijo)
+            insertados += 1
+
+    def _abrir(self, evento):
+        elemento = self.arbol.focus()
+        if elemento.startswith("mas"):
+            self._cargar(int(elemento[3:]))
+        elif elemento.isdigit() and self.arbol.exists(f"vacio{elemento}"):
+            self._cargar(int(elemento))
+
+    def mostrar_nodo(self, nodo):
+        """Abre el camino hasta el nodo (cargando solo los bloques necesarios) y lo selecciona"""
+        for ancestro in self.indice.ancestros(nodo) + [nodo]:
+            while not self.arbol.exists(str(ancestro)):
+                self._cargar(self.indice.padre(ancestro))
+            if ancestro != nodo:
+                self.arbol.item(str(ancestro), open=True)
+        self.arbol.see(str(nodo))
+        self.arbol.selection_set(str(nodo))
+        self.arbol.focus(str(nodo))
+
+    def buscar(self, texto):
+        """Salta a la siguiente coincidencia del texto; retorna (numero de la actual, total)"""
+        if self.indice is None or not texto.strip():
+            return 0, 0
+        coincidencias = self.indice.buscar(texto)
+        if not coincidencias:
+            return 0, 0
+        anterior, siguiente = self._busqueda
+        actual = siguiente % len(coincidencias) if texto == anterior else 0
+        self.mostrar_nodo(coincidencias[actual])
+        self._busqueda = (texto, actual + 1)
+        return actual + 1, len(coincidencias)